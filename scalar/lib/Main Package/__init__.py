@@ -4,7 +4,7 @@ A comprehensive library for SAN storage automation and management
 """
 
 from .config import ConfigManager, Config
-from .core import BaseSanManager, BaseHostManager, SanAutomationOrchestrator
+from .core import BaseSanManager, BaseHostManager, SanAutomationOrchestrator, FleetOrchestrator
 from .vendors import get_vendor_class, VENDOR_MAP
 from .hosts import get_host_class, HOST_MAP
 from .utils import setup_logging, get_logger, retry, timeout
@@ -17,6 +17,7 @@ __all__ = [
     'BaseSanManager',
     'BaseHostManager',
     'SanAutomationOrchestrator',
+    'FleetOrchestrator',
     'get_vendor_class',
     'VENDOR_MAP',
     'get_host_class',
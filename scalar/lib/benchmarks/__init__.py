@@ -0,0 +1,4 @@
+from .runner import BENCHMARKS, benchmark, measure, run_benchmarks, compare
+from . import suites
+
+__all__ = ['BENCHMARKS', 'benchmark', 'measure', 'run_benchmarks', 'compare']
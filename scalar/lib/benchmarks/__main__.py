@@ -0,0 +1,50 @@
+"""Run the benchmark suite: python -m san_automation.benchmarks [--quick] [--output FILE] [--compare FILE]"""
+
+import argparse
+import json
+import logging
+import sys
+from . import BENCHMARKS, compare, run_benchmarks
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m san_automation.benchmarks",
+                                     description="Benchmark the automation library's own hot paths")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer repetitions")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if slower than this earlier JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed slowdown against the baseline (default: 0.10)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        for name, func in BENCHMARKS.items():
+            print(f"{name:22} {func.__doc__}")
+        return 0
+    
+    # Simulated failures and per-target progress would otherwise flood the terminal
+    logging.disable(logging.WARNING)
+    report = run_benchmarks(args.names or None, quick=args.quick,
+                            progress=lambda name: print(f"Running {name}...", file=sys.stderr))
+    for name, result in report["results"].items():
+        print(f"{name:22} median {result['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+    
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}: {regression['baseline_s'] * 1000:.2f} ms -> "
+                  f"{regression['current_s'] * 1000:.2f} ms ({regression['change']:+.1%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
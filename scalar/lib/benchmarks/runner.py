@@ -0,0 +1,98 @@
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Any
+
+# name -> benchmark function taking quick and returning its result dict
+BENCHMARKS: Dict[str, Callable[[bool], Dict[str, Any]]] = {}
+
+def benchmark(name: str):
+    """Register a benchmark function under name"""
+    def decorator(func: Callable[[bool], Dict[str, Any]]) -> Callable[[bool], Dict[str, Any]]:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1, operations: int = 1) -> Dict[str, Any]:
+    """Time func repeat times after warmup calls; each call performs operations units of work"""
+    for _ in range(warmup):
+        func()
+    
+    samples = []
+    # Collections triggered by earlier benchmarks would otherwise land in random samples
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    
+    median = statistics.median(samples)
+    return {
+        "repeat": repeat,
+        "operations": operations,
+        "median_s": median,
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_second": operations / median if median else None
+    }
+
+def environment() -> Dict[str, Any]:
+    """What a result depends on besides the code: commit, interpreter and machine"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+def run_benchmarks(names: Optional[List[str]] = None, quick: bool = False,
+                   progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Run the named benchmarks (all by default) and return the JSON-ready report"""
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    
+    results = {}
+    for name in selected:
+        if progress:
+            progress(name)
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name](quick)
+        results[name]["wall_s"] = round(time.perf_counter() - start, 3)
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """Benchmarks whose median time grew by more than tolerance against a baseline report"""
+    regressions = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("median_s") or result.get("median_s") is None:
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        if change > tolerance:
+            regressions.append({"benchmark": name, "baseline_s": before["median_s"],
+                                "current_s": result["median_s"], "change": round(change, 4)})
+    return regressions
@@ -0,0 +1,256 @@
+import json
+import os
+import tempfile
+import time
+from dataclasses import replace
+from typing import Dict, List, Any
+from .runner import benchmark, measure
+from ..config.config_manager import Config
+from ..config.inventory import InventoryLoader, parse_inventory
+from ..config.schema import ConfigSchema
+from ..performance.fio_parser import parse_fio_lines, parse_fio_output
+from ..simulator import ArraySimulator, HostSimulator, SimulationProfile
+
+_PERCENTILES = ("1.000000", "5.000000", "10.000000", "20.000000", "30.000000", "40.000000", "50.000000",
+                "60.000000", "70.000000", "80.000000", "90.000000", "95.000000", "99.000000", "99.500000",
+                "99.900000", "99.950000", "99.990000")
+
+def target_dicts(count: int) -> List[Dict[str, Any]]:
+    """Raw config dicts for count distinct targets, as they would come out of JSON"""
+    return [{
+        "san_ip": f"10.1.{index // 250}.{index % 250 + 1}",
+        "host_ip": f"10.2.{index // 250}.{index % 250 + 1}",
+        "san_username": "admin",
+        "san_password": "password",
+        "host_username": "root",
+        "host_password": "password",
+        "raid_level": "5",
+        "volume_size_gb": 100,
+        "volume_name": f"bench_{index}",
+        "test_duration": 60
+    } for index in range(count)]
+
+def target_configs(count: int, network: int = 1) -> List[Config]:
+    """Configs for count distinct targets; each network number gives a disjoint set of arrays and hosts"""
+    return [replace(Config(**data), san_ip=f"10.{2 * network - 1}.{data['san_ip'].split('.', 2)[2]}",
+                    host_ip=f"10.{2 * network}.{data['host_ip'].split('.', 2)[2]}")
+            for data in target_dicts(count)]
+
+def fio_document(jobs: int) -> str:
+    """fio JSON report with jobs jobs, full percentile lists and latency histograms"""
+    def _direction(iops: float) -> Dict[str, Any]:
+        clat = {"min": 50000, "max": 9000000, "mean": 640000.5, "stddev": 120000.25, "N": int(iops * 60),
+                "percentile": {key: 600000 + index * 10000 for index, key in enumerate(_PERCENTILES)}}
+        return {"io_bytes": int(iops * 60 * 4096), "bw": int(iops * 4), "iops": iops, "runtime": 60000,
+                "total_ios": int(iops * 60), "slat_ns": dict(clat, percentile={}), "clat_ns": clat,
+                "lat_ns": dict(clat)}
+    histogram_ns = {str(bound): 0.01 for bound in (2, 4, 10, 20, 50, 100, 250, 500, 750, 1000)}
+    histogram_us = {str(bound): 1.5 for bound in (2, 4, 10, 20, 50, 100, 250, 500, 750, 1000)}
+    histogram_ms = {str(bound): 0.5 for bound in (2, 4, 10, 20, 50, 100, 250, 500, 750, 1000, 2000, ">=2000")}
+    document = {
+        "fio version": "fio-3.35",
+        "timestamp": 1700000000,
+        "jobs": [{
+            "jobname": f"job_{index}",
+            "error": 0,
+            "read": _direction(50000.0 + index),
+            "write": _direction(20000.0 + index),
+            "usr_cpu": 12.5,
+            "sys_cpu": 30.25,
+            "ctx": 123456,
+            "latency_ns": histogram_ns,
+            "latency_us": histogram_us,
+            "latency_ms": histogram_ms
+        } for index in range(jobs)],
+        "disk_util": [{"name": "sdb", "read_ios": 3000000, "write_ios": 1200000, "util": 99.5}]
+    }
+    return json.dumps(document, indent=2)
+
+@benchmark("fio_parse")
+def bench_fio_parse(quick: bool) -> Dict[str, Any]:
+    """Parse a many-job fio JSON report, whole and line by line as streamed from a host"""
+    document = fio_document(16 if quick else 128)
+    lines = document.splitlines()
+    repeat = 5 if quick else 20
+    result = measure(lambda: parse_fio_output(document), repeat=repeat)
+    streamed = measure(lambda: parse_fio_lines(iter(lines)), repeat=repeat)
+    megabytes = len(document) / 1e6
+    return dict(result, document_mb=round(megabytes, 3),
+                mb_per_second=megabytes / result["median_s"],
+                lines_median_s=streamed["median_s"],
+                lines_mb_per_second=megabytes / streamed["median_s"])
+
+@benchmark("config_validation")
+def bench_config_validation(quick: bool) -> Dict[str, Any]:
+    """Validate raw target dicts and build Config objects from them"""
+    count = 1000 if quick else 10000
+    targets = target_dicts(count)
+    schema = ConfigSchema()
+    
+    def _load():
+        for data in targets:
+            Config(**schema.validate(data))
+    
+    return dict(measure(_load, repeat=3 if quick else 10, operations=count), targets=count)
+
+@benchmark("inventory_load")
+def bench_inventory_load(quick: bool) -> Dict[str, Any]:
+    """Parse and bulk-validate a grouped inventory, then reload it from the loader's cache"""
+    count = 1000 if quick else 10000
+    targets = target_dicts(count)
+    shared = ("san_username", "san_password", "host_username", "host_password", "raid_level",
+              "volume_size_gb", "test_duration")
+    document = {
+        "defaults": {key: targets[0][key] for key in shared},
+        "groups": {
+            "lab": {"defaults": {"fio_profile": "4k_rand_qd32"}, "targets": []},
+            "lab_raw": {"parent": "lab", "defaults": {"test_mode": "raw"}, "targets": []}
+        }
+    }
+    for index, data in enumerate(targets):
+        group = "lab_raw" if index % 2 else "lab"
+        document["groups"][group]["targets"].append({key: value for key, value in data.items() if key not in shared})
+    
+    with tempfile.TemporaryDirectory() as directory:
+        inventory_file = os.path.join(directory, "inventory.json")
+        with open(inventory_file, 'w') as f:
+            json.dump(document, f)
+        loader = InventoryLoader()
+        loader.load(inventory_file)
+        result = measure(lambda: parse_inventory(document), repeat=3 if quick else 10, operations=count)
+        cached = measure(lambda: loader.load(inventory_file), repeat=5 if quick else 20)
+    return dict(result, targets=count, cached_load_us=cached["median_s"] * 1e6)
+
+@benchmark("api_round_trip")
+def bench_api_round_trip(quick: bool) -> Dict[str, Any]:
+    """GenericVendor._api_request against a local simulated array, next to a bare session request"""
+    calls = 100 if quick else 1000
+    with ArraySimulator() as arrays:
+        vendor = arrays.san_factory(target_configs(1)[0])
+        if not vendor.connect():
+            raise RuntimeError("Could not connect to the simulated array")
+        url = f"{vendor.api_base_url}/system/info"
+        
+        def _api():
+            for _ in range(calls):
+                vendor._api_request('GET', '/system/info', timeout=10)
+        
+        def _raw():
+            for _ in range(calls):
+                vendor.session.get(url, timeout=10).json()
+        
+        result = measure(_api, repeat=3 if quick else 7, operations=calls)
+        raw = measure(_raw, repeat=3 if quick else 7, operations=calls)
+        vendor.disconnect()
+    return dict(result, raw_median_s=raw["median_s"],
+                overhead_us_per_call=(result["median_s"] - raw["median_s"]) / calls * 1e6)
+
+@benchmark("async_api_concurrency")
+def bench_async_api_concurrency(quick: bool) -> Dict[str, Any]:
+    """AsyncGenericVendor requests per second against a local simulated array, by number of requests in flight"""
+    import asyncio
+    
+    calls = 200 if quick else 2000
+    levels = (1, 8, 32) if quick else (1, 4, 16, 32, 64, 128)
+    
+    async def _run(vendor, concurrency: int) -> float:
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def _call():
+            async with slots:
+                await vendor._api_request('GET', '/system/info')
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(_call() for _ in range(calls)))
+        return time.perf_counter() - start
+    
+    async def _curve(arrays) -> List[Dict[str, Any]]:
+        vendor = arrays.async_san_factory(target_configs(1)[0], max_connections=max(levels),
+                                          max_connections_per_host=max(levels))
+        if not await vendor.connect():
+            raise RuntimeError("Could not connect to the simulated array")
+        try:
+            await _run(vendor, max(levels))
+            curve = []
+            for concurrency in levels:
+                seconds = min([await _run(vendor, concurrency) for _ in range(1 if quick else 3)])
+                curve.append({"concurrency": concurrency, "seconds": seconds, "requests_per_second": calls / seconds})
+            return curve
+        finally:
+            await vendor.disconnect()
+    
+    with ArraySimulator() as arrays:
+        curve = asyncio.run(_curve(arrays))
+    return {"calls": calls, "median_s": curve[-1]["seconds"], "curve": curve}
+
+@benchmark("execute_command")
+def bench_execute_command(quick: bool) -> Dict[str, Any]:
+    """BaseHost.execute_command over the simulator's fake SSH transport, next to the bare transport"""
+    calls = 500 if quick else 5000
+    with ArraySimulator() as arrays:
+        hosts = HostSimulator(arrays)
+        host = hosts.host_factory(target_configs(1)[0])
+        if not host.connect():
+            raise RuntimeError("Could not connect to the simulated host")
+        
+        def _execute():
+            for _ in range(calls):
+                host.execute_command("command -v fio")
+        
+        def _raw():
+            for _ in range(calls):
+                _, stdout, _ = host.ssh_client.exec_command("command -v fio")
+                stdout.read()
+        
+        result = measure(_execute, repeat=3 if quick else 7, operations=calls)
+        raw = measure(_raw, repeat=3 if quick else 7, operations=calls)
+        host.disconnect()
+    return dict(result, raw_median_s=raw["median_s"],
+                overhead_us_per_call=(result["median_s"] - raw["median_s"]) / calls * 1e6)
+
+@benchmark("orchestrator_target")
+def bench_orchestrator_target(quick: bool) -> Dict[str, Any]:
+    """Full pipeline of one target at a time against a zero-latency simulator: the library's own overhead"""
+    from ..core.orchestrator import SanAutomationOrchestrator
+    count = 10 if quick else 50
+    with ArraySimulator() as arrays:
+        hosts = HostSimulator(arrays)
+        networks = iter(range(1, 100))
+        
+        def _run():
+            # Fresh arrays and hosts per repetition, so every run provisions from scratch
+            for config in target_configs(count, next(networks)):
+                orchestrator = SanAutomationOrchestrator(arrays.san_factory(config), hosts.host_factory(config))
+                if not orchestrator.run_pipeline():
+                    raise RuntimeError(f"Pipeline failed for {config.san_ip}")
+                orchestrator.cleanup()
+        
+        result = measure(_run, repeat=3, warmup=1, operations=count)
+    return dict(result, targets=count, ms_per_target=result["median_s"] / count * 1000)
+
+@benchmark("fleet_scaling")
+def bench_fleet_scaling(quick: bool) -> Dict[str, Any]:
+    """Targets per minute against fleet worker count, with 2 ms simulated latency per request and command"""
+    from ..core.fleet import FleetOrchestrator
+    count = 32 if quick else 128
+    worker_counts = (1, 4, 16) if quick else (1, 2, 4, 8, 16, 32, 64)
+    curve = []
+    with ArraySimulator(SimulationProfile(latency_ms=2.0, seed=0)) as arrays:
+        hosts = HostSimulator(arrays, max_channels_per_host=4)
+        for point, workers in enumerate(worker_counts):
+            fleet = FleetOrchestrator(target_configs(count, point + 1), max_workers=workers,
+                                      san_factory=arrays.san_factory, host_factory=hosts.host_factory)
+            start = time.perf_counter()
+            report = fleet.run()
+            seconds = time.perf_counter() - start
+            curve.append({
+                "workers": workers,
+                "seconds": seconds,
+                "succeeded": report["succeeded"],
+                "targets_per_minute": count / seconds * 60
+            })
+    single = curve[0]["targets_per_minute"]
+    for entry in curve:
+        # 1.0 means perfectly linear scaling from one worker
+        entry["efficiency"] = entry["targets_per_minute"] / (single * entry["workers"])
+    return {"targets": count, "median_s": curve[-1]["seconds"], "curve": curve}
@@ -1,4 +0,0 @@
-from .config_manager import ConfigManager
-from .schema import ConfigSchema
-
-__all__ = ['ConfigManager', 'ConfigSchema']
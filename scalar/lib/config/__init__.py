@@ -0,0 +1,6 @@
+from .config_manager import ConfigManager, Config
+from .schema import ConfigSchema
+from .inventory import Inventory, InventoryError, InventoryLoader, load_inventory
+
+__all__ = ['ConfigManager', 'Config', 'ConfigSchema', 'Inventory', 'InventoryError', 'InventoryLoader',
+           'load_inventory']
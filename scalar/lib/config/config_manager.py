@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from .schema import ConfigSchema
 
@@ -18,6 +18,16 @@ class Config:
     volume_name: str = "test_volume"
     mount_point: str = "/mnt/san_volume"
     test_duration: int = 300
+    test_mode: str = "filesystem"  # "raw" runs fio on the block device, skipping mkfs and mount
+    fast_mkfs: bool = False  # lazy inode/journal init and no discard; init then runs during the test
+    fio_profile: str = "4k_rand_qd32"  # key for stored results and baselines
+    operation_timeout: int = 600  # max wait for async array operations
+    inventory_ttl: int = 60  # seconds a cached disk inventory stays fresh
+    checkpoint_dir: str = ""  # persist pipeline progress here so reruns resume
+    min_paths: int = 1  # fail device detection if the LUN has fewer multipath paths
+    multipath_policy: str = ""  # required path selector, e.g. "service-time"; empty accepts any
+    telemetry_interval_ms: int = 0  # 0 disables time-series capture
+    telemetry_dir: str = ""  # spill telemetry columns here instead of keeping them in memory
     vendor_type: str = "generic"
     host_type: str = "linux"
     protocol: str = "iscsi"  # iscsi, fc, nfs, etc.
@@ -28,15 +38,22 @@ class ConfigManager:
     def __init__(self, config_file: str = "config.json"):
         self.config_file = config_file
         self.schema = ConfigSchema()
+        # Validated data of the last file read and the (mtime, size) it was read at
+        self._cached_data: Optional[Dict[str, Any]] = None
+        self._cached_stat: Optional[Tuple[int, int]] = None
     
     def load_config(self) -> Optional[Config]:
         """Load configuration from file or return defaults"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config_data = json.load(f)
-                    validated_data = self.schema.validate(config_data)
-                    return Config(**validated_data)
+                stat = os.stat(self.config_file)
+                if self._cached_stat != (stat.st_mtime_ns, stat.st_size):
+                    with open(self.config_file, 'r') as f:
+                        config_data = json.load(f)
+                    self._cached_data = self.schema.validate(config_data)
+                    self._cached_stat = (stat.st_mtime_ns, stat.st_size)
+                # A fresh Config per call, so callers can change theirs without touching the cache
+                return Config(**self._cached_data)
             else:
                 return self.get_default_config()
         except Exception as e:
@@ -50,6 +67,9 @@ class ConfigManager:
             
             with open(self.config_file, 'w') as f:
                 json.dump(validated_data, f, indent=2)
+            stat = os.stat(self.config_file)
+            self._cached_data = validated_data
+            self._cached_stat = (stat.st_mtime_ns, stat.st_size)
             return True
         except Exception as e:
             raise ValueError(f"Failed to save configuration: {e}")
@@ -67,6 +87,7 @@ class ConfigManager:
     
     def update_config(self, **kwargs) -> Config:
         """Update configuration with new values"""
+        # Served from the cache unless the file changed since it was last read
         config = self.load_config()
         for key, value in kwargs.items():
             if hasattr(config, key):
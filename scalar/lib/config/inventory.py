@@ -0,0 +1,212 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import MISSING, fields
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from .config_manager import Config
+from .schema import ConfigSchema
+
+# Config fields and the defaults every target starts from
+CONFIG_DEFAULTS = {field.name: field.default for field in fields(Config) if field.default is not MISSING}
+REQUIRED_FIELDS = [field.name for field in fields(Config) if field.default is MISSING]
+_TARGET_KEYS = {field.name for field in fields(Config)} | {'name'}
+
+class InventoryError(ValueError):
+    """An inventory that failed validation, with every problem found in it"""
+    
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} inventory error(s):\n  " + "\n  ".join(errors))
+
+class Inventory:
+    """Validated targets of an inventory and the groups they belong to"""
+    
+    def __init__(self, targets: Dict[str, Config], groups: Dict[str, List[str]]):
+        self.targets = targets
+        # group -> target names, including those of its child groups
+        self.groups = groups
+    
+    def __len__(self) -> int:
+        return len(self.targets)
+    
+    def __iter__(self) -> Iterator[Config]:
+        return iter(self.targets.values())
+    
+    def get(self, name: str) -> Config:
+        """Config of one target by name"""
+        return self.targets[name]
+    
+    def select(self, *groups: str) -> List[Config]:
+        """Configs of the targets in any of groups, in inventory order; all targets if none are given"""
+        if not groups:
+            return list(self.targets.values())
+        unknown = [group for group in groups if group not in self.groups]
+        if unknown:
+            raise KeyError(f"Unknown inventory groups: {', '.join(unknown)}")
+        wanted = {name for group in groups for name in self.groups[group]}
+        return [config for name, config in self.targets.items() if name in wanted]
+
+def parse_inventory(data: Dict[str, Any], schema: Optional[ConfigSchema] = None) -> Inventory:
+    """Resolve defaults and group inheritance of an inventory document and validate all of its targets
+    
+    Layout: {"defaults": {...}, "groups": {"<name>": {"parent": "<group>", "defaults": {...},
+    "targets": [...]}}, "targets": [...]}. A target takes Config defaults, then the inventory
+    defaults, then those of each group from the root down to its own, then its own values.
+    """
+    errors = []
+    if not isinstance(data, dict):
+        raise InventoryError(["Inventory must be a JSON object"])
+    unknown = set(data) - {'defaults', 'groups', 'targets'}
+    if unknown:
+        errors.append(f"Unknown inventory sections: {', '.join(sorted(unknown))}")
+    groups = data.get('groups', {})
+    if not isinstance(groups, dict) or not all(isinstance(spec, dict) for spec in groups.values()):
+        raise InventoryError(errors + ["'groups' must map group names to objects"])
+    defaults = {**CONFIG_DEFAULTS, **data.get('defaults', {})}
+    
+    # Defaults of each group with everything it inherits, resolved once per group
+    resolved: Dict[str, Dict[str, Any]] = {}
+    
+    def _group_defaults(group: str, chain: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        if group in resolved:
+            return resolved[group]
+        if group in chain:
+            errors.append(f"Group '{group}' inherits from itself: {' -> '.join(chain + (group,))}")
+            resolved[group] = {}
+            return resolved[group]
+        parent = groups[group].get('parent')
+        if parent is None:
+            base = defaults
+        elif parent not in groups:
+            errors.append(f"Group '{group}' has unknown parent '{parent}'")
+            base = {}
+        else:
+            base = _group_defaults(parent, chain + (group,))
+        resolved[group] = {**base, **groups[group].get('defaults', {})}
+        return resolved[group]
+    
+    entries: List[Tuple[Optional[str], Dict[str, Any]]] = []
+    for target in data.get('targets', []):
+        entries.append((None, {**defaults, **target}))
+    for group, spec in groups.items():
+        group_defaults = _group_defaults(group)
+        for target in spec.get('targets', []):
+            entries.append((group, {**group_defaults, **target}))
+    
+    names = [entry.pop('name', None) or f"{entry.get('san_ip')}/{entry.get('volume_name')}"
+             for _, entry in entries]
+    errors.extend(validate_targets(list(zip(names, (entry for _, entry in entries))), schema))
+    if errors:
+        raise InventoryError(errors)
+    
+    targets = {name: Config(**entry) for name, (_, entry) in zip(names, entries)}
+    members: Dict[str, List[str]] = {group: [] for group in groups}
+    for name, (group, _) in zip(names, entries):
+        # A target belongs to its own group and every group that group inherits from
+        while group is not None and name not in members[group]:
+            members[group].append(name)
+            group = groups[group].get('parent')
+    return Inventory(targets, members)
+
+def validate_targets(targets: List[Tuple[str, Dict[str, Any]]],
+                     schema: Optional[ConfigSchema] = None) -> List[str]:
+    """Check named target dicts in one pass; returns every problem, including clashes between targets"""
+    schema = schema or ConfigSchema()
+    errors = []
+    for name, data in targets:
+        unknown = set(data) - _TARGET_KEYS
+        if unknown:
+            errors.append(f"Target '{name}': unknown fields {', '.join(sorted(unknown))}")
+        missing = [field for field in REQUIRED_FIELDS if field not in data]
+        if missing:
+            errors.append(f"Target '{name}': missing required fields {', '.join(missing)}")
+        errors.extend(f"Target '{name}': {error}" for error in schema.errors(data))
+    
+    duplicates = [name for name, count in Counter(name for name, _ in targets).items() if count > 1]
+    for name in duplicates:
+        errors.append(f"Target name '{name}' is used more than once")
+    errors.extend(_clashes(targets, lambda data: (str(data.get('san_ip')), str(data.get('volume_name'))),
+                           "volume {1} on array {0}"))
+    # Raw targets never mount, so only filesystem targets can collide on a mount point
+    errors.extend(_clashes(
+        [(name, data) for name, data in targets if data.get('test_mode', 'filesystem') == 'filesystem'],
+        lambda data: (str(data.get('host_ip')), str(data.get('mount_point'))), "mount point {1} on host {0}"))
+    
+    san_ips = {}
+    for name, data in targets:
+        san_ips.setdefault(str(data.get('san_ip')), name)
+    for name, data in targets:
+        host_ip = str(data.get('host_ip'))
+        if host_ip in san_ips:
+            errors.append(f"Target '{name}': host IP {host_ip} is the array IP of target '{san_ips[host_ip]}'")
+    return errors
+
+def _clashes(targets: List[Tuple[str, Dict[str, Any]]], key, description: str) -> List[str]:
+    """Errors for targets sharing a resource; key maps a target dict to the resource it uses"""
+    users: Dict[Any, List[str]] = {}
+    for name, data in targets:
+        users.setdefault(key(data), []).append(name)
+    return [f"Targets {', '.join(repr(name) for name in names)} share {description.format(*resource)}"
+            for resource, names in users.items() if len(names) > 1]
+
+class InventoryLoader:
+    """Load inventory files, reusing the parsed inventory while a file is unchanged
+    
+    A file is re-read only when its mtime or size changes, and re-parsed only when its
+    content hash changes too. Every load returns its own copy of the cached Inventory.
+    """
+    
+    def __init__(self, schema: Optional[ConfigSchema] = None):
+        self.schema = schema or ConfigSchema()
+        # absolute path -> ((mtime_ns, size), sha256, inventory)
+        self._cache: Dict[str, Tuple[Tuple[int, int], str, Inventory]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, inventory_file: str) -> Inventory:
+        """Parsed and validated inventory of a JSON file"""
+        path = os.path.abspath(inventory_file)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[2])
+        
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if cached and cached[1] == digest:
+            # Touched but not changed
+            inventory = cached[2]
+        else:
+            try:
+                data = json.loads(content)
+            except ValueError as e:
+                raise InventoryError([f"{inventory_file} is not valid JSON: {e}"])
+            inventory = parse_inventory(data, self.schema)
+        with self._lock:
+            self._cache[path] = (signature, digest, inventory)
+        # Callers may change their targets, which must not leak into the cache or other callers
+        return copy.deepcopy(inventory)
+    
+    def invalidate(self, inventory_file: Optional[str] = None):
+        """Forget one cached file, or all of them"""
+        with self._lock:
+            if inventory_file is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(inventory_file), None)
+
+_default_loader: Optional[InventoryLoader] = None
+_default_loader_lock = threading.Lock()
+
+def load_inventory(inventory_file: str) -> Inventory:
+    """Load an inventory file through the process-wide cache"""
+    global _default_loader
+    with _default_loader_lock:
+        if _default_loader is None:
+            _default_loader = InventoryLoader()
+    return _default_loader.load(inventory_file)
@@ -1,29 +1,57 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import re
 
+IP_PATTERN = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
+VALID_RAID_LEVELS = ['0', '1', '5', '6', '10']
+VALID_TEST_MODES = ['filesystem', 'raw']
+
+# (field, default when absent, lower bound, whether the bound itself is allowed, error message)
+_NUMERIC_LIMITS = (
+    ('volume_size_gb', 0, 0, False, "Volume size must be positive"),
+    ('test_duration', 0, 0, False, "Test duration must be positive"),
+    ('operation_timeout', 600, 0, False, "Operation timeout must be positive"),
+    ('telemetry_interval_ms', 0, 0, True, "Telemetry interval cannot be negative"),
+    ('inventory_ttl', 0, 0, True, "Inventory TTL cannot be negative"),
+    ('min_paths', 1, 1, True, "Minimum path count must be at least 1")
+)
+
 class ConfigSchema:
     """Configuration validation schema"""
     
     def validate(self, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate configuration data"""
-        validated = config_data.copy()
+        errors = self.errors(config_data)
+        if errors:
+            raise ValueError(errors[0])
+        return config_data.copy()
+    
+    def errors(self, config_data: Dict[str, Any]) -> List[str]:
+        """Every problem with configuration data, in field order; empty if it is valid"""
+        errors = []
         
         # Validate IP addresses
-        ip_pattern = r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$'
-        if not re.match(ip_pattern, validated.get('san_ip', '')):
-            raise ValueError("Invalid SAN IP address")
-        if not re.match(ip_pattern, validated.get('host_ip', '')):
-            raise ValueError("Invalid host IP address")
+        if not _is_ip(config_data.get('san_ip', '')):
+            errors.append("Invalid SAN IP address")
+        if not _is_ip(config_data.get('host_ip', '')):
+            errors.append("Invalid host IP address")
         
         # Validate RAID level
-        valid_raid_levels = ['0', '1', '5', '6', '10']
-        if validated.get('raid_level') not in valid_raid_levels:
-            raise ValueError(f"Invalid RAID level. Must be one of: {valid_raid_levels}")
+        if config_data.get('raid_level') not in VALID_RAID_LEVELS:
+            errors.append(f"Invalid RAID level. Must be one of: {VALID_RAID_LEVELS}")
+        
+        # Validate test mode
+        if config_data.get('test_mode', 'filesystem') not in VALID_TEST_MODES:
+            errors.append(f"Invalid test mode. Must be one of: {VALID_TEST_MODES}")
         
         # Validate sizes
-        if validated.get('volume_size_gb', 0) <= 0:
-            raise ValueError("Volume size must be positive")
-        if validated.get('test_duration', 0) <= 0:
-            raise ValueError("Test duration must be positive")
+        for field, default, bound, inclusive, message in _NUMERIC_LIMITS:
+            value = config_data.get(field, default)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{field} must be a number")
+            elif value < bound or (value == bound and not inclusive):
+                errors.append(message)
         
-        return validated
+        return errors
+
+def _is_ip(value: Any) -> bool:
+    return isinstance(value, str) and IP_PATTERN.match(value) is not None
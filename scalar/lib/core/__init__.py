@@ -1,11 +1,18 @@
 from .base_managers import BaseSanManager, BaseHostManager
 from .orchestrator import SanAutomationOrchestrator
+from .fleet import FleetOrchestrator
+from .checkpoint import Checkpoint
+from .scheduler import StageScheduler, StageResult
 from .exceptions import SanError, HostError, ConfigError
 
 __all__ = [
     'BaseSanManager', 
     'BaseHostManager', 
     'SanAutomationOrchestrator',
+    'FleetOrchestrator',
+    'Checkpoint',
+    'StageScheduler',
+    'StageResult',
     'SanError', 
     'HostError', 
     'ConfigError'
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from ..config import Config
+from .exceptions import HostError
 
 class BaseSanManager(ABC):
     """Abstract base class for SAN storage management"""
@@ -38,6 +40,56 @@ class BaseSanManager(ABC):
     def map_volume_to_host(self, volume_id: str, host_identifier: str) -> bool:
         """Map volume to host"""
         pass
+    
+    def wait_for_operation(self, operation_id: str, timeout: int = 300) -> bool:
+        """Wait for async operation to complete - default assumes synchronous operations"""
+        return True
+    
+    def get_array(self, array_id: str) -> Optional[Dict]:
+        """Get current state of a RAID array, or None if it does not exist - default cannot look it up"""
+        return None
+    
+    def get_volume(self, volume_id: str) -> Optional[Dict]:
+        """Get current state of a volume, or None if it does not exist - default cannot look it up"""
+        return None
+    
+    def get_volume_wwn(self, volume_id: str) -> Optional[str]:
+        """Get the WWN/WWID hosts will see for a volume, if the array reports one"""
+        volume = self.get_volume(volume_id) or {}
+        return volume.get('wwn') or volume.get('wwid') or volume.get('naa_id') or volume.get('serial_number')
+    
+    def get_volume_mapping(self, volume_id: str, host_identifier: str) -> Optional[Dict[str, Any]]:
+        """Get {lun, targets} of a volume's mapping to a host - default cannot look it up"""
+        return None
+    
+    def get_volume_hosts(self, volume_id: str) -> Optional[List[str]]:
+        """Get hosts a volume is mapped to - default cannot look them up"""
+        return None
+    
+    def create_volumes(self, volumes: List[Dict[str, Any]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Create volumes from {array_id, name, size_gb} specs - one result per spec, in order"""
+        def _create(spec: Dict[str, Any]) -> Dict[str, Any]:
+            volume_id = self.create_volume(spec['array_id'], spec['name'], spec['size_gb'])
+            return {
+                "name": spec['name'],
+                "volume_id": volume_id,
+                "success": volume_id is not None,
+                "error": None if volume_id is not None else "Volume creation failed"
+            }
+        return _fan_out(_create, volumes, max_workers, lambda spec: {"name": spec.get('name'), "volume_id": None})
+    
+    def map_volumes(self, mappings: List[Tuple[str, str]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Map (volume_id, host_identifier) pairs - one result per pair, in order"""
+        def _map(mapping: Tuple[str, str]) -> Dict[str, Any]:
+            volume_id, host = mapping
+            mapped = self.map_volume_to_host(volume_id, host)
+            return {
+                "volume_id": volume_id,
+                "host": host,
+                "success": mapped,
+                "error": None if mapped else "Volume mapping failed"
+            }
+        return _fan_out(_map, mappings, max_workers, lambda mapping: {"volume_id": mapping[0], "host": mapping[1]})
 
 class BaseHostManager(ABC):
     """Abstract base class for host management"""
@@ -45,6 +97,7 @@ class BaseHostManager(ABC):
     def __init__(self, config: Config):
         self.config = config
         self.connected = False
+        self.device = None
     
     @abstractmethod
     def connect(self) -> bool:
@@ -57,13 +110,13 @@ class BaseHostManager(ABC):
         pass
     
     @abstractmethod
-    def rescan_storage(self) -> bool:
-        """Rescan storage devices"""
+    def rescan_storage(self, mapping: Optional[Dict[str, Any]] = None) -> bool:
+        """Rescan storage devices, only the mapped target/LUN when mapping gives them"""
         pass
     
     @abstractmethod
-    def detect_new_device(self) -> Optional[str]:
-        """Detect new storage device"""
+    def detect_new_device(self, wwn: Optional[str] = None) -> Optional[str]:
+        """Detect new storage device, by WWN when the array reported one"""
         pass
     
     @abstractmethod
@@ -77,6 +130,44 @@ class BaseHostManager(ABC):
         pass
     
     @abstractmethod
-    def run_performance_test(self, mount_point: str, duration: int) -> Dict[str, Any]:
-        """Run storage performance test"""
+    def run_performance_test(self, mount_point: str, duration: int, device: Optional[str] = None) -> Dict[str, Any]:
+        """Run storage performance test, directly on device instead of files in mount_point if given"""
         pass
+    
+    def prepare_host(self, mount_point: str) -> bool:
+        """Host preparation that does not need the volume - default has nothing to prepare"""
+        return True
+    
+    def device_exists(self, device: str) -> bool:
+        """Check that a block device is present - default cannot check"""
+        return False
+    
+    def device_wwid(self, device: str) -> Optional[str]:
+        """Get the WWID of the LUN behind a block device - default cannot look it up"""
+        return None
+    
+    def get_mounted_device(self, mount_point: str) -> Optional[str]:
+        """Get the device mounted at mount_point - default cannot check"""
+        return None
+    
+    def raw_job_dir(self, device: str) -> str:
+        """Directory for the job files of a raw run on device - default cannot check the device is safe"""
+        raise HostError(f"Raw device runs are not supported on {type(self).__name__}")
+    
+    def restore_device(self, device: str, wwn: Optional[str] = None):
+        """Adopt a device found by an earlier run, e.g. when resuming from a checkpoint"""
+        self.device = device
+
+def _fan_out(func: Callable[[Any], Dict[str, Any]], items: List[Any], max_workers: int,
+             describe: Callable[[Any], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply func to items concurrently; an exception fails only its own item"""
+    def _run(item: Any) -> Dict[str, Any]:
+        try:
+            return func(item)
+        except Exception as e:
+            return {**describe(item), "success": False, "error": str(e)}
+    
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        return list(executor.map(_run, items))
@@ -0,0 +1,88 @@
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Any
+
+# Config fields that identify the storage a checkpoint describes
+IDENTITY_FIELDS = ('san_ip', 'host_ip', 'vendor_type', 'raid_level', 'volume_name', 'volume_size_gb', 'mount_point')
+
+class Checkpoint:
+    """Pipeline progress persisted as JSON after every stage, so reruns can resume"""
+    
+    STATE_FIELDS = ('array_id', 'disk_ids', 'volume_id', 'wwn', 'device', 'mount_point')
+    
+    def __init__(self, path: str, identity: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.identity = identity or {}
+        self.stages: List[str] = []
+        self.state: Dict[str, Any] = {field: None for field in self.STATE_FIELDS}
+        self.updated_at: Optional[float] = None
+    
+    @classmethod
+    def for_config(cls, config, directory: str) -> "Checkpoint":
+        """Load the checkpoint of config's target from directory, or start a new one"""
+        identity = {field: getattr(config, field) for field in IDENTITY_FIELDS}
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{config.san_ip}_{config.host_ip}_{config.volume_name}")
+        checkpoint = cls(os.path.join(directory, f"{name}.json"), identity)
+        checkpoint.load()
+        return checkpoint
+    
+    def load(self) -> bool:
+        """Read the file; a missing, unreadable or foreign checkpoint leaves a fresh one"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        # A changed RAID level, size or target invalidates everything recorded
+        if self.identity and data.get('identity') != self.identity:
+            return False
+        self.stages = list(data.get('stages', []))
+        self.state.update({field: data.get('state', {}).get(field) for field in self.STATE_FIELDS})
+        self.updated_at = data.get('updated_at')
+        return True
+    
+    def save(self):
+        """Write the file atomically so a crash never leaves a torn checkpoint"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.updated_at = time.time()
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+    
+    def done(self, stage: str) -> bool:
+        return stage in self.stages
+    
+    def complete(self, stage: str, **state):
+        """Record a finished stage and the state it produced, then persist"""
+        self.state.update(state)
+        if stage not in self.stages:
+            self.stages.append(stage)
+        self.save()
+    
+    def invalidate(self, stage: str):
+        """Forget stage and every stage recorded after it"""
+        if stage in self.stages:
+            del self.stages[self.stages.index(stage):]
+            self.save()
+    
+    def clear(self):
+        self.stages = []
+        self.state = {field: None for field in self.STATE_FIELDS}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "identity": self.identity,
+            "stages": self.stages,
+            "state": self.state,
+            "updated_at": self.updated_at
+        }
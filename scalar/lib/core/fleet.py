@@ -0,0 +1,125 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Any
+from .base_managers import BaseSanManager, BaseHostManager
+from .orchestrator import SanAutomationOrchestrator
+from ..config import Config
+from ..performance.results_store import ResultsStore
+from ..performance.regression import RegressionDetector
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class FleetOrchestrator:
+    """Run the automation pipeline for many targets in a bounded worker pool"""
+    
+    def __init__(self, configs: List[Config], max_workers: int = 8,
+                 san_factory: Optional[Callable[[Config], BaseSanManager]] = None,
+                 host_factory: Optional[Callable[[Config], BaseHostManager]] = None,
+                 results_store: Optional[ResultsStore] = None,
+                 regression_detector: Optional[RegressionDetector] = None):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.configs = list(configs)
+        self.max_workers = max_workers
+        self.san_factory = san_factory or self._default_san_factory
+        self.host_factory = host_factory or self._default_host_factory
+        self.results_store = results_store
+        self.regression_detector = regression_detector
+        self.reports: List[Dict[str, Any]] = []
+    
+    @classmethod
+    def from_hosts(cls, config: Config, host_ips: List[str], **kwargs) -> "FleetOrchestrator":
+        """Build a fleet of one SAN and many hosts, one volume per host"""
+        configs = [
+            replace(config, host_ip=host_ip, volume_name=f"{config.volume_name}_{index}")
+            for index, host_ip in enumerate(host_ips)
+        ]
+        return cls(configs, **kwargs)
+    
+    @classmethod
+    def from_inventory(cls, inventory_file: str, *groups: str, **kwargs) -> "FleetOrchestrator":
+        """Build a fleet of the inventory targets in any of groups, or all of them if none are given"""
+        from ..config.inventory import load_inventory
+        return cls(load_inventory(inventory_file).select(*groups), **kwargs)
+    
+    @staticmethod
+    def _default_san_factory(config: Config) -> BaseSanManager:
+        from ..vendors import get_vendor_class
+        return get_vendor_class(config.vendor_type)(config)
+    
+    @staticmethod
+    def _default_host_factory(config: Config) -> BaseHostManager:
+        from ..hosts import get_host_class
+        return get_host_class(config.host_type)(config)
+    
+    def run_target(self, config: Config) -> Dict[str, Any]:
+        """Run the full pipeline for a single target and return its status report"""
+        start = time.monotonic()
+        error = None
+        orchestrator = None
+        
+        try:
+            orchestrator = SanAutomationOrchestrator(self.san_factory(config), self.host_factory(config))
+            if not orchestrator.run_pipeline():
+                error = "Pipeline did not complete"
+        except Exception as e:
+            logger.error(f"Target {config.host_ip} failed: {e}")
+            error = str(e)
+        finally:
+            if orchestrator:
+                orchestrator.cleanup()
+        
+        if orchestrator:
+            # Check before saving so the run is not part of its own baseline
+            if self.regression_detector:
+                orchestrator.check_regression(self.regression_detector)
+            report = orchestrator.get_status_report()
+            if self.results_store:
+                report["run_id"] = orchestrator.save_results(self.results_store)
+        else:
+            report = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "operations": {}, "success": False}
+        report["target"] = {
+            "san_ip": config.san_ip,
+            "host_ip": config.host_ip,
+            "volume_name": config.volume_name
+        }
+        report["duration"] = round(time.monotonic() - start, 3)
+        report["error"] = error
+        return report
+    
+    def run(self) -> Dict[str, Any]:
+        """Run all targets and return the aggregated fleet report"""
+        logger.info(f"Running fleet of {len(self.configs)} targets with {self.max_workers} workers")
+        start = time.monotonic()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # map() keeps reports in the same order as the configs
+            self.reports = list(executor.map(self.run_target, self.configs))
+        
+        report = self.get_fleet_report()
+        report["duration"] = round(time.monotonic() - start, 3)
+        logger.info(f"Fleet completed: {report['succeeded']}/{report['total']} targets succeeded")
+        return report
+    
+    def get_fleet_report(self) -> Dict[str, Any]:
+        """Aggregate per-target status reports into one fleet report"""
+        operations: Dict[str, int] = {}
+        for report in self.reports:
+            for name, done in report["operations"].items():
+                operations[name] = operations.get(name, 0) + int(bool(done))
+        
+        succeeded = sum(1 for report in self.reports if report["success"])
+        regressed = sum(1 for report in self.reports
+                        if report.get("regression") and not report["regression"]["passed"])
+        return {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total": len(self.reports),
+            "succeeded": succeeded,
+            "failed": len(self.reports) - succeeded,
+            "regressed": regressed,
+            "operations": operations,
+            "targets": self.reports,
+            "success": bool(self.reports) and succeeded == len(self.reports)
+        }
@@ -1,16 +1,42 @@
+import threading
 import time
-from typing import Dict, Any
+from typing import Callable, Dict, List, Optional, Any
 from .base_managers import BaseSanManager, BaseHostManager
+from .checkpoint import Checkpoint
+from .scheduler import StageScheduler
+from ..hosts.block_devices import wwn_matches
+from ..vendors.placement import PlacementPlanner
+from ..performance.sweep import PerformanceSweep, SweepPoint, SweepResult, KneeDetector
+from ..performance.results_store import ResultsStore
+from ..performance.regression import RegressionDetector, RegressionVerdict
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Per-array locks around disk selection and RAID creation, shared by every orchestrator in the process
+_placement_locks: Dict[str, threading.Lock] = {}
+_placement_locks_lock = threading.Lock()
+
+def _placement_lock(san_ip: str) -> threading.Lock:
+    with _placement_locks_lock:
+        return _placement_locks.setdefault(san_ip, threading.Lock())
+
 class SanAutomationOrchestrator:
     """Orchestrator class to manage the entire automation process"""
     
-    def __init__(self, san_manager: BaseSanManager, host_manager: BaseHostManager):
+    def __init__(self, san_manager: BaseSanManager, host_manager: BaseHostManager,
+                 checkpoint: Optional[Checkpoint] = None):
         self.san_manager = san_manager
         self.host_manager = host_manager
+        if checkpoint is None and host_manager.config.checkpoint_dir:
+            checkpoint = Checkpoint.for_config(host_manager.config, host_manager.config.checkpoint_dir)
+        self.checkpoint = checkpoint
+        self.resumed_stages: List[str] = []
+        self.array_id: Optional[str] = None
+        self.volume_id: Optional[str] = None
+        self.volume_wwn: Optional[str] = None
+        self.volume_mapping: Optional[Dict[str, Any]] = None
+        self.stage_results: Dict[str, Dict[str, Any]] = {}
         self.operation_status = {
             "san_connection": False,
             "host_connection": False,
@@ -20,109 +46,220 @@ class SanAutomationOrchestrator:
             "volume_mounted": False,
             "test_completed": False
         }
+        self.performance_result = None
+        self.sweep_result = None
+        self.telemetry = None
+        self.regression_verdict = None
+        self.path_distribution = None
     
     def initialize_connections(self) -> bool:
         """Initialize connections to SAN and host"""
         logger.info("Initializing connections...")
-        
+        return self.connect_san() and self.connect_host()
+    
+    def connect_san(self) -> bool:
+        """Connect to the SAN"""
         try:
-            # Connect to SAN
             if self.san_manager.connect():
                 self.operation_status["san_connection"] = True
                 logger.info("SAN connection established")
-            else:
-                logger.error("Failed to connect to SAN")
-                return False
-            
-            # Connect to host
+                return True
+            logger.error("Failed to connect to SAN")
+            return False
+        except Exception as e:
+            logger.error(f"SAN connection failed: {e}")
+            return False
+    
+    def connect_host(self) -> bool:
+        """Connect to the host"""
+        try:
             if self.host_manager.connect():
                 self.operation_status["host_connection"] = True
                 logger.info("Host connection established")
-            else:
-                logger.error("Failed to connect to host")
-                return False
-            
-            return True
+                return True
+            logger.error("Failed to connect to host")
+            return False
+        except Exception as e:
+            logger.error(f"Host connection failed: {e}")
+            return False
+    
+    def prepare_host(self) -> bool:
+        """Host-side checks that do not need the volume, e.g. fio presence and the mount point"""
+        try:
+            if self.host_manager.prepare_host(self.host_manager.config.mount_point):
+                return True
+            logger.error("Host preparation failed")
+            return False
         except Exception as e:
-            logger.error(f"Connection initialization failed: {e}")
+            logger.error(f"Host preparation failed: {e}")
             return False
     
     def create_storage_infrastructure(self) -> bool:
         """Create RAID, volume, and map to host"""
         logger.info("Creating storage infrastructure...")
-        
+        return self.create_raid_group() and self.provision_volume() and self.map_volume()
+    
+    def create_raid_group(self) -> bool:
+        """Create the RAID group and wait for it to initialize"""
         try:
-            # Get available disks
-            disks = self.san_manager.get_disks()
-            if not disks:
-                logger.error("No disks available")
-                return False
-            
-            # Select disks for RAID
-            disk_ids = [disk['id'] for disk in disks[:3]]
-            logger.info(f"Selected disks for RAID {self.san_manager.config.raid_level}: {disk_ids}")
-            
-            # Create RAID
-            array_id = self.san_manager.create_raid(disk_ids, self.san_manager.config.raid_level)
-            if not array_id:
-                logger.error("Failed to create RAID array")
-                return False
+            config = self.san_manager.config
+            if self._resume("raid_created", lambda state: self.san_manager.get_array(state['array_id']) is not None):
+                self.array_id = self.checkpoint.state['array_id']
+            else:
+                # Targets sharing an array must not plan from the same free disks at once
+                with _placement_lock(config.san_ip):
+                    array_id = self._place_raid_group()
+                if not array_id:
+                    return False
+                self.array_id = array_id
             self.operation_status["raid_created"] = True
             
-            # Wait for RAID initialization
+            # Wait for RAID initialization, returns at once for an array that is already ready
             logger.info("Waiting for RAID initialization...")
-            time.sleep(30)
-            
-            # Create volume
-            volume_id = self.san_manager.create_volume(
-                array_id, 
-                self.san_manager.config.volume_name, 
-                self.san_manager.config.volume_size_gb
-            )
-            if not volume_id:
-                logger.error("Failed to create volume")
+            if not self.san_manager.wait_for_operation(self.array_id, config.operation_timeout):
+                logger.error("RAID initialization did not complete")
                 return False
+            return True
+        except Exception as e:
+            logger.error(f"RAID creation failed: {e}")
+            return False
+    
+    def _place_raid_group(self) -> Optional[str]:
+        """Select member disks and create the RAID group; called with the array's placement lock held"""
+        config = self.san_manager.config
+        # Get available disks
+        disks = self.san_manager.get_disks()
+        if not disks:
+            logger.error("No disks available")
+            return None
+        
+        # Select disks for RAID
+        plans = PlacementPlanner().plan(disks, config.raid_level, min_usable_gb=config.volume_size_gb)
+        if not plans:
+            logger.error(f"Not enough free disks for RAID {config.raid_level}")
+            return None
+        disk_ids = plans[0].disk_ids
+        logger.info(f"Selected disks for RAID {config.raid_level}: {disk_ids} (spread: {plans[0].spread()})")
+        
+        # Create RAID
+        array_id = self.san_manager.create_raid(disk_ids, config.raid_level)
+        if not array_id:
+            logger.error("Failed to create RAID array")
+            return None
+        # The next target on this array must see these members as taken
+        invalidate = getattr(self.san_manager, 'invalidate_inventory', None)
+        if invalidate is not None:
+            invalidate()
+        self._checkpoint("raid_created", array_id=array_id, disk_ids=disk_ids)
+        return array_id
+    
+    def provision_volume(self) -> bool:
+        """Create the test volume on the RAID group"""
+        try:
+            config = self.san_manager.config
+            if self._resume("volume_created", lambda state: self.san_manager.get_volume(state['volume_id']) is not None):
+                self.volume_id = self.checkpoint.state['volume_id']
+            else:
+                volume_id = self.san_manager.create_volume(self.array_id, config.volume_name, config.volume_size_gb)
+                if not volume_id:
+                    logger.error("Failed to create volume")
+                    return False
+                self.volume_id = volume_id
+                self._checkpoint("volume_created", volume_id=volume_id)
             self.operation_status["volume_created"] = True
-            
-            # Map volume to host
-            if self.san_manager.map_volume_to_host(volume_id, self.host_manager.config.host_ip):
-                self.operation_status["volume_mapped"] = True
+            return True
+        except Exception as e:
+            logger.error(f"Volume creation failed: {e}")
+            return False
+    
+    def map_volume(self) -> bool:
+        """Map the test volume to the host"""
+        try:
+            host_ip = self.host_manager.config.host_ip
+            if not self._resume("volume_mapped",
+                                lambda state: host_ip in (self.san_manager.get_volume_hosts(state['volume_id']) or [])):
+                if not self.san_manager.map_volume_to_host(self.volume_id, host_ip):
+                    logger.error("Failed to map volume to host")
+                    return False
                 logger.info("Volume mapped to host successfully")
-            else:
-                logger.error("Failed to map volume to host")
-                return False
-            
+                self._checkpoint("volume_mapped", wwn=self._lookup_volume_wwn())
+            self.operation_status["volume_mapped"] = True
+            self.volume_wwn = (self.checkpoint.state['wwn'] if self.checkpoint else None) or self._lookup_volume_wwn()
+            try:
+                self.volume_mapping = self.san_manager.get_volume_mapping(self.volume_id, host_ip)
+            except Exception as e:
+                logger.warning(f"Could not get mapping of volume {self.volume_id}: {e}")
             return True
         except Exception as e:
-            logger.error(f"Storage infrastructure creation failed: {e}")
+            logger.error(f"Volume mapping failed: {e}")
             return False
     
+    def _lookup_volume_wwn(self) -> Optional[str]:
+        try:
+            return self.san_manager.get_volume_wwn(self.volume_id)
+        except Exception as e:
+            logger.warning(f"Could not get WWN of volume {self.volume_id}: {e}")
+            return None
+    
     def configure_host_storage(self) -> bool:
         """Configure storage on host"""
         logger.info("Configuring host storage...")
         
         try:
-            # Rescan storage
-            if not self.host_manager.rescan_storage():
-                logger.error("Failed to rescan storage")
-                return False
+            mount_point = self.host_manager.config.mount_point
             
-            # Detect new device
-            device = self.host_manager.detect_new_device()
-            if not device:
-                logger.error("No new storage device detected")
-                return False
-            logger.info(f"Detected new device: {device}")
+            def device_present(state: Dict[str, Any]) -> bool:
+                # After a reboot or rescan the same /dev name can belong to another LUN
+                if not self.host_manager.device_exists(state['device']):
+                    return False
+                if not self.volume_wwn:
+                    logger.warning(f"No WWN known for volume {self.volume_id}, cannot verify {state['device']}")
+                    return False
+                return wwn_matches(self.host_manager.device_wwid(state['device']), self.volume_wwn)
+            
+            if self._resume("volume_mounted", lambda state: (self.host_manager.get_mounted_device(mount_point)
+                                                             == state['device'] and device_present(state))):
+                self.host_manager.restore_device(self.checkpoint.state['device'], self.volume_wwn)
+                self.operation_status["volume_mounted"] = True
+                return True
+            
+            if self._resume("device_detected", device_present):
+                device = self.checkpoint.state['device']
+                self.host_manager.restore_device(device, self.volume_wwn)
+            else:
+                # Rescan storage
+                mapping = dict(self.volume_mapping, wwn=self.volume_wwn) if self.volume_mapping else None
+                if not self.host_manager.rescan_storage(mapping):
+                    logger.error("Failed to rescan storage")
+                    return False
+                
+                # Detect new device
+                device = self.host_manager.detect_new_device(wwn=self.volume_wwn)
+                if not device:
+                    logger.error("No new storage device detected")
+                    return False
+                logger.info(f"Detected new device: {device}")
+                self._checkpoint("device_detected", device=device)
+            
+            if self.host_manager.config.test_mode == "raw":
+                # fio runs on the block device itself; the device stands in for the mounted volume
+                logger.info(f"Raw device mode: skipping format and mount of {device}")
+                self.host_manager.device = device
+                self.operation_status["volume_mounted"] = True
+                return True
             
             # Format device
-            if not self.host_manager.format_device(device):
-                logger.error("Failed to format device")
-                return False
+            if not self._resume("device_formatted", device_present):
+                if not self.host_manager.format_device(device):
+                    logger.error("Failed to format device")
+                    return False
+                self._checkpoint("device_formatted")
             
             # Mount device
-            if not self.host_manager.mount_device(device, self.host_manager.config.mount_point):
+            if not self.host_manager.mount_device(device, mount_point):
                 logger.error("Failed to mount device")
                 return False
+            self._checkpoint("volume_mounted", mount_point=mount_point)
             self.operation_status["volume_mounted"] = True
             
             return True
@@ -130,15 +267,43 @@ class SanAutomationOrchestrator:
             logger.error(f"Host storage configuration failed: {e}")
             return False
     
+    def _resume(self, stage: str, still_holds: Callable[[Dict[str, Any]], bool]) -> bool:
+        """Check whether a checkpointed stage can be skipped, reconciling it against the real array/host"""
+        if self.checkpoint is None or not self.checkpoint.done(stage):
+            return False
+        try:
+            holds = still_holds(self.checkpoint.state)
+        except Exception as e:
+            logger.warning(f"Could not verify checkpointed stage {stage}: {e}")
+            holds = False
+        
+        if holds:
+            logger.info(f"Resuming past {stage}")
+            self.resumed_stages.append(stage)
+            return True
+        # Whatever was built on top of this stage is stale as well
+        logger.warning(f"Checkpointed stage {stage} no longer matches the array/host, redoing it")
+        self.checkpoint.invalidate(stage)
+        return False
+    
+    def _checkpoint(self, stage: str, **state):
+        if self.checkpoint is not None:
+            self.checkpoint.complete(stage, **state)
+    
     def run_performance_test(self) -> bool:
         """Run performance test"""
         logger.info("Running performance test...")
         
         try:
+            raw = self.host_manager.config.test_mode == "raw"
             result = self.host_manager.run_performance_test(
                 self.host_manager.config.mount_point, 
-                self.host_manager.config.test_duration
+                self.host_manager.config.test_duration,
+                device=self.host_manager.device if raw else None
             )
+            self.performance_result = result.get('result')
+            self.telemetry = result.get('telemetry')
+            self.path_distribution = result.get('paths')
             if result.get('success', False):
                 self.operation_status["test_completed"] = True
                 logger.info("Performance test completed successfully")
@@ -150,6 +315,84 @@ class SanAutomationOrchestrator:
             logger.error(f"Performance test failed: {e}")
             return False
     
+    def run_performance_sweep(self, points: List[SweepPoint], duration: int = 30,
+                              knee_detector: Optional[KneeDetector] = None) -> Optional[SweepResult]:
+        """Run a fio sweep matrix on the mounted volume, or on the device itself in raw test mode"""
+        logger.info(f"Running performance sweep of {len(points)} points...")
+        
+        try:
+            raw = self.host_manager.config.test_mode == "raw"
+            sweep = PerformanceSweep(
+                self.host_manager,
+                self.host_manager.config.mount_point,
+                duration=duration,
+                knee_detector=knee_detector,
+                device=self.host_manager.device if raw else None
+            )
+            self.sweep_result = sweep.run(points)
+            logger.info(f"Performance sweep completed with {len(self.sweep_result)} points")
+            return self.sweep_result
+        except Exception as e:
+            logger.error(f"Performance sweep failed: {e}")
+            return None
+    
+    def check_regression(self, detector: RegressionDetector) -> Optional[RegressionVerdict]:
+        """Compare the performance result against its historical baseline"""
+        if self.performance_result is None:
+            logger.warning("No performance result to check for regressions")
+            return None
+        
+        try:
+            self.regression_verdict = detector.check(self.host_manager.config, self.performance_result)
+            if self.regression_verdict.passed:
+                logger.info("No performance regression against baseline")
+            else:
+                regressed = ", ".join(check.metric for check in self.regression_verdict.regressions)
+                logger.error(f"Performance regression detected: {regressed}")
+            return self.regression_verdict
+        except Exception as e:
+            logger.error(f"Regression check failed: {e}")
+            return None
+    
+    def save_results(self, store: ResultsStore, run_id: Optional[str] = None) -> Optional[str]:
+        """Record the status report and performance results in a results store"""
+        try:
+            run_id = store.record_run(
+                self.host_manager.config,
+                self.get_status_report(),
+                performance=self.performance_result,
+                sweep=self.sweep_result,
+                run_id=run_id
+            )
+            logger.info(f"Results recorded as run {run_id}")
+            return run_id
+        except Exception as e:
+            logger.error(f"Failed to record results: {e}")
+            return None
+    
+    def build_pipeline(self, max_workers: int = 4, performance_test: bool = True) -> StageScheduler:
+        """The built-in pipeline as a DAG; SAN and host stages overlap until the volume is mapped"""
+        scheduler = StageScheduler(max_workers)
+        scheduler.add("connect_san", self.connect_san, resources=("array",))
+        scheduler.add("connect_host", self.connect_host, resources=("host",))
+        scheduler.add("prepare_host", self.prepare_host, depends=("connect_host",), resources=("host",))
+        scheduler.add("create_raid", self.create_raid_group, depends=("connect_san",), resources=("array",))
+        scheduler.add("create_volume", self.provision_volume, depends=("create_raid",), resources=("array",))
+        scheduler.add("map_volume", self.map_volume, depends=("create_volume", "connect_host"), resources=("array",))
+        scheduler.add("configure_host", self.configure_host_storage, depends=("map_volume", "prepare_host"),
+                      resources=("host",))
+        if performance_test:
+            scheduler.add("performance_test", self.run_performance_test, depends=("configure_host",),
+                          resources=("host",))
+        return scheduler
+    
+    def run_pipeline(self, scheduler: Optional[StageScheduler] = None) -> bool:
+        """Run the pipeline DAG, skipping every stage downstream of a failure"""
+        scheduler = scheduler or self.build_pipeline()
+        scheduler.run()
+        self.stage_results = scheduler.report()
+        return scheduler.success
+    
     def cleanup(self) -> bool:
         """Cleanup resources"""
         logger.info("Cleaning up resources...")
@@ -177,5 +420,12 @@ class SanAutomationOrchestrator:
         return {
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "operations": self.operation_status,
+            "performance": self.performance_result.to_dict() if self.performance_result else None,
+            "sweep": self.sweep_result.to_dict() if self.sweep_result else None,
+            "telemetry": self.telemetry.summary() if self.telemetry else None,
+            "paths": self.path_distribution,
+            "regression": self.regression_verdict.to_dict() if self.regression_verdict else None,
+            "resumed": list(self.resumed_stages),
+            "stages": self.stage_results,
             "success": all(self.operation_status.values())
         }
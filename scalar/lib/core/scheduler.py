@@ -0,0 +1,137 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from ..utils.logger import get_logger
+from ..utils.metrics import MetricsRegistry, get_registry
+
+logger = get_logger(__name__)
+
+class Stage:
+    """A pipeline step with the stages it needs and the resources it holds exclusively"""
+    
+    __slots__ = ('name', 'func', 'depends', 'resources')
+    
+    def __init__(self, name: str, func: Callable[[], bool], depends: Tuple[str, ...] = (),
+                 resources: Tuple[str, ...] = ()):
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.resources = tuple(resources)
+
+class StageResult:
+    """Outcome and timing of one stage run"""
+    
+    __slots__ = ('name', 'success', 'skipped', 'error', 'started', 'duration')
+    
+    def __init__(self, name: str, success: bool = False, skipped: bool = False, error: Optional[str] = None,
+                 started: Optional[float] = None, duration: float = 0.0):
+        self.name = name
+        self.success = success
+        self.skipped = skipped
+        self.error = error
+        # Seconds since the scheduler started, so overlap between stages is visible
+        self.started = started
+        self.duration = duration
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'name'}
+
+class StageScheduler:
+    """Run stages as a DAG: a stage starts once its dependencies succeeded and its resources are free"""
+    
+    def __init__(self, max_workers: int = 4, registry: Optional[MetricsRegistry] = None):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.max_workers = max_workers
+        self.registry = registry or get_registry()
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, StageResult] = {}
+    
+    def add(self, name: str, func: Callable[[], bool], depends: Tuple[str, ...] = (),
+            resources: Tuple[str, ...] = ()) -> "StageScheduler":
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, depends, resources)
+        return self
+    
+    def validate(self):
+        """Raise ValueError for unknown dependencies or cycles"""
+        for stage in self.stages.values():
+            for dependency in stage.depends:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+        
+        visiting, done = set(), set()
+        
+        def _visit(name: str, path: List[str]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends:
+                _visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+        
+        for name in self.stages:
+            _visit(name, [])
+    
+    @property
+    def success(self) -> bool:
+        return bool(self.results) and all(result.success for result in self.results.values())
+    
+    def run(self) -> Dict[str, StageResult]:
+        """Run every stage; stages downstream of a failure are skipped"""
+        self.validate()
+        self.results = {}
+        origin = time.monotonic()
+        pending = list(self.stages)  # insertion order breaks ties
+        running: Dict[Future, Stage] = {}
+        held: set = set()
+        
+        def _run(stage: Stage) -> StageResult:
+            started = time.monotonic()
+            result = StageResult(stage.name, started=round(started - origin, 3))
+            try:
+                with self.registry.time_block("pipeline_stage", stage=stage.name):
+                    result.success = bool(stage.func())
+                if not result.success:
+                    result.error = "Stage reported failure"
+            except Exception as e:
+                logger.error(f"Stage {stage.name} raised: {e}")
+                result.error = str(e)
+            result.duration = round(time.monotonic() - started, 3)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    failed = [dep for dep in stage.depends
+                              if dep in self.results and not self.results[dep].success]
+                    if failed:
+                        logger.info(f"Skipping stage {name}: {', '.join(failed)} did not succeed")
+                        self.results[name] = StageResult(name, skipped=True, error=f"Dependency failed: {failed[0]}")
+                        pending.remove(name)
+                        continue
+                    ready = all(dep in self.results for dep in stage.depends)
+                    if ready and not held.intersection(stage.resources) and len(running) < self.max_workers:
+                        held.update(stage.resources)
+                        running[executor.submit(_run, stage)] = stage
+                        pending.remove(name)
+                
+                if not running:
+                    # A skip late in this pass can resolve stages checked before it
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    held.difference_update(stage.resources)
+                    self.results[stage.name] = future.result()
+        
+        return self.results
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage outcome and timings, in declaration order"""
+        return {name: self.results[name].to_dict() for name in self.stages if name in self.results}
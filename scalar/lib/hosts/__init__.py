@@ -1,16 +1,35 @@
-from .base_host import BaseHost
-from .linux_host import LinuxHost
-from .windows_host import WindowsHost
-from .esxi_host import ESXiHost
+from importlib import import_module
+from ..utils.registry import PluginRegistry
 
-__all__ = ['BaseHost', 'LinuxHost', 'WindowsHost', 'ESXiHost']
-
-HOST_MAP = {
-    'linux': LinuxHost,
-    'windows': WindowsHost,
-    'esxi': ESXiHost
+# Host modules pull in the SSH client, so they are imported on first use
+_LAZY_CLASSES = {
+    'BaseHost': '.base_host',
+    'LinuxHost': '.linux_host',
+    'WindowsHost': '.windows_host',
+    'ESXiHost': '.esxi_host',
+    'SSHConnectionPool': '.ssh_pool',
+    'get_default_pool': '.ssh_pool',
+    'CommandStream': '.command_stream',
 }
 
+__all__ = ['BaseHost', 'LinuxHost', 'WindowsHost', 'ESXiHost', 'SSHConnectionPool', 'get_default_pool', 'CommandStream',
+           'HOST_MAP', 'get_host_class']
+
+def __getattr__(name: str):
+    if name not in _LAZY_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_CLASSES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+# Third-party hosts register under the 'san_automation.hosts' entry point group
+HOST_MAP = PluginRegistry('host', entry_point_group='san_automation.hosts')
+HOST_MAP.register('linux', f'{__name__}.linux_host:LinuxHost')
+HOST_MAP.register('windows', f'{__name__}.windows_host:WindowsHost')
+HOST_MAP.register('esxi', f'{__name__}.esxi_host:ESXiHost')
+
 def get_host_class(host_type: str):
     """Get host class by type"""
-    return HOST_MAP.get(host_type.lower(), LinuxHost)
+    if host_type in HOST_MAP:
+        return HOST_MAP[host_type]
+    return HOST_MAP['linux']
@@ -1,24 +1,29 @@
-import paramiko
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, Optional, Any
 from ..core.base_managers import BaseHostManager
 from ..config import Config
+from .ssh_pool import SSHConnectionPool, get_default_pool
+from .command_stream import CommandStream
+from ..utils.metrics import get_registry
 
 class BaseHost(BaseHostManager, ABC):
     """Base class for host implementations"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, pool: Optional[SSHConnectionPool] = None):
         super().__init__(config)
         self.ssh_client = None
+        self.pool = pool or get_default_pool()
     
     def connect(self) -> bool:
+        if self.connected:
+            return True
         try:
-            self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.ssh_client.connect(
+            # Reuses a live transport to this host/user if one is pooled
+            self.ssh_client = self.pool.acquire(
                 self.config.host_ip,
-                username=self.config.host_username,
-                password=self.config.host_password,
+                self.config.host_username,
+                self.config.host_password,
                 timeout=30
             )
             self.connected = True
@@ -28,25 +33,70 @@ class BaseHost(BaseHostManager, ABC):
             return False
     
     def disconnect(self) -> bool:
-        if self.ssh_client:
-            self.ssh_client.close()
+        if self.connected:
+            # The transport stays pooled for the next run
+            self.pool.release(self.config.host_ip, self.config.host_username)
+        self.ssh_client = None
         self.connected = False
         return True
     
     def execute_command(self, command: str, timeout: int = 30) -> Dict[str, Any]:
         """Execute command on host"""
+        start = time.perf_counter()
         try:
-            stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=timeout)
+            with self.pool.limit(self.config.host_ip):
+                channel = self.ssh_client.get_transport().open_session()
+                channel.exec_command(command)
+                # Reading stdout to the end before stderr would stall a command that fills the stderr pipe
+                stream = CommandStream(channel, read_timeout=timeout)
+                raw_output, raw_error = stream.read_all()
+                exit_code = stream.exit_code if stream.exit_code is not None else -1
+            get_registry().record_command(command, exit_code, time.perf_counter() - start,
+                                          len(raw_output) + len(raw_error))
+            output = raw_output.decode().strip()
+            error = raw_error.decode().strip()
             return {
-                "stdout": stdout.read().decode().strip(),
-                "stderr": stderr.read().decode().strip(),
-                "exit_code": stdout.channel.recv_exit_status(),
-                "success": stdout.channel.recv_exit_status() == 0
+                "stdout": output,
+                "stderr": error,
+                "exit_code": exit_code,
+                "success": exit_code == 0
             }
         except Exception as e:
+            get_registry().record_command(command, -1, time.perf_counter() - start, 0)
             self._handle_error(f"Command execution failed: {e}")
             return {"stdout": "", "stderr": str(e), "exit_code": -1, "success": False}
     
+    def stream_command(self, command: str, timeout: Optional[float] = None, read_timeout: Optional[float] = 30.0,
+                       line_callback: Optional[Callable[[str, str], None]] = None) -> CommandStream:
+        """Start command on host and stream its output line by line
+        
+        The stream holds one of the host's channel slots until it is closed, so always use it as a
+        context manager, ``with host.stream_command(...) as stream:``; a stream left before its end
+        otherwise keeps the slot.
+        """
+        self.pool.acquire_slot(self.config.host_ip)
+        try:
+            channel = self.ssh_client.get_transport().open_session()
+            channel.exec_command(command)
+        except Exception:
+            self.pool.release_slot(self.config.host_ip)
+            raise
+        start = time.perf_counter()
+        
+        def _on_close():
+            self.pool.release_slot(self.config.host_ip)
+            exit_code = stream.exit_code if stream.exit_code is not None else -1
+            get_registry().record_command(command, exit_code, time.perf_counter() - start, stream.bytes_received)
+        
+        stream = CommandStream(
+            channel,
+            timeout=timeout,
+            read_timeout=read_timeout,
+            line_callback=line_callback,
+            on_close=_on_close
+        )
+        return stream
+    
     def _handle_error(self, message: str, exception: Exception = None):
         """Handle errors consistently"""
         from ..utils.logger import get_logger
@@ -0,0 +1,179 @@
+import re
+from typing import Dict, List, Optional, Any, Tuple
+
+# One tab-separated line per /sys/block entry: name, wwid, size in 512-byte sectors, vendor, model, serial
+SNAPSHOT_COMMAND = (
+    "for d in /sys/block/*; do "
+    "printf '%s\\t%s\\t%s\\t%s\\t%s\\t%s\\n' \"${d##*/}\" "
+    "\"$(cat $d/wwid $d/device/wwid 2>/dev/null | head -n 1)\" "
+    "\"$(cat $d/size 2>/dev/null)\" "
+    "\"$(cat $d/device/vendor 2>/dev/null)\" "
+    "\"$(cat $d/device/model 2>/dev/null)\" "
+    "\"$(cat $d/device/serial 2>/dev/null)\"; "
+    "done"
+)
+
+# Virtual and stacked devices are never the raw LUN
+_IGNORED_DEVICES = re.compile(r'^(loop|ram|zram|sr|dm-|md|nbd|fd)')
+
+def normalize_wwn(wwn: Optional[str]) -> str:
+    """Lowercase hex digits of a WWN/WWID without its naa./eui. prefix, designator or separators"""
+    if not wwn:
+        return ''
+    value = wwn.strip().lower()
+    for prefix in ('naa.', 'eui.', 't10.', '0x'):
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+            break
+    value = re.sub(r'[\s:\-]', '', value)
+    # scsi_id prints NAA 5/6 identifiers behind a '3' designator type
+    if value.startswith('3') and len(value) in (17, 33):
+        value = value[1:]
+    return value
+
+def wwn_matches(device_wwid: Optional[str], wwn: Optional[str]) -> bool:
+    """Compare WWNs in any of the common notations; never matches on partial values"""
+    wanted = normalize_wwn(wwn)
+    return bool(wanted) and normalize_wwn(device_wwid) == wanted
+
+def parse_snapshot(output: str) -> Dict[str, Dict[str, Any]]:
+    """Parse SNAPSHOT_COMMAND output into {name: {wwid, size_bytes, vendor, model, serial}}"""
+    devices = {}
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 6 or not fields[0]:
+            continue
+        name, wwid, size, vendor, model, serial = (field.strip() for field in fields[:6])
+        devices[name] = {
+            "wwid": wwid,
+            "size_bytes": int(size) * 512 if size.isdigit() else 0,
+            "vendor": vendor,
+            "model": model,
+            "serial": serial
+        }
+    return devices
+
+def is_candidate(name: str, device: Dict[str, Any]) -> bool:
+    """A real disk with capacity, not a loop/dm/optical device"""
+    return not _IGNORED_DEVICES.match(name) and device.get("size_bytes", 0) > 0
+
+def find_by_wwn(devices: Dict[str, Dict[str, Any]], wwn: str) -> List[str]:
+    """Names of every path device carrying wwn, sorted"""
+    return sorted(
+        (name for name, device in devices.items() if is_candidate(name, device) and wwn_matches(device["wwid"], wwn)),
+        key=_natural_key
+    )
+
+def new_devices(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Names of candidate devices present now but not in baseline, or present with a different WWID"""
+    return sorted(
+        (name for name, device in current.items()
+         if is_candidate(name, device) and (name not in baseline or baseline[name]["wwid"] != device["wwid"])),
+        key=_natural_key
+    )
+
+# One line per dm-multipath map: dm name, map name, WWID, path devices, device-mapper table
+MULTIPATH_COMMAND = (
+    "for d in /sys/block/dm-*; do "
+    "u=$(cat $d/dm/uuid 2>/dev/null); case \"$u\" in mpath-*) "
+    "n=$(cat $d/dm/name); "
+    "printf '%s\\t%s\\t%s\\t%s\\t%s\\n' \"${d##*/}\" \"$n\" \"${u#mpath-}\" "
+    "\"$(ls $d/slaves 2>/dev/null | tr '\\n' ' ')\" \"$(dmsetup table \"$n\" 2>/dev/null | head -n 1)\";; "
+    "esac; done; true"
+)
+
+_PATH_SELECTOR = re.compile(r'\b(round-robin|service-time|queue-length|historical-service-time)\b')
+
+def parse_multipath(output: str) -> List[Dict[str, Any]]:
+    """Parse MULTIPATH_COMMAND output into [{dm, name, wwid, paths, policy}]"""
+    maps = []
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 4 or not fields[0]:
+            continue
+        table = fields[4] if len(fields) > 4 else ''
+        selector = _PATH_SELECTOR.search(table)
+        maps.append({
+            "dm": fields[0].strip(),
+            "name": fields[1].strip(),
+            "wwid": fields[2].strip(),
+            "paths": sorted(fields[3].split(), key=_natural_key),
+            "policy": selector.group(1) if selector else None
+        })
+    return maps
+
+def path_stats_command(paths: List[str]) -> str:
+    """Print '<name> <state> <sysfs stat fields>' for each path device"""
+    names = ' '.join(paths)
+    return (f"for p in {names}; do "
+            "echo \"$p $(cat /sys/block/$p/device/state 2>/dev/null || echo unknown) $(cat /sys/block/$p/stat)\"; "
+            "done")
+
+def parse_path_stats(output: str) -> Dict[str, Dict[str, Any]]:
+    """Parse path_stats_command output; counters follow Documentation/block/stat.rst"""
+    stats = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 9 or not fields[2].isdigit():
+            continue
+        counters = [int(value) for value in fields[2:]]
+        stats[fields[0]] = {
+            "state": fields[1],
+            "read_ios": counters[0],
+            "read_sectors": counters[2],
+            "write_ios": counters[4],
+            "write_sectors": counters[6]
+        }
+    return stats
+
+def path_distribution(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-path I/O between two parse_path_stats snapshots, with each path's share of all I/Os"""
+    deltas = {}
+    for name, end in after.items():
+        start = before.get(name, {})
+        deltas[name] = {
+            "state": end["state"],
+            "read_ios": end["read_ios"] - start.get("read_ios", 0),
+            "write_ios": end["write_ios"] - start.get("write_ios", 0),
+            "read_bytes": (end["read_sectors"] - start.get("read_sectors", 0)) * 512,
+            "write_bytes": (end["write_sectors"] - start.get("write_sectors", 0)) * 512
+        }
+    total = sum(delta["read_ios"] + delta["write_ios"] for delta in deltas.values())
+    for delta in deltas.values():
+        delta["share"] = round((delta["read_ios"] + delta["write_ios"]) / total, 4) if total else 0.0
+    return deltas
+
+def normalize_target(target: str) -> str:
+    """FC WWPNs as sysfs prints them (0x plus lowercase hex); iSCSI IQNs unchanged"""
+    value = target.strip()
+    if value.lower().startswith(('iqn.', 'eui.', 'naa.')):
+        return value
+    return '0x' + re.sub(r'[:\-]', '', value.lower()).replace('0x', '', 1)
+
+def scsi_target_command(targets: List[str]) -> str:
+    """Print H:C:T of every SCSI target whose FC port name or iSCSI target name is in targets"""
+    names = ' '.join(f"'{normalize_target(target)}'" for target in targets)
+    return (
+        f"for want in {names}; do "
+        "for t in /sys/class/fc_transport/target*; do "
+        "[ \"$(cat $t/port_name 2>/dev/null)\" = \"$want\" ] && echo ${t##*target}; done; "
+        "for s in /sys/class/iscsi_session/session*; do "
+        "[ \"$(cat $s/targetname 2>/dev/null)\" = \"$want\" ] && "
+        "for t in $s/device/target*; do [ -e \"$t\" ] && echo ${t##*target}; done; done; "
+        "done; true"
+    )
+
+def parse_hctl(output: str) -> List[Tuple[int, int, int]]:
+    """Parse 'H:C:T' lines, dropping duplicates"""
+    found = []
+    for line in output.split():
+        parts = line.strip().split(':')
+        if len(parts) == 3 and all(part.isdigit() for part in parts):
+            hct = tuple(int(part) for part in parts)
+            if hct not in found:
+                found.append(hct)
+    return found
+
+def _natural_key(name: str):
+    # sdz sorts before sdaa
+    return (len(name), name)
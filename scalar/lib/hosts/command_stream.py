@@ -0,0 +1,126 @@
+import time
+from typing import Callable, Iterator, Optional, Tuple
+from ..core.exceptions import HostError
+
+class CommandStream:
+    """Iterate over (source, line) pairs of a running remote command"""
+    
+    def __init__(self, channel, timeout: Optional[float] = None, read_timeout: Optional[float] = 30.0,
+                 line_callback: Optional[Callable[[str, str], None]] = None, chunk_size: int = 32768,
+                 max_line_length: int = 65536, poll_interval: float = 0.05,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.channel = channel
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.line_callback = line_callback
+        self.chunk_size = chunk_size
+        self.max_line_length = max_line_length
+        self.poll_interval = poll_interval
+        self.exit_code: Optional[int] = None
+        self.bytes_received = 0
+        self._on_close = on_close
+        self._closed = False
+    
+    def __enter__(self) -> "CommandStream":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        # Only the current partial line of each stream is kept in memory
+        buffers = {"stdout": bytearray(), "stderr": bytearray()}
+        try:
+            for source, data in self._chunks():
+                buffers[source] += data
+                yield from self._drain(source, buffers[source])
+            for source, buffer in buffers.items():
+                if buffer:
+                    yield self._emit(source, bytes(buffer))
+                    buffer.clear()
+        finally:
+            self.close()
+    
+    def read_all(self) -> Tuple[bytes, bytes]:
+        """Whole stdout and stderr of the command, both drained as data arrives so neither pipe fills up"""
+        output = {"stdout": bytearray(), "stderr": bytearray()}
+        for source, data in self._chunks():
+            output[source] += data
+        return bytes(output["stdout"]), bytes(output["stderr"])
+    
+    def _chunks(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield (source, data) as either stream has data, until the command exits; closes the stream"""
+        start = time.monotonic()
+        last_data = start
+        readers = {"stdout": (self.channel.recv_ready, self.channel.recv),
+                   "stderr": (self.channel.recv_stderr_ready, self.channel.recv_stderr)}
+        
+        try:
+            while True:
+                # close() from another thread ends the stream without an exit status
+                if self._closed:
+                    return
+                received = False
+                for source, (ready, recv) in readers.items():
+                    if not ready():
+                        continue
+                    data = recv(self.chunk_size)
+                    if not data:
+                        continue
+                    received = True
+                    self.bytes_received += len(data)
+                    yield source, data
+                
+                now = time.monotonic()
+                if received:
+                    last_data = now
+                    continue
+                
+                if self.channel.exit_status_ready() and not self.channel.recv_ready() \
+                        and not self.channel.recv_stderr_ready():
+                    break
+                if self.timeout is not None and now - start > self.timeout:
+                    raise HostError(f"Command exceeded {self.timeout} seconds")
+                if self.read_timeout is not None and now - last_data > self.read_timeout:
+                    raise HostError(f"No output received for {self.read_timeout} seconds")
+                time.sleep(self.poll_interval)
+            
+            self.exit_code = self.channel.recv_exit_status()
+        finally:
+            self.close()
+    
+    def _drain(self, source: str, buffer: bytearray) -> Iterator[Tuple[str, str]]:
+        """Yield complete lines from buffer, splitting overlong lines at max_line_length"""
+        while True:
+            end = buffer.find(b"\n")
+            if end == -1:
+                if len(buffer) < self.max_line_length:
+                    return
+                end = self.max_line_length
+                line = bytes(buffer[:end])
+                del buffer[:end]
+            else:
+                line = bytes(buffer[:end])
+                del buffer[:end + 1]
+            yield self._emit(source, line)
+    
+    def _emit(self, source: str, line: bytes) -> Tuple[str, str]:
+        text = line.decode(errors="replace").rstrip("\r")
+        if self.line_callback:
+            self.line_callback(source, text)
+        return source, text
+    
+    @property
+    def success(self) -> bool:
+        return self.exit_code == 0
+    
+    def close(self):
+        """Stop the command and release its channel"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.channel.close()
+        finally:
+            if self._on_close:
+                self._on_close()
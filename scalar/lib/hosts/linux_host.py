@@ -1,12 +1,50 @@
+import os
 import re
+import time
+import uuid
 from typing import Dict, Optional, Any
+from ..config import Config
+from ..core.exceptions import HostError
 from .base_host import BaseHost
+from .block_devices import (MULTIPATH_COMMAND, SNAPSHOT_COMMAND, find_by_wwn, new_devices, parse_hctl,
+                            parse_multipath, parse_path_stats, parse_snapshot, path_distribution,
+                            path_stats_command, scsi_target_command, wwn_matches)
+from ..performance.fio_parser import parse_fio_lines
+from ..performance.telemetry import TelemetryCapture
+from ..utils.helpers import wait_for
+
+# Skip inode table/journal zeroing and the whole-device discard that dominate mkfs time on large LUNs
+FAST_MKFS_OPTIONS = {
+    'ext4': "-F -E lazy_itable_init=1,lazy_journal_init=1,nodiscard",
+    'xfs': "-f -K",
+}
+
+# Host-local scratch space for raw-mode job files and fio telemetry logs, never on the volume under test
+HOST_WORK_DIR = "/tmp/san_automation"
 
 class LinuxHost(BaseHost):
     """Linux host implementation"""
     
-    def rescan_storage(self) -> bool:
+    def __init__(self, config: Config, **kwargs):
+        super().__init__(config, **kwargs)
+        self.device = None
+        self._device_baseline: Optional[Dict[str, Dict[str, Any]]] = None
+        self.targeted_rescan_timeout = 5.0
+        self.multipath: Optional[Dict[str, Any]] = None
+        self.multipath_timeout = 10.0
+        self._multipathd_running: Optional[bool] = None
+    
+    def rescan_storage(self, mapping: Optional[Dict[str, Any]] = None) -> bool:
+        """Rescan only the mapped target/LUN when mapping gives them, else every SCSI host"""
         try:
+            # Baseline for detect_new_device, taken before new LUNs can appear
+            self._device_baseline = self.snapshot_block_devices()
+            
+            if mapping and mapping.get('lun') is not None:
+                if self._targeted_rescan(mapping):
+                    return True
+                self._handle_error("Targeted rescan did not surface the LUN, falling back to a full rescan")
+            
             # Rescan SCSI bus
             commands = [
                 "for host in /sys/class/scsi_host/host*/scan; do echo '- - -' > $host; done",
@@ -24,36 +62,148 @@ class LinuxHost(BaseHost):
             self._handle_error(f"Storage rescan failed: {e}")
             return False
     
-    def detect_new_device(self) -> Optional[str]:
+    def _targeted_rescan(self, mapping: Dict[str, Any]) -> bool:
+        """Scan H:C:T:L of the mapped target ports only; True once the LUN is visible"""
+        lun = int(mapping['lun'])
+        targets = mapping.get('targets') or []
+        if isinstance(targets, str):
+            targets = [targets]
+        
+        hctl = []
+        if targets:
+            result = self.execute_command(scsi_target_command(targets))
+            hctl = parse_hctl(result['stdout'])
+        if hctl:
+            scans = [f"echo '{channel} {target} {lun}' > /sys/class/scsi_host/host{host}/scan"
+                     for host, channel, target in hctl]
+        else:
+            # Unknown target ports: still only probe the one LUN id on each host
+            scans = [f"for host in /sys/class/scsi_host/host*/scan; do echo '- - {lun}' > $host; done"]
+        self.execute_command("; ".join(scans))
+        
+        def _visible() -> bool:
+            current = self.snapshot_block_devices(settle=True)
+            if current is None:
+                return False
+            if mapping.get('wwn'):
+                return bool(find_by_wwn(current, mapping['wwn']))
+            return bool(new_devices(self._device_baseline or {}, current))
+        
+        return wait_for(_visible, self.targeted_rescan_timeout, initial_delay=0.2, max_delay=1.0)
+    
+    def snapshot_block_devices(self, settle: bool = False) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read WWID, size, vendor, model and serial of every /sys/block device in one command"""
+        command = SNAPSHOT_COMMAND
+        if settle:
+            # Returns as soon as udev has processed the add events of new LUNs
+            command = f"udevadm settle --timeout=5 2>/dev/null; {command}"
+        result = self.execute_command(command)
+        if not result['success']:
+            return None
+        return parse_snapshot(result['stdout'])
+    
+    def detect_new_device(self, wwn: Optional[str] = None, timeout: float = 60) -> Optional[str]:
+        """Find the LUN by its WWN, or as the device that appeared since rescan_storage, polling up to timeout"""
         try:
-            # Get block devices
-            result = self.execute_command("lsblk -d -o NAME,SIZE,MODEL,TYPE | grep -E '^(sd|nvme)'")
-            devices = result['stdout'].splitlines()
-            
-            # Look for new devices (simplified logic)
-            for device in devices:
-                if 'LUN' in device or 'VOLUME' in device:
-                    parts = device.split()
-                    if parts:
-                        return f"/dev/{parts[0]}"
-            
-            # Fallback to checking /dev/sdX devices
-            result = self.execute_command("ls /dev/sd* | grep -E '/dev/sd[b-z]'")
-            if result['success'] and result['stdout']:
-                return result['stdout'].split()[0]
+            baseline = self._device_baseline
+            if not wwn and baseline is None:
+                return self._detect_by_model()
+            
+            found: Dict[str, str] = {}
             
+            def _appeared() -> bool:
+                current = self.snapshot_block_devices(settle=True)
+                if current is None:
+                    return False
+                candidates = find_by_wwn(current, wwn) if wwn else new_devices(baseline, current)
+                if candidates:
+                    found['device'] = f"/dev/{candidates[0]}"
+                    found['wwid'] = wwn or current[candidates[0]]['wwid']
+                    # Paths of one multipath LUN share a WWID; several WWIDs mean an ambiguous pick
+                    if not wwn and len({current[name]['wwid'] or name for name in candidates}) > 1:
+                        self._handle_error(f"Several new devices appeared, using {candidates[0]}: {candidates}")
+                return bool(candidates)
+            
+            if wait_for(_appeared, timeout, initial_delay=0.2, max_delay=2.0):
+                return self._prefer_multipath(found['device'], found['wwid'])
+            self._handle_error(f"No device {'with WWN ' + wwn if wwn else 'appeared'} within {timeout} seconds")
             return None
         except Exception as e:
             self._handle_error(f"Device detection failed: {e}")
             return None
     
-    def format_device(self, device: str, filesystem: str = "ext4") -> bool:
+    def _prefer_multipath(self, device: str, wwid: Optional[str]) -> Optional[str]:
+        """Swap a path device for its dm-multipath map, verifying path count and policy"""
+        self.multipath = self.find_multipath_device(wwid) if wwid else None
+        min_paths = self.config.min_paths
+        if self.multipath is None:
+            if min_paths > 1:
+                self._handle_error(f"No multipath device for {device}, but {min_paths} paths are required")
+                return None
+            return device
+        
+        paths, policy = self.multipath['paths'], self.multipath['policy']
+        if len(paths) < min_paths:
+            self._handle_error(f"Multipath device {self.multipath['name']} has {len(paths)} paths, "
+                               f"{min_paths} required")
+            return None
+        if self.config.multipath_policy and policy != self.config.multipath_policy:
+            self._handle_error(f"Multipath device {self.multipath['name']} uses path selector {policy}, "
+                               f"expected {self.config.multipath_policy}")
+            return None
+        return f"/dev/mapper/{self.multipath['name']}"
+    
+    def find_multipath_device(self, wwid: str) -> Optional[Dict[str, Any]]:
+        """Get the dm-multipath map of a LUN, waiting briefly for multipathd to assemble it"""
+        if self._multipathd_running is None:
+            self._multipathd_running = self.execute_command("pidof multipathd")['success']
+        if not self._multipathd_running:
+            return None
+        
+        found: Dict[str, Dict[str, Any]] = {}
+        
+        def _assembled() -> bool:
+            result = self.execute_command(MULTIPATH_COMMAND)
+            for mpath in parse_multipath(result['stdout']):
+                if wwn_matches(mpath['wwid'], wwid) and mpath['paths']:
+                    found['map'] = mpath
+                    return True
+            return False
+        
+        if wait_for(_assembled, self.multipath_timeout, initial_delay=0.2, max_delay=1.0):
+            return found['map']
+        return None
+    
+    def _detect_by_model(self) -> Optional[str]:
+        """Legacy heuristic for when neither a WWN nor a pre-rescan baseline is known"""
+        # Get block devices
+        result = self.execute_command("lsblk -d -o NAME,SIZE,MODEL,TYPE | grep -E '^(sd|nvme)'")
+        devices = result['stdout'].splitlines()
+        
+        # Look for new devices (simplified logic)
+        for device in devices:
+            if 'LUN' in device or 'VOLUME' in device:
+                parts = device.split()
+                if parts:
+                    return f"/dev/{parts[0]}"
+        
+        # Fallback to checking /dev/sdX devices
+        result = self.execute_command("ls /dev/sd* | grep -E '/dev/sd[b-z]'")
+        if result['success'] and result['stdout']:
+            return result['stdout'].split()[0]
+        
+        return None
+    
+    def format_device(self, device: str, filesystem: str = "ext4", fast: Optional[bool] = None) -> bool:
         try:
             # Unmount if mounted
             self.execute_command(f"umount {device} 2>/dev/null")
             
             # Create filesystem
-            cmd = f"mkfs.{filesystem} {device}"
+            if fast is None:
+                fast = self.config.fast_mkfs
+            options = FAST_MKFS_OPTIONS.get(filesystem, '') if fast else ''
+            cmd = f"mkfs.{filesystem} {options} {device}" if options else f"mkfs.{filesystem} {device}"
             result = self.execute_command(cmd, timeout=120)
             return result['success']
         except Exception as e:
@@ -67,13 +217,79 @@ class LinuxHost(BaseHost):
             
             # Mount device
             result = self.execute_command(f"mount {device} {mount_point}")
+            if result['success']:
+                self.device = device
             return result['success']
         except Exception as e:
             self._handle_error(f"Mount failed: {e}")
             return False
     
-    def run_performance_test(self, mount_point: str, duration: int) -> Dict[str, Any]:
+    def prepare_host(self, mount_point: str) -> bool:
+        try:
+            if not self.execute_command("command -v fio")['success']:
+                self._handle_error("fio is not installed on the host")
+                return False
+            return self.execute_command(f"mkdir -p {mount_point}")['success']
+        except Exception as e:
+            self._handle_error(f"Host preparation failed: {e}")
+            return False
+    
+    def device_exists(self, device: str) -> bool:
+        return self.execute_command(f"test -b {device}")['success']
+    
+    def device_wwid(self, device: str) -> Optional[str]:
+        """WWID of the LUN behind a path device or a /dev/mapper multipath map"""
+        name = os.path.basename(device)
+        if device.startswith('/dev/mapper/'):
+            result = self.execute_command(MULTIPATH_COMMAND)
+            maps = parse_multipath(result['stdout']) if result['success'] else []
+            return next((mpath['wwid'] for mpath in maps if mpath['name'] == name), None)
+        snapshot = self.snapshot_block_devices() or {}
+        return (snapshot.get(name) or {}).get('wwid') or None
+    
+    def restore_device(self, device: str, wwn: Optional[str] = None):
+        """Adopt a checkpointed device, looking up its multipath map again for telemetry and path stats"""
+        self.device = device
+        self.multipath = None
+        if device.startswith('/dev/mapper/') and wwn:
+            self.multipath = self.find_multipath_device(wwn)
+            if self.multipath is None:
+                self._handle_error(f"Multipath map of {device} not found, path statistics are unavailable")
+    
+    def get_mounted_device(self, mount_point: str) -> Optional[str]:
+        result = self.execute_command(f"findmnt -n -o SOURCE --mountpoint {mount_point}")
+        if not result['success']:
+            return None
+        return result['stdout'].strip() or None
+    
+    def run_performance_test(self, mount_point: str, duration: int, device: Optional[str] = None) -> Dict[str, Any]:
         try:
+            if device:
+                try:
+                    work_dir = self.raw_job_dir(device)
+                except HostError as e:
+                    self._handle_error(str(e))
+                    return {"success": False, "error": str(e)}
+                target = f"filename={device}"
+            else:
+                work_dir = mount_point
+                target = f"directory={mount_point}"
+            
+            # Optionally log per-interval fio stats and sample /proc alongside the run
+            telemetry = None
+            # Host-local, so interval logs are not written to the volume under test
+            log_prefix = f"{HOST_WORK_DIR}/telemetry-{self.config.volume_name}"
+            log_options = ""
+            if self.config.telemetry_interval_ms > 0:
+                self.execute_command(f"mkdir -p {HOST_WORK_DIR}")
+                telemetry = TelemetryCapture(
+                    self.config.telemetry_interval_ms,
+                    # /proc/diskstats lists multipath maps by their dm-N name
+                    device=self.multipath['dm'] if self.multipath else self.device,
+                    directory=self._telemetry_run_dir()
+                )
+                log_options = "\n            ".join(telemetry.fio_options(log_prefix))
+            
             # Use fio for performance testing
             fio_config = f"""
             [global]
@@ -82,31 +298,129 @@ class LinuxHost(BaseHost):
             runtime={duration}
             time_based
             group_reporting
+            {log_options}
             
             [read_test]
             rw=randread
             bs=4k
             iodepth=32
             size=1G
-            directory={mount_point}
+            {target}
             
             [write_test]
             rw=randwrite
             bs=4k
             iodepth=32
             size=1G
-            directory={mount_point}
+            {target}
             """
             
-            # Write config and run fio
-            self.execute_command(f"echo '{fio_config}' > {mount_point}/fio_config.ini")
-            result = self.execute_command(f"fio {mount_point}/fio_config.ini --output-format=json", timeout=duration + 60)
+            job_path = f"{work_dir}/fio_config.ini"
+            paths_before = self.get_path_stats()
+            if telemetry is None:
+                result = self.run_fio_job(fio_config, job_path, timeout=duration + 60)
+            else:
+                result = self._run_with_telemetry(fio_config, job_path, duration + 60, telemetry, log_prefix)
+            if paths_before:
+                # Shows whether multipath actually spread the load
+                result["paths"] = path_distribution(paths_before, self.get_path_stats() or {})
+            return result
+        except Exception as e:
+            self._handle_error(f"Performance test failed: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def raw_job_dir(self, device: str) -> str:
+        """Scratch directory for the job files of a run on device; raises HostError if raw I/O is unsafe"""
+        refusal = self.check_raw_device(device)
+        if refusal:
+            raise HostError(f"Refusing raw I/O on {device}: {refusal}")
+        # Nothing is mounted, so job files go to a host-local directory
+        self.execute_command(f"mkdir -p {HOST_WORK_DIR}")
+        return HOST_WORK_DIR
+    
+    def check_raw_device(self, device: str) -> Optional[str]:
+        """Reason raw fio writes to device would destroy something, or None if it is safe"""
+        result = self.execute_command(f"lsblk -n -o NAME,MOUNTPOINT {device}")
+        if not result['success']:
+            return f"cannot inspect device: {result['stderr']}"
+        entries = [line.split() for line in result['stdout'].splitlines() if line.strip()]
+        if any(len(entry) > 1 for entry in entries):
+            return "device or one of its partitions is mounted"
+        if len(entries) > 1:
+            return "device has partitions or holders"
+        
+        # blkid -p exits 2 when it finds no filesystem, RAID or partition table signature
+        result = self.execute_command(f"blkid -p -o export {device}")
+        if result['exit_code'] != 2:
+            signature = result['stdout'].replace("\n", " ").strip() or result['stderr']
+            return f"device carries a signature ({signature})"
+        return None
+    
+    def get_path_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """sysfs I/O counters and state of every path of the multipath device in use"""
+        if not self.multipath:
+            return None
+        result = self.execute_command(path_stats_command(self.multipath['paths']))
+        return parse_path_stats(result['stdout']) if result['success'] else None
+    
+    def _telemetry_run_dir(self) -> Optional[str]:
+        """Per-run directory under telemetry_dir so runs never append to each other"""
+        if not self.config.telemetry_dir:
+            return None
+        # Targets sharing a host can start in the same second, so the name carries the volume and a uuid
+        run_name = (f"{self.config.host_ip}-{self.config.volume_name}-{time.strftime('%Y%m%d-%H%M%S')}-"
+                    f"{uuid.uuid4().hex[:8]}")
+        return os.path.join(self.config.telemetry_dir, run_name)
+    
+    def _run_with_telemetry(self, job_file: str, job_path: str, timeout: int, telemetry: TelemetryCapture,
+                            log_prefix: str) -> Dict[str, Any]:
+        """Run a fio job with /proc samples streamed into telemetry from the same channel"""
+        result = self.run_fio_job(job_file, job_path, timeout=timeout, telemetry=telemetry)
+        
+        # Interval logs are written by fio on the host; stream them back line by line
+        with self.stream_command(telemetry.fio_log_command(log_prefix), read_timeout=60) as logs:
+            for source, line in logs:
+                if source == "stdout":
+                    telemetry.feed_fio_log_line(line)
+        telemetry.flush()
+        if telemetry.dropped_lines:
+            self._handle_error(f"Telemetry dropped {telemetry.dropped_lines} malformed lines")
+        
+        result["telemetry"] = telemetry
+        return result
+    
+    def run_fio_job(self, job_file: str, job_path: str, timeout: int,
+                    telemetry: Optional[TelemetryCapture] = None) -> Dict[str, Any]:
+        """Write a fio job file to job_path, run it and parse the JSON report, sampling /proc into telemetry"""
+        try:
+            self.execute_command(f"echo '{job_file}' > {job_path}")
+            
+            command = f"fio {job_path} --output-format=json"
+            if telemetry is not None:
+                command = telemetry.wrap_command(command)
+            # fio prints its JSON report only at the end, so no read deadline
+            errors = []
+            with self.stream_command(command, timeout=timeout, read_timeout=None) as stream:
+                def _stdout_lines():
+                    for source, line in stream:
+                        if source == "stdout":
+                            yield line
+                        elif telemetry is not None and line.startswith(telemetry.SAMPLE_PREFIX):
+                            telemetry.feed_sample_line(line)
+                        else:
+                            errors.append(line)
+                
+                try:
+                    fio_result = parse_fio_lines(_stdout_lines())
+                except ValueError as e:
+                    errors.append(str(e))
+                    fio_result = None
             
             return {
-                "success": result['success'],
-                "output": result['stdout'],
-                "error": result['stderr']
+                "success": stream.success and fio_result is not None and fio_result.success,
+                "result": fio_result,
+                "error": "\n".join(errors)
             }
         except Exception as e:
-            self._handle_error(f"Performance test failed: {e}")
+            self._handle_error(f"fio job failed: {e}")
             return {"success": False, "error": str(e)}
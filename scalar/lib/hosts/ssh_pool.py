@@ -0,0 +1,133 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+def _paramiko_client() -> Any:
+    """New paramiko SSHClient; paramiko is only imported once a connection is opened"""
+    import paramiko
+    
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    return client
+
+class _PooledClient:
+    """Shared SSH client and its usage bookkeeping"""
+    
+    def __init__(self, client: Any):
+        self.client = client
+        self.refs = 0
+        self.last_used = time.monotonic()
+    
+    def is_active(self) -> bool:
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+class SSHConnectionPool:
+    """Pool of authenticated SSH transports keyed by (host, user)"""
+    
+    def __init__(self, max_channels_per_host: int = 4, idle_timeout: float = 300,
+                 client_factory: Callable[[], Any] = _paramiko_client):
+        if max_channels_per_host <= 0:
+            raise ValueError("max_channels_per_host must be positive")
+        self.max_channels_per_host = max_channels_per_host
+        self.idle_timeout = idle_timeout
+        # Returns an SSHClient ready to connect, or anything with its interface, e.g. the simulator's fake client
+        self.client_factory = client_factory
+        self._clients: Dict[Tuple[str, str], _PooledClient] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, host: str, username: str, password: str, port: int = 22,
+                timeout: int = 30) -> Any:
+        """Get a connected client for host, opening a transport only if none is alive"""
+        key = (host, username)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        # Handshakes to different hosts run in parallel, same-host callers wait
+        with key_lock:
+            with self._lock:
+                entry = self._clients.get(key)
+            
+            if entry is None or not entry.is_active():
+                if entry is not None:
+                    entry.client.close()
+                client = self.client_factory()
+                client.connect(host, port=port, username=username, password=password, timeout=timeout)
+                refs = entry.refs if entry is not None else 0
+                entry = _PooledClient(client)
+                entry.refs = refs
+            
+            with self._lock:
+                entry.refs += 1
+                entry.last_used = time.monotonic()
+                self._clients[key] = entry
+            return entry.client
+    
+    def release(self, host: str, username: str):
+        """Return a client to the pool; idle transports are closed after idle_timeout"""
+        with self._lock:
+            entry = self._clients.get((host, username))
+            if entry is not None:
+                entry.refs = max(entry.refs - 1, 0)
+                entry.last_used = time.monotonic()
+        self.prune()
+    
+    def prune(self):
+        """Close transports that are unused and idle or already dead"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                key for key, entry in self._clients.items()
+                if entry.refs == 0 and (now - entry.last_used > self.idle_timeout or not entry.is_active())
+            ]
+            entries = [self._clients.pop(key) for key in stale]
+        for entry in entries:
+            entry.client.close()
+    
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._host_limits.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_channels_per_host)
+                self._host_limits[host] = semaphore
+            return semaphore
+    
+    def acquire_slot(self, host: str):
+        """Take one of the host's channel slots, blocking while all are in use"""
+        self._host_limit(host).acquire()
+    
+    def release_slot(self, host: str):
+        """Give back a channel slot taken with acquire_slot"""
+        self._host_limit(host).release()
+    
+    @contextmanager
+    def limit(self, host: str):
+        """Hold one of the host's channel slots for the duration of a command"""
+        # Commands share the transport but each runs on its own channel
+        self.acquire_slot(host)
+        try:
+            yield
+        finally:
+            self.release_slot(host)
+    
+    def close_all(self):
+        """Close every pooled transport"""
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for entry in entries:
+            entry.client.close()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool() -> SSHConnectionPool:
+    """Get the process-wide SSH connection pool"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SSHConnectionPool()
+        return _default_pool
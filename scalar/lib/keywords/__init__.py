@@ -0,0 +1,3 @@
+from .library import SanAutomationLibrary, apply_overrides
+
+__all__ = ['SanAutomationLibrary', 'apply_overrides']
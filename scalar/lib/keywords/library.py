@@ -0,0 +1,285 @@
+from dataclasses import asdict, fields, replace
+from typing import Dict, List, Optional, Any, Set, Tuple
+from ..config import Config, ConfigManager
+from ..config.schema import ConfigSchema
+from ..core.base_managers import BaseSanManager, BaseHostManager
+from ..core.exceptions import ConfigError, HostError, SanError
+from ..core.orchestrator import SanAutomationOrchestrator
+from ..performance.regression import DEFAULT_METRICS, RegressionDetector, aggregate_metrics
+from ..performance.results_store import ResultsStore
+from ..performance.sweep import SweepPoint
+from ..utils.lease import DEFAULT_LOCK_DIR, Lease
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_TRUE_STRINGS = ('true', 'yes', 'on', '1')
+
+def apply_overrides(config: Config, overrides: Dict[str, Any]) -> Config:
+    """Copy of config with overrides applied, converting Robot's string arguments to the field types"""
+    types = {field.name: type(getattr(config, field.name)) for field in fields(config)}
+    changes = {}
+    for name, value in overrides.items():
+        if name not in types:
+            raise ConfigError(f"Unknown configuration field: {name}")
+        if isinstance(value, str) and types[name] is bool:
+            value = value.lower() in _TRUE_STRINGS
+        elif isinstance(value, str) and types[name] is int:
+            value = int(value)
+        changes[name] = value
+    updated = replace(config, **changes)
+    try:
+        ConfigSchema().validate(asdict(updated))
+    except ValueError as e:
+        raise ConfigError(str(e))
+    return updated
+
+class _Target:
+    """Connected SAN and host managers of one target, plus its leases and last run"""
+    
+    def __init__(self, config: Config, san_manager: BaseSanManager, host_manager: BaseHostManager,
+                 leases: List[Lease]):
+        self.config = config
+        self.san_manager = san_manager
+        self.host_manager = host_manager
+        # Leases of its array and host, shared with the other targets on them
+        self.leases = leases
+        self.orchestrator: Optional[SanAutomationOrchestrator] = None
+        self.profile: Optional[str] = None
+        self.result = None
+    
+    def use_config(self, config: Config):
+        self.san_manager.config = config
+        self.host_manager.config = config
+
+class SanAutomationLibrary:
+    """Robot Framework keywords for provisioning SAN volumes and benchmarking them with fio
+    
+    The library has global scope: a target connected in one suite is reused by every later suite
+    in the same process, so vendor sessions and SSH transports are set up once per run. Parallel
+    executors (one process per suite) coordinate through lease files in lock_dir; a suite holds
+    the leases of its target from `Provision Volume` until `Release Target` or the end of the suite.
+    """
+    
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    ROBOT_LISTENER_API_VERSION = 3
+    
+    def __init__(self, config_file: str = "config.json", lock_dir: str = DEFAULT_LOCK_DIR,
+                 results_db: str = "san_results.db", lease_timeout: float = 3600):
+        self.ROBOT_LIBRARY_LISTENER = self
+        self.config_file = config_file
+        self.lock_dir = lock_dir
+        self.results_db = results_db
+        self.lease_timeout = float(lease_timeout)
+        self._targets: Dict[Tuple[str, ...], _Target] = {}
+        self._aliases: Dict[str, Tuple[str, ...]] = {}
+        self._current: Optional[_Target] = None
+        self._store: Optional[ResultsStore] = None
+        # One lease per array or host, and the targets of this process holding it; it is released
+        # when the last of them lets go, since a second flock on the same file would wait for the first
+        self._leases: Dict[str, Lease] = {}
+        self._lease_holders: Dict[str, Set[_Target]] = {}
+        # Leases taken per running suite, innermost last; the first frame also catches leases taken
+        # before the listener saw a suite start, as happens for the suite that imports the library
+        self._suite_leases: List[List[Tuple[_Target, Lease]]] = [[]]
+    
+    def connect_to_target(self, config_file: Optional[str] = None, alias: Optional[str] = None, **overrides) -> str:
+        """Connect to the SAN and host of a config file, reusing an existing connection to the same target
+        
+        Extra ``name=value`` arguments override fields of the configuration. Returns the alias of the
+        target, ``<san_ip>/<host_ip>`` unless one is given.
+        """
+        try:
+            config = ConfigManager(config_file or self.config_file).load_config()
+        except ValueError as e:
+            raise ConfigError(str(e))
+        config = apply_overrides(config, overrides)
+        
+        key = (config.vendor_type, config.san_ip, config.san_username,
+               config.host_type, config.host_ip, config.host_username)
+        target = self._targets.get(key)
+        if target is None:
+            from ..vendors import get_vendor_class
+            from ..hosts import get_host_class
+            target = _Target(config, get_vendor_class(config.vendor_type)(config),
+                             get_host_class(config.host_type)(config), self._target_leases(config))
+            self._targets[key] = target
+        else:
+            logger.info(f"Reusing connection to {config.san_ip}/{config.host_ip}")
+            target.config = config
+            target.use_config(config)
+        
+        if not target.san_manager.connected and not target.san_manager.connect():
+            raise SanError(f"Failed to connect to SAN {config.san_ip}")
+        if not target.host_manager.connected and not target.host_manager.connect():
+            raise HostError(f"Failed to connect to host {config.host_ip}")
+        
+        alias = alias or f"{config.san_ip}/{config.host_ip}"
+        self._aliases[alias] = key
+        self._current = target
+        return alias
+    
+    def switch_target(self, alias: str):
+        """Make a target connected earlier the one later keywords act on"""
+        if alias not in self._aliases:
+            raise ConfigError(f"No target connected as {alias}")
+        self._current = self._targets[self._aliases[alias]]
+    
+    def acquire_target_lease(self, timeout: Optional[float] = None):
+        """Wait until no other executor holds the array or host of the current target"""
+        target = self._target()
+        # Fixed order so two executors never each hold one lease and wait for the other
+        for lease in sorted(target.leases, key=lambda item: item.name):
+            holders = self._lease_holders.setdefault(lease.name, set())
+            if target in holders:
+                continue
+            if not lease.held:
+                logger.info(f"Waiting for lease {lease.name}")
+                lease.acquire(self.lease_timeout if timeout is None else float(timeout))
+            holders.add(target)
+            self._suite_leases[-1].append((target, lease))
+    
+    def release_target(self):
+        """Release the leases of the current target; its connections stay open for later suites"""
+        target = self._target()
+        for lease in target.leases:
+            self._release_lease(target, lease)
+    
+    def provision_volume(self, **overrides) -> str:
+        """Create the RAID group and volume, map it and prepare it on the host; returns the host device
+        
+        Takes the target's leases first. ``name=value`` arguments override configuration fields for this
+        volume only, e.g. ``raid_level=6`` or ``volume_size_gb=200``.
+        """
+        target = self._target()
+        config = apply_overrides(target.config, overrides)
+        target.use_config(config)
+        self.acquire_target_lease()
+        
+        orchestrator = SanAutomationOrchestrator(target.san_manager, target.host_manager)
+        target.orchestrator = orchestrator
+        target.result = None
+        if not orchestrator.run_pipeline(orchestrator.build_pipeline(performance_test=False)):
+            failed = [name for name, stage in orchestrator.stage_results.items() if not stage['success']]
+            raise SanError(f"Provisioning failed at stage {failed[0] if failed else 'unknown'}")
+        return target.host_manager.device
+    
+    def run_fio_profile(self, profile: str, rw: str = "randread", block_size: str = "4k", iodepth: int = 32,
+                        numjobs: int = 1, rwmixread: Optional[int] = None, duration: Optional[int] = None,
+                        size: str = "1G") -> Dict[str, Any]:
+        """Run one fio workload on the provisioned volume and return its aggregated metrics
+        
+        ``profile`` names the workload in the results store, so runs of the same profile form a baseline.
+        With test_mode=raw the workload runs on the block device itself.
+        """
+        target = self._target()
+        if target.orchestrator is None or not target.orchestrator.operation_status["volume_mounted"]:
+            raise HostError("No volume provisioned on the current target, run Provision Volume first")
+        config = target.host_manager.config
+        device = target.host_manager.device if config.test_mode == "raw" else None
+        job_dir = target.host_manager.raw_job_dir(device) if device else config.mount_point
+        
+        point = SweepPoint(block_size, int(iodepth), int(numjobs), rw,
+                           int(rwmixread) if rwmixread is not None else None)
+        duration = int(duration) if duration is not None else config.test_duration
+        outcome = target.host_manager.run_fio_job(
+            point.job_file(config.mount_point, duration, size, filename=device),
+            f"{job_dir}/{profile}.ini",
+            timeout=duration + 60
+        )
+        if not outcome.get('success') or outcome.get('result') is None:
+            raise HostError(f"fio profile {profile} failed: {outcome.get('error')}")
+        
+        target.profile = profile
+        target.result = outcome['result']
+        target.orchestrator.performance_result = target.result
+        return aggregate_metrics(target.result)
+    
+    def result_should_beat_baseline(self, metrics: Optional[str] = None, min_samples: int = 5,
+                                    threshold_mads: float = 3.0, min_change: float = 0.05,
+                                    record: bool = True) -> Dict[str, Any]:
+        """Fail if the last fio result regressed against earlier runs of its profile, vendor and RAID level
+        
+        ``metrics`` is a comma-separated list, by default IOPS and p99 latency. A passing result is recorded
+        in the results store unless ``record`` is false, so it becomes part of later baselines.
+        """
+        target = self._target()
+        if target.result is None:
+            raise HostError("No fio result to compare, run Run Fio Profile first")
+        if isinstance(record, str):
+            record = record.lower() in _TRUE_STRINGS
+        
+        config = replace(target.host_manager.config, fio_profile=target.profile)
+        store = self._results_store()
+        detector = RegressionDetector(
+            store,
+            metrics=tuple(name.strip() for name in metrics.split(',')) if metrics else DEFAULT_METRICS,
+            min_samples=int(min_samples),
+            threshold_mads=float(threshold_mads),
+            min_change=float(min_change)
+        )
+        verdict = detector.check(config, target.result)
+        target.orchestrator.regression_verdict = verdict
+        if not verdict.passed:
+            details = ", ".join(
+                f"{check.metric} {check.value:.1f} vs baseline {check.baseline:.1f}" for check in verdict.regressions
+            )
+            raise AssertionError(f"Profile {target.profile} regressed: {details}")
+        
+        if record:
+            store.record_run(config, target.orchestrator.get_status_report(), performance=target.result)
+        return verdict.to_dict()
+    
+    def close_all_targets(self):
+        """Release every lease and disconnect every target"""
+        for lease in self._leases.values():
+            lease.release()
+        self._leases.clear()
+        self._lease_holders.clear()
+        for target in self._targets.values():
+            target.san_manager.disconnect()
+            target.host_manager.disconnect()
+        self._targets.clear()
+        self._aliases.clear()
+        self._current = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+    
+    def _target(self) -> _Target:
+        if self._current is None:
+            raise ConfigError("No target connected, run Connect To Target first")
+        return self._current
+    
+    def _target_leases(self, config: Config) -> List[Lease]:
+        names = (f"array-{config.san_ip}", f"host-{config.host_ip}")
+        for name in names:
+            if name not in self._leases:
+                self._leases[name] = Lease(name, self.lock_dir)
+        return [self._leases[name] for name in names]
+    
+    def _release_lease(self, target: _Target, lease: Lease):
+        holders = self._lease_holders.get(lease.name, set())
+        holders.discard(target)
+        if not holders:
+            lease.release()
+    
+    def _results_store(self) -> ResultsStore:
+        if self._store is None:
+            self._store = ResultsStore(self.results_db)
+        return self._store
+    
+    # Listener methods; the underscore keeps Robot from exposing them as keywords
+    
+    def _start_suite(self, data, result):
+        self._suite_leases.append([])
+    
+    def _end_suite(self, data, result):
+        # A failed suite must not keep other executors waiting for its target
+        leases = self._suite_leases.pop() if len(self._suite_leases) > 1 else self._suite_leases[0]
+        for target, lease in leases:
+            self._release_lease(target, lease)
+        leases.clear()
+    
+    def _close(self):
+        self.close_all_targets()
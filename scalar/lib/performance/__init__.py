@@ -0,0 +1,11 @@
+from .fio_parser import FioResult, JobResult, IoStats, LatencyStats, parse_fio_output, parse_fio_lines
+from .sweep import SweepPoint, SweepResult, KneeDetector, PerformanceSweep, build_sweep, parse_block_size
+from .telemetry import TelemetryCapture, TelemetrySeries, load_series
+from .results_store import ResultsStore, METRICS
+from .regression import RegressionDetector, RegressionVerdict, MetricCheck, aggregate_metrics
+
+__all__ = ['FioResult', 'JobResult', 'IoStats', 'LatencyStats', 'parse_fio_output', 'parse_fio_lines',
+           'SweepPoint', 'SweepResult', 'KneeDetector', 'PerformanceSweep', 'build_sweep', 'parse_block_size',
+           'TelemetryCapture', 'TelemetrySeries', 'load_series',
+           'ResultsStore', 'METRICS',
+           'RegressionDetector', 'RegressionVerdict', 'MetricCheck', 'aggregate_metrics']
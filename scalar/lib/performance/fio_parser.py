@@ -0,0 +1,223 @@
+import json
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+
+# fio reports latencies in ns (fio >= 3.0) or us; everything here is stored in us
+_NS_PER_US = 1000.0
+
+# Bucket unit of each fio latency histogram section, relative to us
+_HISTOGRAM_SCALES = (("latency_ns", 1 / _NS_PER_US), ("latency_us", 1.0), ("latency_ms", 1000.0))
+
+class LatencyStats:
+    """Latency summary for one I/O direction, in microseconds"""
+    
+    __slots__ = ('min', 'max', 'mean', 'stddev', 'samples', 'percentiles')
+    
+    def __init__(self, min: float = 0.0, max: float = 0.0, mean: float = 0.0, stddev: float = 0.0,
+                 samples: int = 0, percentiles: Optional[Dict[float, float]] = None):
+        self.min = min
+        self.max = max
+        self.mean = mean
+        self.stddev = stddev
+        self.samples = samples
+        self.percentiles = percentiles or {}
+    
+    @classmethod
+    def from_fio(cls, section: Dict[str, Any], prefix: str) -> "LatencyStats":
+        """Build from a fio '<prefix>_ns' or legacy '<prefix>' (us) section"""
+        data = section.get(f"{prefix}_ns")
+        scale = 1 / _NS_PER_US
+        if data is None:
+            data = section.get(prefix) or {}
+            scale = 1.0
+        
+        percentiles = {
+            float(key): value * scale
+            for key, value in (data.get('percentile') or {}).items()
+        }
+        return cls(
+            min=data.get('min', 0) * scale,
+            max=data.get('max', 0) * scale,
+            mean=data.get('mean', 0.0) * scale,
+            stddev=data.get('stddev', 0.0) * scale,
+            samples=data.get('N', 0),
+            percentiles=percentiles
+        )
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """Get latency at percentile p, or None if fio did not report it"""
+        return self.percentiles.get(float(p))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "samples": self.samples,
+            "percentiles": {f"{key:g}": value for key, value in self.percentiles.items()}
+        }
+
+class IoStats:
+    """Throughput and latency for one I/O direction of a job"""
+    
+    __slots__ = ('io_bytes', 'bw_kbps', 'iops', 'runtime_ms', 'total_ios', 'slat', 'clat', 'lat')
+    
+    def __init__(self, io_bytes: int = 0, bw_kbps: float = 0.0, iops: float = 0.0, runtime_ms: int = 0,
+                 total_ios: int = 0, slat: Optional[LatencyStats] = None, clat: Optional[LatencyStats] = None,
+                 lat: Optional[LatencyStats] = None):
+        self.io_bytes = io_bytes
+        self.bw_kbps = bw_kbps
+        self.iops = iops
+        self.runtime_ms = runtime_ms
+        self.total_ios = total_ios
+        self.slat = slat or LatencyStats()
+        self.clat = clat or LatencyStats()
+        self.lat = lat or LatencyStats()
+    
+    @classmethod
+    def from_fio(cls, section: Dict[str, Any]) -> "IoStats":
+        return cls(
+            io_bytes=section.get('io_bytes', 0),
+            bw_kbps=float(section.get('bw', 0)),
+            iops=float(section.get('iops', 0.0)),
+            runtime_ms=section.get('runtime', 0),
+            total_ios=section.get('total_ios', 0),
+            slat=LatencyStats.from_fio(section, 'slat'),
+            clat=LatencyStats.from_fio(section, 'clat'),
+            lat=LatencyStats.from_fio(section, 'lat')
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "io_bytes": self.io_bytes,
+            "bw_kbps": self.bw_kbps,
+            "iops": self.iops,
+            "runtime_ms": self.runtime_ms,
+            "total_ios": self.total_ios,
+            "slat": self.slat.to_dict(),
+            "clat": self.clat.to_dict(),
+            "lat": self.lat.to_dict()
+        }
+
+class JobResult:
+    """Result of a single fio job (or the group when group_reporting is set)"""
+    
+    __slots__ = ('name', 'error', 'read', 'write', 'usr_cpu', 'sys_cpu', 'context_switches',
+                 'latency_histogram')
+    
+    def __init__(self, name: str, error: int = 0, read: Optional[IoStats] = None,
+                 write: Optional[IoStats] = None, usr_cpu: float = 0.0, sys_cpu: float = 0.0,
+                 context_switches: int = 0, latency_histogram: Tuple[Tuple[float, float], ...] = ()):
+        self.name = name
+        self.error = error
+        self.read = read or IoStats()
+        self.write = write or IoStats()
+        self.usr_cpu = usr_cpu
+        self.sys_cpu = sys_cpu
+        self.context_switches = context_switches
+        # (bucket bound in us, percent of I/Os) sorted by bound
+        self.latency_histogram = latency_histogram
+    
+    @classmethod
+    def from_fio(cls, job: Dict[str, Any]) -> "JobResult":
+        histogram = []
+        for key, scale in _HISTOGRAM_SCALES:
+            for bucket, percent in (job.get(key) or {}).items():
+                if percent:
+                    histogram.append((float(bucket.lstrip('>=')) * scale, float(percent)))
+        histogram.sort()
+        
+        return cls(
+            name=job.get('jobname', ''),
+            error=job.get('error', 0),
+            read=IoStats.from_fio(job.get('read') or {}),
+            write=IoStats.from_fio(job.get('write') or {}),
+            usr_cpu=float(job.get('usr_cpu', 0.0)),
+            sys_cpu=float(job.get('sys_cpu', 0.0)),
+            context_switches=job.get('ctx', 0),
+            latency_histogram=tuple(histogram)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "error": self.error,
+            "read": self.read.to_dict(),
+            "write": self.write.to_dict(),
+            "usr_cpu": self.usr_cpu,
+            "sys_cpu": self.sys_cpu,
+            "context_switches": self.context_switches,
+            "latency_histogram": [list(bucket) for bucket in self.latency_histogram]
+        }
+
+class FioResult:
+    """Parsed fio run with per-job metrics and run-wide totals"""
+    
+    __slots__ = ('fio_version', 'timestamp', 'jobs', 'disk_util')
+    
+    def __init__(self, fio_version: str = '', timestamp: int = 0, jobs: Optional[List[JobResult]] = None,
+                 disk_util: Optional[List[Dict[str, Any]]] = None):
+        self.fio_version = fio_version
+        self.timestamp = timestamp
+        self.jobs = jobs or []
+        self.disk_util = disk_util or []
+    
+    @classmethod
+    def from_fio(cls, document: Dict[str, Any]) -> "FioResult":
+        return cls(
+            fio_version=document.get('fio version', ''),
+            timestamp=document.get('timestamp', 0),
+            jobs=[JobResult.from_fio(job) for job in document.get('jobs', [])],
+            disk_util=document.get('disk_util', [])
+        )
+    
+    @property
+    def read_iops(self) -> float:
+        return sum(job.read.iops for job in self.jobs)
+    
+    @property
+    def write_iops(self) -> float:
+        return sum(job.write.iops for job in self.jobs)
+    
+    @property
+    def read_bw_kbps(self) -> float:
+        return sum(job.read.bw_kbps for job in self.jobs)
+    
+    @property
+    def write_bw_kbps(self) -> float:
+        return sum(job.write.bw_kbps for job in self.jobs)
+    
+    @property
+    def success(self) -> bool:
+        return bool(self.jobs) and not any(job.error for job in self.jobs)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fio_version": self.fio_version,
+            "timestamp": self.timestamp,
+            "read_iops": self.read_iops,
+            "write_iops": self.write_iops,
+            "read_bw_kbps": self.read_bw_kbps,
+            "write_bw_kbps": self.write_bw_kbps,
+            "jobs": [job.to_dict() for job in self.jobs],
+            "disk_util": self.disk_util
+        }
+
+def parse_fio_output(output: str) -> FioResult:
+    """Parse fio --output-format=json output, ignoring any text before the JSON document"""
+    start = output.find('{')
+    if start == -1:
+        raise ValueError("No JSON document in fio output")
+    # raw_decode works in place, so the document is never sliced or copied
+    document, _ = json.JSONDecoder().raw_decode(output, start)
+    return FioResult.from_fio(document)
+
+def parse_fio_lines(lines: Iterable[str]) -> FioResult:
+    """Parse fio JSON output delivered line by line, e.g. from a CommandStream"""
+    # Warnings printed before the document are skipped as the lines arrive,
+    # so the only full copy of the document is the single join below
+    collected: List[str] = []
+    for line in lines:
+        if collected or line.lstrip().startswith('{'):
+            collected.append(line)
+    return parse_fio_output('\n'.join(collected))
@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional, Any, Tuple
+from .fio_parser import FioResult
+from .results_store import ResultsStore
+
+DEFAULT_METRICS = (
+    'read_iops', 'write_iops', 'read_bw_kbps', 'write_bw_kbps', 'read_clat_p99_us', 'write_clat_p99_us'
+)
+
+# Scales MAD to a standard-deviation equivalent for normally distributed data
+_MAD_SCALE = 1.4826
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith(('_iops', '_kbps'))
+
+def aggregate_metrics(result: FioResult) -> Dict[str, Optional[float]]:
+    """Run-level value of every metric, aggregated over jobs the same way as ResultsStore.metric_history"""
+    percentiles = {'mean': None, 'p50': 50, 'p99': 99, 'p999': 99.9}
+    values: Dict[str, Optional[float]] = {
+        'read_iops': result.read_iops,
+        'write_iops': result.write_iops,
+        'read_bw_kbps': result.read_bw_kbps,
+        'write_bw_kbps': result.write_bw_kbps,
+    }
+    for direction in ('read', 'write'):
+        for name, percentile in percentiles.items():
+            samples = []
+            for job in result.jobs:
+                stats = getattr(job, direction)
+                if not stats.iops:
+                    continue
+                value = stats.clat.mean if percentile is None else stats.clat.percentile(percentile)
+                if value is not None:
+                    samples.append(value)
+            values[f'{direction}_clat_{name}_us'] = max(samples) if samples else None
+    return values
+
+class MetricCheck:
+    """Comparison of one metric against its baseline"""
+    
+    __slots__ = ('metric', 'value', 'baseline', 'mad', 'samples', 'change', 'regressed', 'skipped')
+    
+    def __init__(self, metric: str, value: Optional[float], baseline: Optional[float] = None,
+                 mad: Optional[float] = None, samples: int = 0, change: Optional[float] = None,
+                 regressed: bool = False, skipped: bool = False):
+        self.metric = metric
+        self.value = value
+        self.baseline = baseline
+        self.mad = mad
+        self.samples = samples
+        # Relative change vs the baseline median, positive means worse
+        self.change = change
+        self.regressed = regressed
+        self.skipped = skipped
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class RegressionVerdict:
+    """Pass/fail outcome of a regression check"""
+    
+    def __init__(self, key: Tuple[str, str, str], checks: List[MetricCheck]):
+        self.key = key
+        self.checks = checks
+    
+    @property
+    def passed(self) -> bool:
+        return not any(check.regressed for check in self.checks)
+    
+    @property
+    def regressions(self) -> List[MetricCheck]:
+        return [check for check in self.checks if check.regressed]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        vendor_type, raid_level, profile = self.key
+        return {
+            "vendor_type": vendor_type,
+            "raid_level": raid_level,
+            "profile": profile,
+            "passed": self.passed,
+            "regressions": [check.metric for check in self.regressions],
+            "checks": [check.to_dict() for check in self.checks]
+        }
+
+class RegressionDetector:
+    """Compare a run against a rolling median/MAD baseline of earlier runs with the same key"""
+    
+    def __init__(self, store: ResultsStore, metrics: Tuple[str, ...] = DEFAULT_METRICS, window_days: float = 30,
+                 min_samples: int = 5, threshold_mads: float = 3.0, min_change: float = 0.05):
+        self.store = store
+        self.metrics = metrics
+        self.window_days = window_days
+        self.min_samples = min_samples
+        self.threshold_mads = threshold_mads
+        # Changes below min_change are noise even when the baseline MAD is tiny
+        self.min_change = min_change
+    
+    def check_metric(self, metric: str, value: Optional[float], history: List[float]) -> MetricCheck:
+        """Classify value against the baseline history of one metric"""
+        # Zero throughput is a collapse, but zero latency means the direction was not exercised
+        missing = value is None or (value == 0 and not higher_is_better(metric))
+        if missing or len(history) < self.min_samples:
+            return MetricCheck(metric, value, samples=len(history), skipped=True)
+        
+        import numpy
+        
+        samples = numpy.asarray(history, dtype=float)
+        baseline = float(numpy.median(samples))
+        mad = _MAD_SCALE * float(numpy.median(numpy.abs(samples - baseline)))
+        if baseline == 0:
+            return MetricCheck(metric, value, baseline, mad, len(history), skipped=True)
+        
+        worse_by = baseline - value if higher_is_better(metric) else value - baseline
+        change = worse_by / baseline
+        regressed = change > self.min_change and worse_by > self.threshold_mads * mad
+        return MetricCheck(metric, value, baseline, mad, len(history), change, regressed)
+    
+    def check(self, config, result: FioResult, exclude_run: Optional[str] = None) -> RegressionVerdict:
+        """Check a fio result against the baseline for config's (vendor, RAID level, profile)"""
+        values = aggregate_metrics(result)
+        checks = []
+        for metric in self.metrics:
+            history = self.store.metric_history(
+                metric, config.vendor_type, config.raid_level, config.fio_profile,
+                since_days=self.window_days, exclude_run=exclude_run
+            )
+            checks.append(self.check_metric(metric, values.get(metric), history))
+        return RegressionVerdict((config.vendor_type, config.raid_level, config.fio_profile), checks)
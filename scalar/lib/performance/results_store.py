@@ -0,0 +1,185 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from .fio_parser import FioResult
+from .sweep import SweepResult, parse_block_size
+
+# Metric columns stored for every result row
+METRICS = (
+    'read_iops', 'write_iops', 'read_bw_kbps', 'write_bw_kbps',
+    'read_clat_mean_us', 'read_clat_p50_us', 'read_clat_p99_us', 'read_clat_p999_us',
+    'write_clat_mean_us', 'write_clat_p50_us', 'write_clat_p99_us', 'write_clat_p999_us',
+)
+
+# Run keys are repeated on every result row so the indexes below cover the queries
+_KEYS = ('run_id', 'timestamp', 'array', 'vendor_type', 'host', 'raid_level', 'volume_size_gb', 'profile')
+_POINT_COLUMNS = ('job', 'block_size', 'iodepth', 'numjobs', 'rw', 'rwmixread')
+_RESULT_COLUMNS = _KEYS + _POINT_COLUMNS + METRICS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    array TEXT, vendor_type TEXT, host TEXT, raid_level TEXT, volume_size_gb INTEGER, profile TEXT,
+    success INTEGER,
+    report TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    timestamp REAL NOT NULL,
+    array TEXT, vendor_type TEXT, host TEXT, raid_level TEXT, volume_size_gb INTEGER, profile TEXT,
+    job TEXT, block_size INTEGER, iodepth INTEGER, numjobs INTEGER, rw TEXT, rwmixread INTEGER,
+    {', '.join(f'{metric} REAL' for metric in METRICS)}
+);
+CREATE INDEX IF NOT EXISTS idx_results_profile ON results (vendor_type, raid_level, profile, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_array ON results (array, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_host ON results (host, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+"""
+
+class ResultsStore:
+    """SQLite store of performance results across runs"""
+    
+    def __init__(self, path: str = "san_results.db", batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        # One connection shared by fleet worker threads, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def record_run(self, config, report: Dict[str, Any], performance: Optional[FioResult] = None,
+                   sweep: Optional[SweepResult] = None, run_id: Optional[str] = None) -> str:
+        """Store a run's status report and all of its result rows in one transaction"""
+        run_id = run_id or uuid.uuid4().hex
+        keys = {
+            'run_id': run_id,
+            'timestamp': time.time(),
+            'array': config.san_ip,
+            'vendor_type': config.vendor_type,
+            'host': config.host_ip,
+            'raid_level': config.raid_level,
+            'volume_size_gb': config.volume_size_gb,
+            'profile': config.fio_profile,
+        }
+        
+        rows: List[Tuple] = []
+        if performance is not None:
+            rows.extend(self._fio_rows(keys, performance))
+        if sweep is not None:
+            rows.extend(self._sweep_rows(keys, sweep))
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO runs ({', '.join(_KEYS)}, success, report) VALUES ({', '.join('?' * (len(_KEYS) + 2))})",
+                tuple(keys[key] for key in _KEYS) + (int(bool(report.get('success'))), json.dumps(report, default=str))
+            )
+            self._insert_rows(rows)
+        return run_id
+    
+    def _insert_rows(self, rows: List[Tuple]):
+        statement = f"INSERT INTO results ({', '.join(_RESULT_COLUMNS)}) VALUES ({', '.join('?' * len(_RESULT_COLUMNS))})"
+        for start in range(0, len(rows), self.batch_size):
+            self._conn.executemany(statement, rows[start:start + self.batch_size])
+    
+    @staticmethod
+    def _fio_rows(keys: Dict[str, Any], result: FioResult) -> Iterable[Tuple]:
+        base = tuple(keys[key] for key in _KEYS)
+        for job in result.jobs:
+            rw = 'rw' if job.read.iops and job.write.iops else ('write' if job.write.iops else 'read')
+            metrics = (
+                job.read.iops, job.write.iops, job.read.bw_kbps, job.write.bw_kbps,
+                job.read.clat.mean, job.read.clat.percentile(50), job.read.clat.percentile(99),
+                job.read.clat.percentile(99.9),
+                job.write.clat.mean, job.write.clat.percentile(50), job.write.clat.percentile(99),
+                job.write.clat.percentile(99.9),
+            )
+            yield base + (job.name, None, None, None, rw, None) + metrics
+    
+    @staticmethod
+    def _sweep_rows(keys: Dict[str, Any], sweep: SweepResult) -> Iterable[Tuple]:
+        columns = sweep.columns
+        for index, point in enumerate(sweep.points):
+            # Each sweep point is its own profile so its history can be queried on its own
+            base = tuple(f"{keys['profile']}/{point.name}" if key == 'profile' else keys[key] for key in _KEYS)
+            metrics = tuple(
+                columns[metric][index] if metric in columns else None
+                for metric in METRICS
+            )
+            yield base + (point.name, parse_block_size(point.block_size), point.iodepth, point.numjobs,
+                          point.rw, point.rwmixread) + metrics
+    
+    def query(self, metric: Optional[str] = None, vendor_type: Optional[str] = None,
+              raid_level: Optional[str] = None, profile: Optional[str] = None, array: Optional[str] = None,
+              host: Optional[str] = None, since_days: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get result rows matching the given keys, newest first"""
+        if metric is not None and metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        
+        filters = []
+        params: List[Any] = []
+        for column, value in (('vendor_type', vendor_type), ('raid_level', raid_level), ('profile', profile),
+                              ('array', array), ('host', host)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        if since_days is not None:
+            filters.append("timestamp >= ?")
+            params.append(time.time() - since_days * 86400)
+        if metric is not None:
+            filters.append(f"{metric} IS NOT NULL")
+        
+        selected = ', '.join(_KEYS + _POINT_COLUMNS + ((metric,) if metric else METRICS))
+        statement = f"SELECT {selected} FROM results"
+        if filters:
+            statement += " WHERE " + " AND ".join(filters)
+        statement += " ORDER BY timestamp DESC"
+        if limit is not None:
+            statement += f" LIMIT {int(limit)}"
+        
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(statement, params)]
+    
+    def metric_history(self, metric: str, vendor_type: str, raid_level: str, profile: str,
+                       since_days: Optional[float] = None, exclude_run: Optional[str] = None) -> List[float]:
+        """Get one metric per run, aggregated over jobs, for a (vendor, RAID level, profile) key, oldest first"""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        # Throughput adds up across jobs, latency takes the worst job
+        aggregate = 'SUM' if metric.endswith(('_iops', '_kbps')) else 'MAX'
+        statement = (f"SELECT run_id, {aggregate}({metric}) AS value, MIN(timestamp) AS ts FROM results "
+                     f"WHERE vendor_type = ? AND raid_level = ? AND profile = ? AND {metric} IS NOT NULL")
+        params: List[Any] = [vendor_type, raid_level, profile]
+        if since_days is not None:
+            statement += " AND timestamp >= ?"
+            params.append(time.time() - since_days * 86400)
+        if exclude_run is not None:
+            statement += " AND run_id != ?"
+            params.append(exclude_run)
+        statement += " GROUP BY run_id ORDER BY ts"
+        
+        with self._lock:
+            return [row['value'] for row in self._conn.execute(statement, params)]
+    
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run['report'] = json.loads(run['report']) if run['report'] else None
+        return run
@@ -0,0 +1,224 @@
+import itertools
+import re
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from .fio_parser import FioResult
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+_SIZE_PATTERN = re.compile(r'^(\d+)([bkmg]?)$', re.IGNORECASE)
+
+def parse_block_size(block_size: str) -> int:
+    """Convert a fio block size such as '4k' or '1m' to bytes"""
+    match = _SIZE_PATTERN.match(block_size.strip())
+    if not match:
+        raise ValueError(f"Invalid block size: {block_size}")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+class SweepPoint:
+    """One fio workload in a sweep matrix"""
+    
+    __slots__ = ('block_size', 'iodepth', 'numjobs', 'rw', 'rwmixread')
+    
+    def __init__(self, block_size: str, iodepth: int, numjobs: int, rw: str, rwmixread: Optional[int] = None):
+        self.block_size = block_size
+        self.iodepth = iodepth
+        self.numjobs = numjobs
+        self.rw = rw
+        # Only meaningful for mixed workloads (rw/randrw)
+        self.rwmixread = rwmixread if rw in ('rw', 'readwrite', 'randrw') else None
+    
+    @property
+    def name(self) -> str:
+        mix = f"_r{self.rwmixread}" if self.rwmixread is not None else ""
+        return f"{self.rw}{mix}_bs{self.block_size}_qd{self.iodepth}_nj{self.numjobs}"
+    
+    @property
+    def curve(self) -> Tuple[str, int, str, Optional[int]]:
+        """Points sharing a curve differ only in queue depth"""
+        return (self.block_size, self.numjobs, self.rw, self.rwmixread)
+    
+    def job_file(self, directory: str, duration: int, size: str = "1G", ioengine: str = "libaio",
+                 filename: Optional[str] = None) -> str:
+        """Render the fio job file for this point, on files in directory or on the block device filename"""
+        lines = [
+            "[global]",
+            f"ioengine={ioengine}",
+            "direct=1",
+            f"runtime={duration}",
+            "time_based",
+            "group_reporting",
+            "",
+            f"[{self.name}]",
+            f"rw={self.rw}",
+        ]
+        if self.rwmixread is not None:
+            lines.append(f"rwmixread={self.rwmixread}")
+        lines.extend([
+            f"bs={self.block_size}",
+            f"iodepth={self.iodepth}",
+            f"numjobs={self.numjobs}",
+            f"size={size}",
+            f"filename={filename}" if filename else f"directory={directory}",
+        ])
+        return "\n".join(lines) + "\n"
+
+def build_sweep(block_sizes: Iterable[str], iodepths: Iterable[int], numjobs: Iterable[int] = (1,),
+                rw_modes: Iterable[str] = ('randread',), read_ratios: Iterable[int] = (70,)) -> List[SweepPoint]:
+    """Expand a sweep matrix into points, ordered by curve then increasing queue depth"""
+    depths = sorted(set(iodepths))
+    points = []
+    seen = set()
+    for rw, block_size, jobs, ratio in itertools.product(rw_modes, block_sizes, numjobs, read_ratios):
+        for depth in depths:
+            point = SweepPoint(block_size, depth, jobs, rw, ratio)
+            # read_ratios only multiply mixed workloads
+            key = (point.curve, depth)
+            if key not in seen:
+                seen.add(key)
+                points.append(point)
+    return points
+
+class SweepResult:
+    """Column-oriented table of sweep results backed by typed arrays"""
+    
+    COLUMNS = (
+        ('block_size_bytes', 'q'), ('iodepth', 'l'), ('numjobs', 'l'), ('rwmixread', 'l'),
+        ('read_iops', 'd'), ('write_iops', 'd'), ('read_bw_kbps', 'd'), ('write_bw_kbps', 'd'),
+        ('read_clat_mean_us', 'd'), ('read_clat_p99_us', 'd'),
+        ('write_clat_mean_us', 'd'), ('write_clat_p99_us', 'd'),
+        ('duration_s', 'd'),
+    )
+    
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in self.COLUMNS}
+        self.rw: List[str] = []
+        self.points: List[SweepPoint] = []
+        self.saturated: List[Tuple[str, int, str, Optional[int]]] = []
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def append(self, point: SweepPoint, result: FioResult, duration: float):
+        read_clat = [job.read.clat for job in result.jobs if job.read.iops]
+        write_clat = [job.write.clat for job in result.jobs if job.write.iops]
+        
+        values = {
+            'block_size_bytes': parse_block_size(point.block_size),
+            'iodepth': point.iodepth,
+            'numjobs': point.numjobs,
+            'rwmixread': -1 if point.rwmixread is None else point.rwmixread,
+            'read_iops': result.read_iops,
+            'write_iops': result.write_iops,
+            'read_bw_kbps': result.read_bw_kbps,
+            'write_bw_kbps': result.write_bw_kbps,
+            'read_clat_mean_us': max((stats.mean for stats in read_clat), default=0.0),
+            'read_clat_p99_us': max((stats.percentile(99) or 0.0 for stats in read_clat), default=0.0),
+            'write_clat_mean_us': max((stats.mean for stats in write_clat), default=0.0),
+            'write_clat_p99_us': max((stats.percentile(99) or 0.0 for stats in write_clat), default=0.0),
+            'duration_s': duration,
+        }
+        for name, column in self.columns.items():
+            column.append(values[name])
+        self.rw.append(point.rw)
+        self.points.append(point)
+    
+    def column(self, name: str) -> array:
+        return self.columns[name]
+    
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for index, point in enumerate(self.points):
+            row = {name: column[index] for name, column in self.columns.items()}
+            row['rw'] = self.rw[index]
+            row['name'] = point.name
+            yield row
+    
+    def to_numpy(self) -> Dict[str, Any]:
+        """Get the columns as NumPy arrays (requires numpy)"""
+        import numpy
+        
+        # frombuffer shares memory with the underlying arrays
+        table = {name: numpy.frombuffer(column, dtype=column.typecode) for name, column in self.columns.items()}
+        table['rw'] = numpy.array(self.rw)
+        return table
+    
+    def to_dict(self) -> Dict[str, Any]:
+        table = {name: column.tolist() for name, column in self.columns.items()}
+        table['rw'] = list(self.rw)
+        table['saturated'] = [list(curve) for curve in self.saturated]
+        return table
+
+class KneeDetector:
+    """Detect the saturation point of a queue-depth curve"""
+    
+    def __init__(self, min_iops_gain: float = 0.05, max_latency_us: Optional[float] = None):
+        self.min_iops_gain = min_iops_gain
+        self.max_latency_us = max_latency_us
+    
+    def is_saturated(self, previous: Optional[Tuple[float, float]], current: Tuple[float, float]) -> bool:
+        """Check (iops, p99 latency us) of the current point against the previous one"""
+        iops, latency = current
+        if self.max_latency_us is not None and latency > self.max_latency_us:
+            return True
+        if previous is None:
+            return False
+        previous_iops = previous[0]
+        # More outstanding I/O no longer buys throughput
+        return previous_iops > 0 and (iops - previous_iops) / previous_iops < self.min_iops_gain
+
+class PerformanceSweep:
+    """Run a matrix of fio workloads on a mounted volume or raw device and tabulate the results"""
+    
+    def __init__(self, host_manager, directory: str, duration: int = 30, size: str = "1G",
+                 knee_detector: Optional[KneeDetector] = None, device: Optional[str] = None):
+        self.host_manager = host_manager
+        self.directory = directory
+        self.duration = duration
+        self.size = size
+        self.knee_detector = knee_detector
+        # Raw mode: jobs run on the block device and only their job files go to a host scratch directory
+        self.device = device
+    
+    def run(self, points: List[SweepPoint]) -> SweepResult:
+        """Run points in order; with a knee detector, the rest of a curve is skipped once it saturates
+        
+        Raises HostError when device is set but raw I/O on it is unsafe.
+        """
+        result = SweepResult()
+        previous: Dict[Tuple, Tuple[float, float]] = {}
+        saturated = set()
+        job_dir = self.host_manager.raw_job_dir(self.device) if self.device else self.directory
+        
+        for index, point in enumerate(points):
+            if point.curve in saturated:
+                logger.info(f"Skipping {point.name}: curve already saturated")
+                continue
+            
+            logger.info(f"Sweep point {index + 1}/{len(points)}: {point.name}")
+            start = time.monotonic()
+            outcome = self.host_manager.run_fio_job(
+                point.job_file(self.directory, self.duration, self.size, filename=self.device),
+                f"{job_dir}/sweep_{point.name}.ini",
+                timeout=self.duration + 60
+            )
+            if not outcome.get('success') or outcome.get('result') is None:
+                logger.error(f"Sweep point {point.name} failed: {outcome.get('error')}")
+                continue
+            result.append(point, outcome['result'], time.monotonic() - start)
+            
+            if self.knee_detector:
+                row = len(result) - 1
+                current = (
+                    result.columns['read_iops'][row] + result.columns['write_iops'][row],
+                    max(result.columns['read_clat_p99_us'][row], result.columns['write_clat_p99_us'][row])
+                )
+                if self.knee_detector.is_saturated(previous.get(point.curve), current):
+                    logger.info(f"Curve saturated at {point.name}")
+                    saturated.add(point.curve)
+                    result.saturated.append(point.curve)
+                previous[point.curve] = current
+        
+        return result
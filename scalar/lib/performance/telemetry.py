@@ -0,0 +1,198 @@
+import json
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional, Any, Tuple
+
+# Typecode of every column written to disk, mapped to the matching NumPy dtype
+_NUMPY_DTYPES = {'q': 'i8', 'd': 'f8', 'b': 'i1'}
+
+class TelemetrySeries:
+    """Append-only time series stored column by column in typed arrays"""
+    
+    def __init__(self, name: str, columns: Tuple[Tuple[str, str], ...], directory: Optional[str] = None,
+                 flush_rows: int = 65536):
+        self.name = name
+        self.schema = columns
+        self.columns: Dict[str, array] = {column: array(typecode) for column, typecode in columns}
+        # With a directory, rows are spilled to disk every flush_rows so memory stays bounded
+        self.directory = os.path.join(directory, name) if directory else None
+        self.flush_rows = flush_rows
+        self.persisted_rows = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+    
+    def __len__(self) -> int:
+        return self.persisted_rows + len(next(iter(self.columns.values())))
+    
+    def append(self, row: Tuple):
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+        if self.directory and len(self) - self.persisted_rows >= self.flush_rows:
+            self.flush()
+    
+    def flush(self):
+        """Append buffered rows to the column files and write the metadata"""
+        if not self.directory:
+            return
+        for column, values in self.columns.items():
+            with open(os.path.join(self.directory, f"{column}.bin"), 'ab') as f:
+                values.tofile(f)
+        self.persisted_rows += len(next(iter(self.columns.values())))
+        for column, typecode in self.schema:
+            self.columns[column] = array(typecode)
+        
+        with open(os.path.join(self.directory, "meta.json"), 'w') as f:
+            json.dump({
+                "name": self.name,
+                "rows": self.persisted_rows,
+                "byteorder": sys.byteorder,
+                "columns": [[column, typecode] for column, typecode in self.schema]
+            }, f)
+    
+    def to_numpy(self) -> Dict[str, Any]:
+        """Get columns as NumPy arrays, memory-mapped when the series lives on disk"""
+        if self.directory:
+            self.flush()
+            return load_series(os.path.dirname(self.directory), self.name)
+        import numpy
+        return {column: numpy.frombuffer(values, dtype=_NUMPY_DTYPES[values.typecode])
+                for column, values in self.columns.items()}
+
+def load_series(directory: str, name: str) -> Dict[str, Any]:
+    """Memory-map a series saved by TelemetrySeries.flush (requires numpy)"""
+    import numpy
+    
+    path = os.path.join(directory, name)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    endian = '<' if meta["byteorder"] == 'little' else '>'
+    table = {}
+    for column, typecode in meta["columns"]:
+        dtype = numpy.dtype(endian + _NUMPY_DTYPES[typecode])
+        if meta["rows"] == 0:
+            table[column] = numpy.empty(0, dtype=dtype)
+        else:
+            table[column] = numpy.memmap(os.path.join(path, f"{column}.bin"), dtype=dtype, mode='r',
+                                         shape=(meta["rows"],))
+    return table
+
+class TelemetryCapture:
+    """Collect fio interval logs and host /proc samples during a performance test"""
+    
+    FIO_LOG_COLUMNS = (('job', 'q'), ('time_ms', 'q'), ('value', 'q'), ('direction', 'b'), ('block_size', 'q'))
+    DISKSTATS_COLUMNS = (
+        ('time_ns', 'q'), ('reads_completed', 'q'), ('sectors_read', 'q'), ('read_ms', 'q'),
+        ('writes_completed', 'q'), ('sectors_written', 'q'), ('write_ms', 'q'),
+        ('in_flight', 'q'), ('io_ms', 'q'), ('weighted_io_ms', 'q'),
+    )
+    CPU_COLUMNS = (
+        ('time_ns', 'q'), ('user', 'q'), ('nice', 'q'), ('system', 'q'), ('idle', 'q'),
+        ('iowait', 'q'), ('irq', 'q'), ('softirq', 'q'), ('steal', 'q'),
+    )
+    FIO_LOG_KINDS = ('bw', 'iops', 'lat', 'clat', 'slat')
+    # Marks sampler lines on stderr when the sampler shares the channel of the command it watches
+    SAMPLE_PREFIX = "@sample "
+    
+    def __init__(self, interval_ms: int = 1000, device: Optional[str] = None, directory: Optional[str] = None):
+        if interval_ms <= 0:
+            raise ValueError("Telemetry interval must be positive")
+        self.interval_ms = interval_ms
+        self.device = os.path.basename(device) if device else None
+        self.series: Dict[str, TelemetrySeries] = {
+            f"fio_{kind}": TelemetrySeries(f"fio_{kind}", self.FIO_LOG_COLUMNS, directory)
+            for kind in self.FIO_LOG_KINDS
+        }
+        self.series["cpu"] = TelemetrySeries("cpu", self.CPU_COLUMNS, directory)
+        if self.device:
+            self.series["diskstats"] = TelemetrySeries("diskstats", self.DISKSTATS_COLUMNS, directory)
+        self._sample_time = 0
+        self._fio_series: Optional[TelemetrySeries] = None
+        self._fio_job = 0
+        # Malformed lines skipped instead of ending the capture
+        self.dropped_lines = 0
+    
+    def fio_options(self, log_prefix: str) -> List[str]:
+        """fio [global] options that write per-interval logs under log_prefix"""
+        return [
+            f"write_bw_log={log_prefix}",
+            f"write_iops_log={log_prefix}",
+            f"write_lat_log={log_prefix}",
+            f"log_avg_msec={self.interval_ms}",
+        ]
+    
+    def sampler_command(self, prefix: str = "") -> str:
+        """Shell loop printing timestamped /proc/stat and /proc/diskstats samples, each line behind prefix"""
+        interval = self.interval_ms / 1000
+        emit = f"{{print \"{prefix}\" $0}}"
+        diskstats = f"; awk '$3 == \"{self.device}\" {emit}' /proc/diskstats" if self.device else ""
+        return (f"while true; do echo \"{prefix}T $(date +%s%N)\"; awk 'NR == 1 {emit}' /proc/stat{diskstats}; "
+                f"sleep {interval:g}; done")
+    
+    def wrap_command(self, command: str) -> str:
+        """Run command with the sampler alongside it on the same channel; samples go to stderr"""
+        # One channel instead of two, so sampling never waits for a second pool slot
+        return (f"({self.sampler_command(self.SAMPLE_PREFIX)}) >&2 & sampler=$!; "
+                f"trap 'kill $sampler 2>/dev/null' EXIT; {command}")
+    
+    def fio_log_command(self, log_prefix: str) -> str:
+        """Print every fio log under log_prefix, each preceded by a header line, then remove them"""
+        return (f"for f in {log_prefix}_*.log; do [ -e \"$f\" ] || continue; echo \"== $f\"; cat \"$f\"; "
+                f"rm -f \"$f\"; done")
+    
+    def feed_sample_line(self, line: str):
+        """Parse one line of sampler_command output"""
+        if line.startswith(self.SAMPLE_PREFIX):
+            line = line[len(self.SAMPLE_PREFIX):]
+        fields = line.split()
+        if not fields:
+            return
+        try:
+            if fields[0] == 'T' and len(fields) == 2:
+                self._sample_time = int(fields[1])
+            elif fields[0] == 'cpu':
+                values = [int(value) for value in fields[1:9]]
+                values += [0] * (8 - len(values))
+                self.series["cpu"].append((self._sample_time, *values))
+            elif self.device and len(fields) >= 14 and fields[2] == self.device:
+                # Fields 4-14 of /proc/diskstats, skipping merges
+                stats = [int(value) for value in fields[3:14]]
+                self.series["diskstats"].append((
+                    self._sample_time, stats[0], stats[2], stats[3], stats[4], stats[6], stats[7],
+                    stats[8], stats[9], stats[10]
+                ))
+        except ValueError:
+            self.dropped_lines += 1
+    
+    def feed_fio_log_line(self, line: str):
+        """Parse one line of fio_log_command output"""
+        if line.startswith("== "):
+            # e.g. /tmp/san_automation/telemetry_clat.2.log
+            stem = os.path.basename(line[3:].strip())[:-len('.log')]
+            base, _, job = stem.rpartition('.')
+            if not job.isdigit():
+                base, job = stem, '0'
+            self._fio_series = self.series.get(f"fio_{base.rsplit('_', 1)[-1]}")
+            self._fio_job = int(job)
+            return
+        if self._fio_series is None:
+            return
+        fields = [field.strip() for field in line.split(',')]
+        if len(fields) < 4:
+            return
+        try:
+            self._fio_series.append((self._fio_job, int(fields[0]), int(fields[1]), int(fields[2]),
+                                     int(fields[3])))
+        except ValueError:
+            self.dropped_lines += 1
+    
+    def flush(self):
+        for series in self.series.values():
+            series.flush()
+    
+    def summary(self) -> Dict[str, int]:
+        """Number of samples captured per series, and of malformed lines dropped"""
+        summary = {name: len(series) for name, series in self.series.items()}
+        summary["dropped_lines"] = self.dropped_lines
+        return summary
+
@@ -0,0 +1,6 @@
+from .profile import SimulationProfile
+from .array import ArraySimulator, SimulatedArray
+from .host import HostSimulator, SimulatedHostState, SimulatedSSHClient
+
+__all__ = ['SimulationProfile', 'ArraySimulator', 'SimulatedArray',
+           'HostSimulator', 'SimulatedHostState', 'SimulatedSSHClient']
@@ -0,0 +1,301 @@
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .profile import SimulationProfile
+from ..vendors.placement import RAID_MEMBERS, normalize_raid_level
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Response = Tuple[int, Optional[Dict[str, Any]], Dict[str, str]]
+
+_ARRAY_PATH = re.compile(r'^/arrays/([^/]+)/api(/.*)$')
+
+class SimulatedArray:
+    """State of one simulated array: disks, RAID groups, volumes and host mappings"""
+    
+    def __init__(self, san_ip: str, index: int, profile: SimulationProfile,
+                 on_map: Optional[Callable[[str, "SimulatedArray"], None]] = None):
+        self.san_ip = san_ip
+        self.index = index
+        self.profile = profile
+        self.on_map = on_map
+        self.serial = f"SIM{index:06d}"
+        self.target_ports = [f"5000{index:08x}{port:04x}" for port in range(2)]
+        self.disks = [{
+            "id": f"disk-{number}",
+            "state": "available",
+            "size_gb": 960,
+            "media_type": "ssd",
+            "controller": f"ctrl{number % 2}",
+            "enclosure": f"enc{number // 12}",
+            "bus": number % 4
+        } for number in range(profile.disks_per_array)]
+        self.raid_groups: Dict[str, Dict[str, Any]] = {}
+        self.volumes: Dict[str, Dict[str, Any]] = {}
+        self.mappings: List[Dict[str, Any]] = []
+        # Bumped whenever the disk inventory changes; served as the ETag
+        self.generation = 0
+        self._ids = itertools.count(1)
+        self._luns: Dict[str, itertools.count] = {}
+        self._lock = threading.Lock()
+    
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any,
+               headers: Dict[str, str]) -> Response:
+        """Serve one REST request"""
+        parts = path.strip('/').split('/')
+        with self._lock:
+            if method == 'GET' and path == '/system/info':
+                return 200, {"model": "Simulated array", "serial": self.serial, "version": "1.0"}, {}
+            if method == 'GET' and path == '/storage/disks':
+                return self._list_disks(query, headers)
+            if method == 'POST' and path == '/storage/arrays':
+                return (*self._create_raid_group(body or {}), {})
+            if method == 'POST' and path == '/storage/volumes':
+                return (*self._create_volume(body or {}), {})
+            if method == 'POST' and path == '/storage/volumes/bulk':
+                return 200, {"results": self._bulk(self._create_volume, (body or {}).get('volumes', []))}, {}
+            if method == 'POST' and path == '/storage/mappings':
+                return (*self._map_volume(body or {}), {})
+            if method == 'POST' and path == '/storage/mappings/bulk':
+                return 200, {"results": self._bulk(self._map_volume, (body or {}).get('mappings', []))}, {}
+            if method == 'GET' and path == '/storage/mappings':
+                volume_id = query.get('volume_id', [None])[0]
+                return 200, {"mappings": [dict(mapping) for mapping in self.mappings
+                                          if volume_id is None or mapping['volume_id'] == volume_id]}, {}
+            if method == 'GET' and len(parts) == 3 and parts[:2] == ['storage', 'arrays']:
+                group = self.raid_groups.get(parts[2])
+                return (200, self._raid_group_view(group), {}) if group else _error(404, "No such array")
+            if method == 'GET' and len(parts) == 3 and parts[:2] == ['storage', 'volumes']:
+                volume = self.volumes.get(parts[2])
+                return (200, dict(volume), {}) if volume else _error(404, "No such volume")
+        return _error(404, f"No route for {method} {path}")
+    
+    def mapped_volumes(self, host_name: str) -> List[Dict[str, Any]]:
+        """Volumes mapped to host_name, each with its LUN and target ports"""
+        with self._lock:
+            return [dict(self.volumes[mapping['volume_id']], lun=mapping['lun'], target_ports=mapping['target_ports'])
+                    for mapping in self.mappings if mapping['host_name'] == host_name]
+    
+    def _list_disks(self, query: Dict[str, List[str]], headers: Dict[str, str]) -> Response:
+        etag = f'"{self.generation}"'
+        if headers.get('If-None-Match') == etag:
+            return 304, None, {"ETag": etag}
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', [str(len(self.disks))])[0])
+        page = [dict(disk) for disk in self.disks[offset:offset + limit]]
+        return 200, {"disks": page, "total": len(self.disks)}, {"ETag": etag}
+    
+    def _create_raid_group(self, spec: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        try:
+            level = normalize_raid_level(spec.get('raid_level', ''))
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        disk_ids = spec.get('disks') or []
+        if len(disk_ids) < RAID_MEMBERS[level][0]:
+            return 400, {"error": f"RAID {level} needs at least {RAID_MEMBERS[level][0]} disks"}
+        disks = {disk['id']: disk for disk in self.disks}
+        unusable = [disk_id for disk_id in disk_ids
+                    if disk_id not in disks or disks[disk_id]['state'] != 'available']
+        if unusable:
+            return 409, {"error": f"Disks not available: {unusable}"}
+        
+        for disk_id in disk_ids:
+            disks[disk_id]['state'] = 'in_use'
+        self.generation += 1
+        group_id = f"array-{next(self._ids)}"
+        self.raid_groups[group_id] = {
+            "id": group_id,
+            "name": spec.get('name', group_id),
+            "raid_level": level,
+            "disks": list(disk_ids),
+            "ready_at": time.monotonic() + self.profile.raid_init_seconds
+        }
+        return 201, self._raid_group_view(self.raid_groups[group_id])
+    
+    def _raid_group_view(self, group: Dict[str, Any]) -> Dict[str, Any]:
+        view = {key: value for key, value in group.items() if key != 'ready_at'}
+        view["status"] = "ready" if time.monotonic() >= group['ready_at'] else "initializing"
+        return view
+    
+    def _create_volume(self, spec: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if spec.get('array_id') not in self.raid_groups:
+            return 404, {"error": f"No such array: {spec.get('array_id')}"}
+        if not spec.get('name') or int(spec.get('size') or 0) <= 0:
+            return 400, {"error": "Volume needs a name and a positive size"}
+        number = next(self._ids)
+        volume_id = f"vol-{number}"
+        self.volumes[volume_id] = {
+            "id": volume_id,
+            "name": spec['name'],
+            "array_id": spec['array_id'],
+            "size_gb": int(spec['size']),
+            # NAA type 6, unique per array and volume
+            "wwn": f"naa.6{self.index:07x}{number:024x}"
+        }
+        return 201, dict(self.volumes[volume_id])
+    
+    def _map_volume(self, spec: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        volume_id, host_name = spec.get('volume_id'), spec.get('host_name')
+        if volume_id not in self.volumes:
+            return 404, {"error": f"No such volume: {volume_id}"}
+        for mapping in self.mappings:
+            if mapping['volume_id'] == volume_id and mapping['host_name'] == host_name:
+                return 200, dict(mapping)
+        mapping = {
+            "volume_id": volume_id,
+            "host_name": host_name,
+            "access_mode": spec.get('access_mode', 'read_write'),
+            # LUN 0 is left to the array's controller LUN, as on most arrays
+            "lun": next(self._luns.setdefault(host_name, itertools.count(1))),
+            "target_ports": list(self.target_ports)
+        }
+        self.mappings.append(mapping)
+        if self.on_map:
+            self.on_map(host_name, self)
+        return 201, dict(mapping)
+    
+    def _bulk(self, create, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for spec in specs:
+            status, payload = create(spec)
+            results.append(payload if status < 300 else {"error": payload['error']})
+        return results
+
+def _error(status: int, message: str) -> Response:
+    return status, {"error": message}, {}
+
+class _ArrayRequestHandler(BaseHTTPRequestHandler):
+    """Route /arrays/<san_ip>/api/... to the simulated array of san_ip"""
+    
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real array behind requests.Session
+    # Headers and body leave in one segment; unbuffered writes hit Nagle plus delayed ACK, ~40 ms a request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        self._dispatch('GET')
+    
+    def do_POST(self):
+        self._dispatch('POST')
+    
+    def _dispatch(self, method: str):
+        simulator: ArraySimulator = self.server.simulator
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        
+        delay = simulator.profile.delay()
+        if delay:
+            time.sleep(delay)
+        match = _ARRAY_PATH.match(url.path)
+        if not match:
+            status, payload, headers = _error(404, "Not an array path")
+        elif simulator.profile.should_fail():
+            status, payload, headers = _error(503, "Simulated failure")
+        else:
+            try:
+                body = json.loads(raw_body) if raw_body else None
+                status, payload, headers = simulator.array(match.group(1)).handle(
+                    method, match.group(2), parse_qs(url.query), body, dict(self.headers)
+                )
+            except ValueError as e:
+                status, payload, headers = _error(400, str(e))
+        
+        data = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        # One line per request would drown the log at load-test rates
+        pass
+
+class _SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+class ArraySimulator:
+    """Local HTTP server hosting any number of simulated arrays, one per SAN IP"""
+    
+    def __init__(self, profile: Optional[SimulationProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or SimulationProfile()
+        self.address = (host, port)
+        self._arrays: Dict[str, SimulatedArray] = {}
+        # Arrays with mappings per host, so a host rescan does not walk every array
+        self._host_arrays: Dict[str, List[SimulatedArray]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_SimulatorServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "ArraySimulator":
+        self._server = _SimulatorServer(self.address, _ArrayRequestHandler)
+        self._server.simulator = self
+        self.address = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.1},
+                                        name="array-simulator", daemon=True)
+        self._thread.start()
+        logger.info(f"Array simulator listening on http://{self.address[0]}:{self.address[1]}")
+        return self
+    
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+    
+    def __enter__(self) -> "ArraySimulator":
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def array(self, san_ip: str) -> SimulatedArray:
+        """The simulated array at san_ip, created on first use"""
+        with self._lock:
+            array = self._arrays.get(san_ip)
+            if array is None:
+                array = self._arrays[san_ip] = SimulatedArray(san_ip, len(self._arrays), self.profile,
+                                                              on_map=self._record_mapping)
+            return array
+    
+    def mapped_volumes(self, host_name: str) -> List[Dict[str, Any]]:
+        """Volumes mapped to host_name on any simulated array, each with its LUN and target ports"""
+        with self._lock:
+            arrays = list(self._host_arrays.get(host_name, ()))
+        return [volume for array in arrays for volume in array.mapped_volumes(host_name)]
+    
+    def _record_mapping(self, host_name: str, array: SimulatedArray):
+        with self._lock:
+            arrays = self._host_arrays.setdefault(host_name, [])
+            if array not in arrays:
+                arrays.append(array)
+    
+    def arrays(self) -> List[SimulatedArray]:
+        with self._lock:
+            return list(self._arrays.values())
+    
+    def base_url(self, san_ip: str) -> str:
+        return f"http://{self.address[0]}:{self.address[1]}/arrays/{san_ip}/api"
+    
+    def san_factory(self, config):
+        """GenericVendor for config, pointed at its simulated array; usable as a fleet san_factory"""
+        from ..vendors.generic import GenericVendor
+        return GenericVendor(config, base_url=self.base_url(config.san_ip))
+    
+    def async_san_factory(self, config, **kwargs):
+        """AsyncGenericVendor for config, pointed at its simulated array; kwargs go to the vendor"""
+        from ..vendors.async_vendor import AsyncGenericVendor
+        return AsyncGenericVendor(config, base_url=self.base_url(config.san_ip), **kwargs)
@@ -0,0 +1,355 @@
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from .array import ArraySimulator
+from .profile import SimulationProfile
+from ..hosts.ssh_pool import SSHConnectionPool
+from ..performance.sweep import parse_block_size
+
+# (exit code, stdout, stderr, seconds the command takes)
+CommandResult = Tuple[int, str, str, float]
+
+_ECHO = re.compile(r"^echo '(.*)' > (\S+)$", re.DOTALL)
+_SETTLE_PREFIX = re.compile(r'^udevadm settle [^;]*; ')
+_WANTED_TARGETS = re.compile(r"for want in (.*?); do")
+# TelemetryCapture.wrap_command: a /proc sampler in the background, then the watched command
+_SAMPLED = re.compile(r"^\((while true; .*?sleep ([\d.]+); done)\) >&2 & sampler=\$!; trap '[^']*' EXIT; (.*)$", re.DOTALL)
+# Fixed service time of one simulated I/O, so IOPS scale with queue depth until the volume saturates
+_SERVICE_TIME_S = 0.0001
+
+def _disk_name(index: int) -> str:
+    """sda, sdb, ... sdz, sdaa, as the kernel names SCSI disks"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('a') + remainder) + letters
+    return 'sd' + letters
+
+class SimulatedHostState:
+    """Block devices, filesystems and mounts of one simulated Linux host"""
+    
+    def __init__(self, host_ip: str, arrays: ArraySimulator, profile: SimulationProfile):
+        self.host_ip = host_ip
+        self.arrays = arrays
+        self.profile = profile
+        self.devices: Dict[str, Dict[str, Any]] = {
+            "sda": {"wwid": f"t10.ATA SIM-BOOT {host_ip}", "size_bytes": 500 * 1024 ** 3,
+                    "vendor": "ATA", "model": "SIM-BOOT", "serial": f"boot-{host_ip}"}
+        }
+        self.filesystems: Dict[str, str] = {"sda": "ext4"}
+        self.mounts: Dict[str, str] = {"/": "/dev/sda"}
+        self.files: Dict[str, str] = {}
+        self._by_wwn: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._handlers = [
+            (lambda command: 'fc_transport' in command, self._scsi_targets),
+            (lambda command: '/sys/block/dm-*' in command, lambda command: (0, '', '', 0.0)),
+            (lambda command: '/sys/block/*' in command, self._snapshot),
+            (lambda command: '/scan' in command or 'issue_lip' in command or command == 'rescan-scsi-bus.sh',
+             self._rescan),
+            (lambda command: command == 'pidof multipathd', lambda command: (1, '', '', 0.0)),
+            (lambda command: command == 'command -v fio', lambda command: (0, '/usr/bin/fio', '', 0.0)),
+            (lambda command: command.startswith('lsblk -d '), self._list_disks),
+            (lambda command: command.startswith('lsblk -n -o NAME,MOUNTPOINT '), self._lsblk_mounts),
+            (lambda command: command.startswith('blkid -p '), self._blkid),
+            (lambda command: command.startswith('test -b '), self._test_block),
+            (lambda command: command.startswith('findmnt '), self._findmnt),
+            (lambda command: command.startswith(('mkdir -p ', 'umount ')), lambda command: (0, '', '', 0.0)),
+            (lambda command: command.startswith('mkfs.'), self._mkfs),
+            (lambda command: command.startswith('mount '), self._mount),
+            (lambda command: _ECHO.match(command) is not None, self._write_file),
+            (lambda command: command.startswith('fio '), self._fio),
+            (lambda command: command.startswith('for f in '), lambda command: (0, '', '', 0.0)),
+        ]
+    
+    def run(self, command: str) -> CommandResult:
+        """Emulate one shell command"""
+        if self.profile.should_fail():
+            return 1, '', 'Simulated failure', self.profile.delay()
+        command = _SETTLE_PREFIX.sub('', command.strip())
+        sampled = _SAMPLED.match(command)
+        if sampled:
+            return self._sampled(sampled.group(3), float(sampled.group(2)))
+        with self._lock:
+            for matches, handler in self._handlers:
+                if matches(command):
+                    exit_code, stdout, stderr, seconds = handler(command)
+                    return exit_code, stdout, stderr, seconds + self.profile.delay()
+        return 127, '', f"{command.split()[0]}: command not found", self.profile.delay()
+    
+    def _sampled(self, command: str, interval: float) -> CommandResult:
+        """Run command with one /proc/stat sample on stderr per sampler interval of its run time"""
+        exit_code, stdout, stderr, seconds = self.run(command)
+        now = time.time_ns()
+        samples = []
+        for index in range(max(int(seconds / interval), 1)):
+            ticks = index * int(interval * 100)
+            samples.append(f"@sample T {now + int(index * interval * 1e9)}")
+            samples.append(f"@sample cpu  {ticks} 0 {ticks} {ticks * 2} 0 0 0 0 0 0")
+        return exit_code, stdout, "\n".join(samples + ([stderr] if stderr else [])), seconds
+    
+    def _device(self, path: str) -> Optional[str]:
+        name = path.rsplit('/', 1)[-1]
+        return name if name in self.devices else None
+    
+    def _scsi_targets(self, command: str) -> CommandResult:
+        wanted = _WANTED_TARGETS.search(command)
+        ports = {port for volume in self.arrays.mapped_volumes(self.host_ip) for port in volume['target_ports']}
+        names = re.findall(r"'([^']*)'", wanted.group(1)) if wanted else []
+        lines = [f"1:0:{target}" for target, name in enumerate(names) if name.replace('0x', '', 1) in ports]
+        return 0, '\n'.join(lines), '', 0.0
+    
+    def _rescan(self, command: str) -> CommandResult:
+        # Every scan surfaces all LUNs mapped to this host, targeted or not
+        for volume in self.arrays.mapped_volumes(self.host_ip):
+            if volume['wwn'] in self._by_wwn:
+                continue
+            name = _disk_name(len(self.devices))
+            self._by_wwn[volume['wwn']] = name
+            self.devices[name] = {
+                "wwid": volume['wwn'],
+                "size_bytes": volume['size_gb'] * 1024 ** 3,
+                "vendor": "SIM",
+                "model": "SIMARRAY",
+                "serial": volume['id']
+            }
+        return 0, '', '', 0.0
+    
+    def _snapshot(self, command: str) -> CommandResult:
+        lines = [f"{name}\t{device['wwid']}\t{device['size_bytes'] // 512}\t{device['vendor']}\t"
+                 f"{device['model']}\t{device['serial']}" for name, device in self.devices.items()]
+        return 0, '\n'.join(lines), '', 0.0
+    
+    def _list_disks(self, command: str) -> CommandResult:
+        lines = [f"{name} {device['size_bytes'] // 1024 ** 3}G {device['model']} disk"
+                 for name, device in self.devices.items()]
+        return 0, '\n'.join(lines), '', 0.0
+    
+    def _lsblk_mounts(self, command: str) -> CommandResult:
+        path = command.split()[-1]
+        name = self._device(path)
+        if name is None:
+            return 32, '', f"lsblk: {path}: not a block device", 0.0
+        mount_points = [mount_point for mount_point, device in self.mounts.items() if device == path]
+        return 0, f"{name} {mount_points[0]}" if mount_points else name, '', 0.0
+    
+    def _blkid(self, command: str) -> CommandResult:
+        name = self._device(command.split()[-1])
+        if name is None or name not in self.filesystems:
+            return 2, '', '', 0.0
+        return 0, f"TYPE={self.filesystems[name]}", '', 0.0
+    
+    def _test_block(self, command: str) -> CommandResult:
+        return (0 if self._device(command.split()[-1]) else 1), '', '', 0.0
+    
+    def _findmnt(self, command: str) -> CommandResult:
+        device = self.mounts.get(command.split()[-1])
+        return (0, device, '', 0.0) if device else (1, '', '', 0.0)
+    
+    def _mkfs(self, command: str) -> CommandResult:
+        filesystem = command.split()[0].split('.', 1)[1]
+        path = command.split()[-1]
+        name = self._device(path)
+        if name is None:
+            return 1, '', f"mkfs.{filesystem}: {path}: No such file or directory", 0.0
+        self.filesystems[name] = filesystem
+        return 0, f"Creating filesystem on {path}", '', self.profile.mkfs_seconds
+    
+    def _mount(self, command: str) -> CommandResult:
+        _, path, mount_point = command.split()
+        name = self._device(path)
+        if name is None or name not in self.filesystems:
+            return 32, '', f"mount: {mount_point}: wrong fs type, bad option, bad superblock on {path}", 0.0
+        self.mounts[mount_point] = path
+        return 0, '', '', 0.0
+    
+    def _write_file(self, command: str) -> CommandResult:
+        content, path = _ECHO.match(command).groups()
+        self.files[path] = content
+        return 0, '', '', 0.0
+    
+    def _fio(self, command: str) -> CommandResult:
+        job_path = command.split()[1]
+        if job_path not in self.files:
+            return 1, '', f"fio: failed to open {job_path}", 0.0
+        return 0, json.dumps(self._fio_report(self.files[job_path])), '', self.profile.fio_seconds
+    
+    def _fio_report(self, job_file: str) -> Dict[str, Any]:
+        """fio JSON report for the jobs of job_file, from a queueing model of the simulated volume"""
+        sections: List[Tuple[str, Dict[str, str]]] = []
+        for line in job_file.splitlines():
+            line = line.strip()
+            if line.startswith('[') and line.endswith(']'):
+                sections.append((line[1:-1], {}))
+            elif '=' in line and sections:
+                key, value = line.split('=', 1)
+                sections[-1][1][key.strip()] = value.strip()
+        options = dict(sections[0][1]) if sections and sections[0][0] == 'global' else {}
+        jobs = [(name, dict(options, **job_options)) for name, job_options in sections if name != 'global']
+        runtime_ms = int(options.get('runtime', 60)) * 1000
+        
+        report = []
+        for name, job in jobs:
+            outstanding = int(job.get('iodepth', 1)) * int(job.get('numjobs', 1))
+            block_size = parse_block_size(job.get('bs', '4k'))
+            # Larger blocks saturate the volume at fewer IOPS
+            limit = self.profile.iops * min(1.0, 8192 / block_size)
+            iops = min(outstanding / _SERVICE_TIME_S, limit) * self.profile.noise()
+            latency_ns = outstanding / iops * 1e9
+            rw = job.get('rw', 'read')
+            if rw in ('rw', 'readwrite', 'randrw'):
+                read_share = int(job.get('rwmixread', 50)) / 100
+            else:
+                read_share = 0.0 if 'write' in rw else 1.0
+            report.append({
+                "jobname": name,
+                "error": 0,
+                "read": self._fio_direction(iops * read_share, block_size, runtime_ms, latency_ns),
+                "write": self._fio_direction(iops * (1 - read_share), block_size, runtime_ms, latency_ns)
+            })
+        return {"fio version": "fio-3.35", "timestamp": int(time.time()), "jobs": report}
+    
+    @staticmethod
+    def _fio_direction(iops: float, block_size: int, runtime_ms: int, latency_ns: float) -> Dict[str, Any]:
+        if not iops:
+            return {"io_bytes": 0, "bw": 0, "iops": 0.0, "runtime": 0, "total_ios": 0}
+        total_ios = int(iops * runtime_ms / 1000)
+        return {
+            "io_bytes": total_ios * block_size,
+            "bw": int(iops * block_size / 1024),
+            "iops": iops,
+            "runtime": runtime_ms,
+            "total_ios": total_ios,
+            "clat_ns": {
+                "mean": latency_ns,
+                "percentile": {"50.000000": latency_ns, "99.000000": latency_ns * 2.5, "99.900000": latency_ns * 4}
+            }
+        }
+
+class SimulatedChannel:
+    """paramiko Channel stand-in: runs the command at once and releases its output after its simulated duration"""
+    
+    def __init__(self, state: SimulatedHostState):
+        self.state = state
+        self.closed = False
+        self._exit_code = -1
+        self._streams = {"stdout": b'', "stderr": b''}
+        self._ready_at = 0.0
+    
+    def exec_command(self, command: str):
+        exit_code, stdout, stderr, seconds = self.state.run(command)
+        self._exit_code = exit_code
+        self._streams = {"stdout": (stdout + '\n').encode() if stdout else b'',
+                         "stderr": (stderr + '\n').encode() if stderr else b''}
+        self._ready_at = time.monotonic() + seconds
+    
+    def exit_status_ready(self) -> bool:
+        return time.monotonic() >= self._ready_at
+    
+    def recv_exit_status(self) -> int:
+        self.wait()
+        return self._exit_code
+    
+    def recv_ready(self) -> bool:
+        return self.exit_status_ready() and bool(self._streams["stdout"])
+    
+    def recv_stderr_ready(self) -> bool:
+        return self.exit_status_ready() and bool(self._streams["stderr"])
+    
+    def recv(self, size: int) -> bytes:
+        return self._take("stdout", size)
+    
+    def recv_stderr(self, size: int) -> bytes:
+        return self._take("stderr", size)
+    
+    def read_all(self, source: str) -> bytes:
+        self.wait()
+        return self._take(source, len(self._streams[source]))
+    
+    def wait(self):
+        remaining = self._ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+    
+    def close(self):
+        self.closed = True
+    
+    def _take(self, source: str, size: int) -> bytes:
+        data = self._streams[source]
+        self._streams[source] = data[size:]
+        return data[:size]
+
+class _ChannelFile:
+    """The stdout/stderr file objects SSHClient.exec_command returns"""
+    
+    def __init__(self, channel: SimulatedChannel, source: str):
+        self.channel = channel
+        self.source = source
+    
+    def read(self) -> bytes:
+        return self.channel.read_all(self.source)
+
+class SimulatedSSHClient:
+    """paramiko SSHClient stand-in connected to a simulated host; it doubles as its own transport"""
+    
+    def __init__(self, simulator: "HostSimulator"):
+        self.simulator = simulator
+        self.state: Optional[SimulatedHostState] = None
+        self._active = False
+    
+    def set_missing_host_key_policy(self, policy):
+        pass
+    
+    def connect(self, hostname: str, port: int = 22, username: Optional[str] = None,
+                password: Optional[str] = None, timeout: Optional[float] = None, **kwargs):
+        delay = self.simulator.profile.delay()
+        if delay:
+            time.sleep(delay)
+        if self.simulator.profile.should_fail():
+            raise OSError(f"Simulated connection failure to {hostname}")
+        self.state = self.simulator.host(hostname)
+        self._active = True
+    
+    def get_transport(self) -> "SimulatedSSHClient":
+        return self
+    
+    def is_active(self) -> bool:
+        return self._active
+    
+    def open_session(self) -> SimulatedChannel:
+        return SimulatedChannel(self.state)
+    
+    def exec_command(self, command: str, timeout: Optional[float] = None):
+        channel = self.open_session()
+        channel.exec_command(command)
+        return None, _ChannelFile(channel, "stdout"), _ChannelFile(channel, "stderr")
+    
+    def close(self):
+        self._active = False
+
+class HostSimulator:
+    """Simulated Linux hosts behind a fake SSH transport, seeing the LUNs mapped to them on an ArraySimulator"""
+    
+    def __init__(self, arrays: ArraySimulator, profile: Optional[SimulationProfile] = None,
+                 max_channels_per_host: int = 4):
+        self.arrays = arrays
+        self.profile = profile or arrays.profile
+        self.pool = SSHConnectionPool(max_channels_per_host, client_factory=lambda: SimulatedSSHClient(self))
+        self._hosts: Dict[str, SimulatedHostState] = {}
+        self._lock = threading.Lock()
+    
+    def host(self, host_ip: str) -> SimulatedHostState:
+        """The simulated host at host_ip, created on first use"""
+        with self._lock:
+            state = self._hosts.get(host_ip)
+            if state is None:
+                state = self._hosts[host_ip] = SimulatedHostState(host_ip, self.arrays, self.profile)
+            return state
+    
+    def host_factory(self, config):
+        """LinuxHost for config, connected through the simulated transport; usable as a fleet host_factory"""
+        from ..hosts.linux_host import LinuxHost
+        return LinuxHost(config, pool=self.pool)
@@ -0,0 +1,44 @@
+import random
+import threading
+from typing import Optional
+
+class SimulationProfile:
+    """Latency, failure rate and job durations of simulated arrays and hosts"""
+    
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 raid_init_seconds: float = 0.0, mkfs_seconds: float = 0.0, fio_seconds: float = 0.0,
+                 disks_per_array: int = 24, iops: float = 50000.0, seed: Optional[int] = None):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Share of API requests and host commands that fail
+        self.error_rate = error_rate
+        self.raid_init_seconds = raid_init_seconds
+        self.mkfs_seconds = mkfs_seconds
+        # Wall time of a simulated fio run, whatever runtime its job file asks for
+        self.fio_seconds = fio_seconds
+        self.disks_per_array = disks_per_array
+        # Saturated IOPS of one simulated volume
+        self.iops = iops
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def delay(self) -> float:
+        """Seconds one request or command takes"""
+        if not self.latency_ms and not self.jitter_ms:
+            return 0.0
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000.0
+    
+    def should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+    
+    def noise(self, spread: float = 0.05) -> float:
+        """Multiplier around 1.0 for run-to-run variation of simulated results"""
+        with self._lock:
+            return 1.0 + self._random.uniform(-spread, spread)
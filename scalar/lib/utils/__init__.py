@@ -1,5 +1,8 @@
 from .logger import setup_logging, get_logger
-from .helpers import retry, timeout
+from .helpers import retry, timeout, wait_for, async_wait_for
 from .validators import validate_ip, validate_credentials
+from .metrics import MetricsRegistry, get_registry
+from .lease import Lease, LeaseTimeout
 
-__all__ = ['setup_logging', 'get_logger', 'retry', 'timeout', 'validate_ip', 'validate_credentials']
+__all__ = ['setup_logging', 'get_logger', 'retry', 'timeout', 'wait_for', 'async_wait_for', 'validate_ip', 'validate_credentials',
+           'MetricsRegistry', 'get_registry', 'Lease', 'LeaseTimeout']
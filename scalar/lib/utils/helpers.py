@@ -1,5 +1,5 @@
 import time
-from typing import Callable, Any
+from typing import Awaitable, Callable, Any
 from functools import wraps
 
 def retry(max_attempts: int = 3, delay: int = 5, exceptions: tuple = (Exception,)):
@@ -40,3 +40,39 @@ def timeout(seconds: int):
             
             return result
         return wrapper
+
+def wait_for(condition: Callable[[], bool], timeout: float, initial_delay: float = 0.5,
+             max_delay: float = 10.0, backoff: float = 2.0) -> bool:
+    """Poll condition with exponential backoff until it is true or timeout expires"""
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    
+    while True:
+        if condition():
+            return True
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        
+        time.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_delay)
+
+async def async_wait_for(condition: Callable[[], Awaitable[bool]], timeout: float, initial_delay: float = 0.5,
+                         max_delay: float = 10.0, backoff: float = 2.0) -> bool:
+    """Async variant of wait_for for coroutine conditions"""
+    import asyncio
+    
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    
+    while True:
+        if await condition():
+            return True
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_delay)
@@ -0,0 +1,79 @@
+import fcntl
+import json
+import os
+import re
+import socket
+import time
+from typing import Dict, Optional, Any
+
+DEFAULT_LOCK_DIR = "/tmp/san_automation_locks"
+
+class LeaseTimeout(Exception):
+    """The lease is held by another process for longer than the wait allowed"""
+    pass
+
+class Lease:
+    """Exclusive lease on a named resource shared by processes on this machine
+    
+    Backed by flock on a lock file, so a crashed holder releases it automatically;
+    the file body names the current holder for diagnostics.
+    """
+    
+    def __init__(self, name: str, lock_dir: str = DEFAULT_LOCK_DIR):
+        self.name = name
+        self.path = os.path.join(lock_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', name) + ".lock")
+        self._fd: Optional[int] = None
+        os.makedirs(lock_dir, exist_ok=True)
+    
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+    
+    def acquire(self, timeout: float = 600, poll_interval: float = 0.5) -> "Lease":
+        """Block until the lease is ours or timeout expires"""
+        if self.held:
+            return self
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LeaseTimeout(f"Lease {self.name} is held by {self.holder()} after {timeout} seconds")
+                time.sleep(poll_interval)
+        
+        self._fd = fd
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps({
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "acquired_at": time.time()
+        }).encode())
+        return self
+    
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            os.ftruncate(self._fd, 0)
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+    
+    def holder(self) -> Optional[Dict[str, Any]]:
+        """Who holds the lease, as written by its holder"""
+        try:
+            with open(self.path) as f:
+                return json.loads(f.read() or 'null')
+        except (OSError, ValueError):
+            return None
+    
+    def __enter__(self) -> "Lease":
+        return self.acquire()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,184 @@
+import bisect
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+# Seconds; spans a fast REST call up to a long RAID initialization
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_ID_SEGMENT = re.compile(r'/[^/]*\d[^/]*')
+
+def endpoint_template(endpoint: str) -> str:
+    """Collapse id-like path segments so /storage/volumes/vol-17 becomes /storage/volumes/:id"""
+    return _ID_SEGMENT.sub('/:id', endpoint.split('?', 1)[0])
+
+def command_class(command: str) -> str:
+    """First program name of a shell command, e.g. 'mkfs.ext4' for 'mkfs.ext4 -F /dev/sdb'"""
+    words = command.split()
+    return words[0].rsplit('/', 1)[-1] if words else ''
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus model"""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}
+        }
+
+class MetricsRegistry:
+    """In-process histograms and counters keyed by metric name and labels"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+    
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    @contextmanager
+    def time_block(self, name: str, **labels) -> Iterator[None]:
+        """Record wall, CPU and wait (wall minus CPU) seconds of the block as <name>_seconds etc."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            self.observe(f"{name}_seconds", wall, **labels)
+            self.observe(f"{name}_cpu_seconds", cpu, **labels)
+            self.observe(f"{name}_wait_seconds", max(wall - cpu, 0.0), **labels)
+    
+    def record_api_call(self, method: str, endpoint: str, status: Any, seconds: float):
+        self.observe("san_api_request_seconds", seconds, method=method.upper(),
+                     endpoint=endpoint_template(endpoint), status=status)
+    
+    def record_command(self, command: str, exit_code: int, seconds: float, bytes_received: int):
+        kind = command_class(command)
+        self.observe("host_command_seconds", seconds, command=kind, exit_code=exit_code)
+        self.inc("host_command_bytes_total", bytes_received, command=kind)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Snapshot grouped by metric name, one entry per label set"""
+        with self._lock:
+            histograms = [(key, histogram.to_dict()) for key, histogram in self._histograms.items()]
+            counters = list(self._counters.items())
+        snapshot: Dict[str, List[Dict[str, Any]]] = {}
+        for (name, labels), value in histograms:
+            snapshot.setdefault(name, []).append({"labels": dict(labels), **value})
+        for (name, labels), value in counters:
+            snapshot.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return snapshot
+    
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+    
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = sorted(
+                (key, list(histogram.counts), histogram.sum, histogram.count, histogram.buckets)
+                for key, histogram in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+        
+        lines: List[str] = []
+        declared = set()
+        for (name, labels), counts, total, count, buckets in histograms:
+            if name not in declared:
+                declared.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in labels) + "}"
+
+_default_registry = MetricsRegistry()
+_default_registry.describe("pipeline_stage_seconds", "Wall-clock time of orchestrator stages")
+_default_registry.describe("pipeline_stage_cpu_seconds", "CPU time of orchestrator stages")
+_default_registry.describe("pipeline_stage_wait_seconds", "Time orchestrator stages spent waiting")
+_default_registry.describe("san_api_request_seconds", "Latency of SAN REST API requests")
+_default_registry.describe("host_command_seconds", "Latency of host commands")
+_default_registry.describe("host_command_bytes_total", "Output bytes received from host commands")
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return _default_registry
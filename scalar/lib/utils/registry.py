@@ -0,0 +1,70 @@
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Union
+
+class PluginRegistry(Mapping):
+    """Name -> class mapping whose classes are imported on first lookup
+    
+    Built-in plugins are registered as 'module:Class' paths; third-party packages add theirs
+    through the entry point group, which is only scanned when a name is not registered.
+    """
+    
+    def __init__(self, kind: str, entry_point_group: Optional[str] = None):
+        self.kind = kind
+        self.entry_point_group = entry_point_group
+        self._targets: Dict[str, Union[str, type]] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, target: Union[str, type]):
+        """Register a class, or a 'module:Class' path to import when it is first needed"""
+        with self._lock:
+            self._targets[name.lower()] = target
+    
+    def __getitem__(self, name: str) -> type:
+        key = name.lower()
+        if key not in self._targets:
+            self._load_entry_points()
+        with self._lock:
+            if key not in self._targets:
+                raise KeyError(f"Unknown {self.kind} type: {name}")
+            target = self._targets[key]
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(':')
+            target = getattr(importlib.import_module(module_name), attribute)
+            with self._lock:
+                self._targets[key] = target
+        return target
+    
+    def __iter__(self) -> Iterator[str]:
+        self._load_entry_points()
+        return iter(list(self._targets))
+    
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._targets)
+    
+    def __contains__(self, name: Any) -> bool:
+        if not isinstance(name, str):
+            return False
+        if name.lower() not in self._targets:
+            self._load_entry_points()
+        return name.lower() in self._targets
+    
+    def _load_entry_points(self):
+        if self._entry_points_loaded or not self.entry_point_group:
+            return
+        from importlib.metadata import entry_points
+        
+        discovered = entry_points()
+        if hasattr(discovered, 'select'):
+            found = discovered.select(group=self.entry_point_group)
+        else:
+            # Python < 3.10 returns a dict of groups
+            found = discovered.get(self.entry_point_group, [])
+        with self._lock:
+            for entry_point in found:
+                # Built-in names win over plugins claiming the same name
+                self._targets.setdefault(entry_point.name.lower(), entry_point.value)
+            self._entry_points_loaded = True
@@ -1,24 +1,54 @@
-from .base_vendor import BaseVendor
-from .dell_emc import DellEMCVendor
-from .netapp import NetAppVendor
-from .hpe import HPEVendor
-from .generic import GenericVendor
+from importlib import import_module
+from ..utils.registry import PluginRegistry
+from .inventory import DiskInventory, InventoryCache, get_inventory_cache
+from .placement import PlacementPlanner, RaidPlan
+
+# Vendor modules pull in HTTP clients, so they are imported on first use
+_LAZY_CLASSES = {
+    'BaseVendor': '.base_vendor',
+    'DellEMCVendor': '.dell_emc',
+    'NetAppVendor': '.netapp',
+    'HPEVendor': '.hpe',
+    'GenericVendor': '.generic',
+    'AsyncBaseVendor': '.async_vendor',
+    'AsyncGenericVendor': '.async_vendor',
+    'create_connector': '.async_vendor',
+}
 
 __all__ = [
     'BaseVendor',
     'DellEMCVendor',
     'NetAppVendor',
     'HPEVendor',
-    'GenericVendor'
+    'GenericVendor',
+    'AsyncBaseVendor',
+    'AsyncGenericVendor',
+    'create_connector',
+    'DiskInventory',
+    'InventoryCache',
+    'get_inventory_cache',
+    'PlacementPlanner',
+    'RaidPlan',
+    'VENDOR_MAP',
+    'get_vendor_class'
 ]
 
-VENDOR_MAP = {
-    'dell_emc': DellEMCVendor,
-    'netapp': NetAppVendor,
-    'hpe': HPEVendor,
-    'generic': GenericVendor
-}
+def __getattr__(name: str):
+    if name not in _LAZY_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_CLASSES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+# Third-party vendors register under the 'san_automation.vendors' entry point group
+VENDOR_MAP = PluginRegistry('vendor', entry_point_group='san_automation.vendors')
+VENDOR_MAP.register('dell_emc', f'{__name__}.dell_emc:DellEMCVendor')
+VENDOR_MAP.register('netapp', f'{__name__}.netapp:NetAppVendor')
+VENDOR_MAP.register('hpe', f'{__name__}.hpe:HPEVendor')
+VENDOR_MAP.register('generic', f'{__name__}.generic:GenericVendor')
 
 def get_vendor_class(vendor_type: str):
     """Get vendor class by type"""
-    return VENDOR_MAP.get(vendor_type.lower(), GenericVendor)
+    if vendor_type in VENDOR_MAP:
+        return VENDOR_MAP[vendor_type]
+    return VENDOR_MAP['generic']
@@ -0,0 +1,229 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any
+from ..core.exceptions import ConnectionError, OperationError
+from ..config import Config
+from ..utils.helpers import async_wait_for
+from ..utils.metrics import get_registry
+from .base_vendor import BaseVendor, _OperationPoll, _PollingUnsupported, _is_unsupported_endpoint
+
+class AsyncBaseVendor(ABC):
+    """Base class for asyncio SAN implementations - async counterpart of BaseVendor"""
+    
+    READY_STATES = BaseVendor.READY_STATES
+    FAILED_STATES = BaseVendor.FAILED_STATES
+    UNPOLLED_OPERATION_WAIT = BaseVendor.UNPOLLED_OPERATION_WAIT
+    
+    def __init__(self, config: Config, base_url: Optional[str] = None):
+        self.config = config
+        self.connected = False
+        # base_url points the vendor elsewhere, e.g. at a local simulator or proxy
+        self.api_base_url = base_url or f"https://{config.san_ip}/api"
+    
+    async def __aenter__(self) -> "AsyncBaseVendor":
+        if not await self.connect():
+            raise ConnectionError(f"Failed to connect to SAN {self.config.san_ip}")
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+    
+    @abstractmethod
+    async def connect(self) -> bool:
+        """Connect to SAN device"""
+        pass
+    
+    @abstractmethod
+    async def disconnect(self) -> bool:
+        """Disconnect from SAN device"""
+        pass
+    
+    @abstractmethod
+    async def _api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make API request to SAN"""
+        pass
+    
+    @abstractmethod
+    async def create_raid(self, disk_ids: List[str], raid_level: str) -> Optional[str]:
+        """Create RAID array"""
+        pass
+    
+    @abstractmethod
+    async def create_volume(self, array_id: str, name: str, size_gb: int) -> Optional[str]:
+        """Create volume on RAID array"""
+        pass
+    
+    @abstractmethod
+    async def map_volume_to_host(self, volume_id: str, host_identifier: str) -> bool:
+        """Map volume to host"""
+        pass
+    
+    async def get_disks(self) -> Optional[List[Dict]]:
+        """Get available disks - default implementation"""
+        try:
+            response = await self._api_request('GET', '/storage/disks')
+            return response.get('disks', [])
+        except Exception as e:
+            self._handle_error(f"Failed to get disks: {e}")
+            return None
+    
+    async def _get_operation_state(self, operation_id: str) -> Optional[str]:
+        """Get state of an async operation - default implementation"""
+        try:
+            response = await self._api_request('GET', f'/jobs/{operation_id}')
+        except Exception as e:
+            if _is_unsupported_endpoint(e):
+                raise _PollingUnsupported() from e
+            raise
+        return response.get('state')
+    
+    async def wait_for_operation(self, operation_id: str, timeout: int = 300,
+                                 initial_delay: float = 0.5, max_delay: float = 10.0) -> bool:
+        """Poll operation state with adaptive backoff until ready, failed or timed out"""
+        poll = _OperationPoll(self, operation_id, timeout)
+        
+        async def _is_ready() -> bool:
+            try:
+                state = await self._get_operation_state(operation_id)
+            except Exception as e:
+                return poll.poll_failed(e)
+            return poll.is_ready(state)
+        
+        try:
+            return (await async_wait_for(_is_ready, timeout, initial_delay=initial_delay, max_delay=max_delay)
+                    or poll.timed_out())
+        except _PollingUnsupported:
+            await asyncio.sleep(poll.unpolled_wait())
+            return True
+        except OperationError as e:
+            self._handle_error(str(e))
+            return False
+    
+    def _handle_error(self, message: str, exception: Exception = None):
+        """Handle errors consistently"""
+        from ..utils.logger import get_logger
+        logger = get_logger(__name__)
+        logger.error(message)
+        if exception:
+            logger.debug(f"Exception details: {exception}")
+
+def create_connector(max_connections: int = 100, max_connections_per_host: int = 32,
+                     keepalive_timeout: float = 30.0) -> Any:
+    """Create a bounded keep-alive connection pool that can be shared by several vendors"""
+    import aiohttp
+    
+    return aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_connections_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ssl=False  # For self-signed certs
+    )
+
+class AsyncGenericVendor(AsyncBaseVendor):
+    """Generic SAN implementation using REST API over a pooled aiohttp session"""
+    
+    def __init__(self, config: Config, connector: Any = None, max_connections: int = 100,
+                 max_connections_per_host: int = 32, request_timeout: float = 30.0,
+                 base_url: Optional[str] = None):
+        super().__init__(config, base_url=base_url)
+        self.connector = connector
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.request_timeout = request_timeout
+        self.session = None
+    
+    async def connect(self) -> bool:
+        import aiohttp
+        
+        try:
+            # A shared connector stays open when this vendor disconnects
+            owns_connector = self.connector is None
+            connector = self.connector or create_connector(self.max_connections, self.max_connections_per_host)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                connector_owner=owns_connector,
+                auth=aiohttp.BasicAuth(self.config.san_username, self.config.san_password),
+                headers={"Content-Type": "application/json", "Accept": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            
+            # Test connection
+            async with self.session.get(f"{self.api_base_url}/system/info") as response:
+                if response.status == 200:
+                    self.connected = True
+                    return True
+            await self.disconnect()
+            return False
+        except Exception as e:
+            self._handle_error(f"Connection failed: {e}")
+            await self.disconnect()
+            return False
+    
+    async def disconnect(self) -> bool:
+        if self.session:
+            await self.session.close()
+            self.session = None
+        self.connected = False
+        return True
+    
+    async def _api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        if not self.connected:
+            raise ConnectionError("Not connected to SAN")
+        
+        url = f"{self.api_base_url}{endpoint}"
+        start = time.perf_counter()
+        status: Any = "error"
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                status = response.status
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        finally:
+            get_registry().record_api_call(method, endpoint, status, time.perf_counter() - start)
+    
+    async def create_raid(self, disk_ids: List[str], raid_level: str) -> Optional[str]:
+        try:
+            response = await self._api_request('POST', '/storage/arrays', json={
+                "name": f"raid{raid_level}_array",
+                "raid_level": raid_level,
+                "disks": disk_ids
+            })
+            return response.get('id')
+        except Exception as e:
+            self._handle_error(f"Failed to create RAID {raid_level}: {e}")
+            return None
+    
+    async def create_volume(self, array_id: str, name: str, size_gb: int) -> Optional[str]:
+        try:
+            response = await self._api_request('POST', '/storage/volumes', json={
+                "name": name,
+                "array_id": array_id,
+                "size": size_gb,
+                "size_unit": "GB"
+            })
+            return response.get('id')
+        except Exception as e:
+            self._handle_error(f"Failed to create volume: {e}")
+            return None
+    
+    async def map_volume_to_host(self, volume_id: str, host_identifier: str) -> bool:
+        try:
+            await self._api_request('POST', '/storage/mappings', json={
+                "volume_id": volume_id,
+                "host_name": host_identifier,
+                "access_mode": "read_write"
+            })
+            return True
+        except Exception as e:
+            self._handle_error(f"Failed to map volume: {e}")
+            return False
+    
+    async def _get_operation_state(self, operation_id: str) -> Optional[str]:
+        # RAID creation is tracked on the array resource itself
+        response = await self._api_request('GET', f'/storage/arrays/{operation_id}')
+        state = response.get('status') or response.get('state')
+        if state is None:
+            # The array does not report initialization progress; wait_for_operation falls back to a fixed wait
+            raise _PollingUnsupported()
+        return state
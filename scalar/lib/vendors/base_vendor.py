@@ -1,15 +1,78 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from ..core.base_managers import BaseSanManager
+from ..core.exceptions import OperationError
 from ..config import Config
+from ..utils.helpers import wait_for
+from ..utils.logger import get_logger
+from .inventory import DiskInventory, InventoryCache, get_inventory_cache
+
+logger = get_logger(__name__)
+
+class _PollingUnsupported(Exception):
+    """The array has no endpoint to poll operation state"""
+
+def _is_unsupported_endpoint(error: Exception) -> bool:
+    """Whether an API error is a 404/405, from requests or aiohttp"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    return status in (404, 405)
+
+class _OperationPoll:
+    """Bookkeeping of one wait_for_operation call, shared by the sync and async vendors"""
+    
+    def __init__(self, vendor, operation_id: str, timeout: float):
+        self.vendor = vendor
+        self.operation_id = operation_id
+        self.timeout = timeout
+        self.errors: List[Exception] = []
+    
+    def is_ready(self, state: Optional[str]) -> bool:
+        """Whether a polled state means done; raises OperationError for a failed one"""
+        state = (state or '').lower()
+        if state in self.vendor.FAILED_STATES:
+            raise OperationError(f"Operation {self.operation_id} ended in state '{state}'")
+        return state in self.vendor.READY_STATES
+    
+    def poll_failed(self, error: Exception) -> bool:
+        """Record a failed poll; failed operations and missing endpoints end the wait"""
+        if isinstance(error, (OperationError, _PollingUnsupported)):
+            raise error
+        # Transient API errors should not abort the wait
+        logger.debug(f"Polling operation {self.operation_id} failed: {error}")
+        self.errors.append(error)
+        return False
+    
+    def timed_out(self) -> bool:
+        detail = f" ({len(self.errors)} failed polls, last: {self.errors[-1]})" if self.errors else ""
+        self.vendor._handle_error(
+            f"Operation {self.operation_id} did not complete within {self.timeout} seconds{detail}")
+        return False
+    
+    def unpolled_wait(self) -> float:
+        """Seconds to wait blindly on an array that cannot report the operation state"""
+        wait = min(self.vendor.UNPOLLED_OPERATION_WAIT, self.timeout)
+        logger.warning(f"Array cannot report the state of operation {self.operation_id}, waiting {wait}s instead")
+        return wait
 
 class BaseVendor(BaseSanManager, ABC):
     """Base class for vendor-specific SAN implementations"""
     
-    def __init__(self, config: Config):
+    # Arrays differ in what they call a finished job or an initialized group
+    READY_STATES = ('ready', 'online', 'optimal', 'normal', 'completed', 'succeeded', 'healthy', 'available', 'ok')
+    FAILED_STATES = ('failed', 'error', 'offline', 'aborted')
+    # Seconds to wait for an operation on arrays that cannot report its state
+    UNPOLLED_OPERATION_WAIT = 30
+    
+    def __init__(self, config: Config, inventory_cache: Optional[InventoryCache] = None,
+                 base_url: Optional[str] = None):
         super().__init__(config)
-        self.api_base_url = f"https://{config.san_ip}/api"
+        # base_url points the vendor elsewhere, e.g. at a local simulator or proxy
+        self.api_base_url = base_url or f"https://{config.san_ip}/api"
         self.session = None
+        self.inventory_cache = inventory_cache or get_inventory_cache()
+        self.inventory_page_size = 500
     
     @abstractmethod
     def _api_request(self, method: str, endpoint: str, **kwargs) -> Dict:
@@ -21,15 +84,133 @@ class BaseVendor(BaseSanManager, ABC):
         """Get authentication headers"""
         pass
     
-    def get_disks(self) -> Optional[List[Dict]]:
-        """Get available disks - default implementation"""
+    def get_disks(self, refresh: bool = False) -> Optional[List[Dict]]:
+        """Get available disks - default implementation, served from the inventory cache"""
+        inventory = self.get_inventory(refresh)
+        return list(inventory) if inventory is not None else None
+    
+    def get_inventory(self, refresh: bool = False) -> Optional[DiskInventory]:
+        """Get the indexed disk inventory, refetching only when stale or refresh is set"""
+        key = self.config.san_ip
         try:
-            response = self._api_request('GET', '/storage/disks')
-            return response.get('disks', [])
+            entry = self.inventory_cache.get(key)
+            if entry and not refresh and time.monotonic() - entry.fetched_at < self.config.inventory_ttl:
+                return entry.inventory
+            
+            # Concurrent callers wait here and then reuse the first caller's fetch
+            with self.inventory_cache.lock_for(key):
+                fresh = self.inventory_cache.get(key)
+                if fresh and fresh is not entry and not refresh:
+                    return fresh.inventory
+                
+                disks, etag = self._fetch_disks(entry.etag if entry else None)
+                if disks is None and entry:
+                    # Not modified since the cached copy
+                    self.inventory_cache.touch(key)
+                    return entry.inventory
+                
+                inventory = DiskInventory(disks or [])
+                self.inventory_cache.put(key, inventory, etag)
+                return inventory
         except Exception as e:
             self._handle_error(f"Failed to get disks: {e}")
             return None
     
+    def invalidate_inventory(self):
+        """Drop the cached inventory of this array, e.g. after disks were consumed"""
+        self.inventory_cache.invalidate(self.config.san_ip)
+    
+    def iter_disk_pages(self, offset: int = 0) -> Iterator[List[Dict]]:
+        """Stream the disk inventory page by page, starting at offset"""
+        while True:
+            response = self._api_request('GET', '/storage/disks',
+                                         params={'offset': offset, 'limit': self.inventory_page_size},
+                                         headers=self._get_auth_headers(), timeout=30)
+            page = response.get('disks', [])
+            yield page
+            offset += len(page)
+            # Arrays without pagination return everything and no total
+            total = response.get('total')
+            if not page or total is None or offset >= total:
+                return
+    
+    def _fetch_disks(self, etag: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """Fetch the full inventory; returns (None, etag) if unchanged since etag"""
+        disks = []
+        for page in self.iter_disk_pages():
+            disks.extend(page)
+        return disks, None
+    
+    def get_array(self, array_id: str) -> Optional[Dict]:
+        return self._get_resource(f'/storage/arrays/{array_id}')
+    
+    def get_volume(self, volume_id: str) -> Optional[Dict]:
+        return self._get_resource(f'/storage/volumes/{volume_id}')
+    
+    def get_volume_hosts(self, volume_id: str) -> Optional[List[str]]:
+        try:
+            response = self._api_request('GET', '/storage/mappings', params={'volume_id': volume_id},
+                                         headers=self._get_auth_headers(), timeout=30)
+            return [mapping.get('host_name') for mapping in response.get('mappings', [])]
+        except Exception as e:
+            self._handle_error(f"Failed to get mappings of volume {volume_id}: {e}")
+            return None
+    
+    def get_volume_mapping(self, volume_id: str, host_identifier: str) -> Optional[Dict]:
+        try:
+            response = self._api_request('GET', '/storage/mappings', params={'volume_id': volume_id},
+                                         headers=self._get_auth_headers(), timeout=30)
+        except Exception as e:
+            self._handle_error(f"Failed to get mappings of volume {volume_id}: {e}")
+            return None
+        for mapping in response.get('mappings', []):
+            if mapping.get('host_name') != host_identifier:
+                continue
+            lun = mapping.get('lun', mapping.get('lun_id'))
+            targets = (mapping.get('target_ports') or mapping.get('target_wwpns') or mapping.get('target_iqn')
+                       or mapping.get('target') or [])
+            return {"lun": lun, "targets": [targets] if isinstance(targets, str) else list(targets)}
+        return None
+    
+    def _get_resource(self, endpoint: str) -> Optional[Dict]:
+        """GET a single resource; None if it is gone or cannot be read"""
+        try:
+            return self._api_request('GET', endpoint, headers=self._get_auth_headers(), timeout=30)
+        except Exception as e:
+            self._handle_error(f"Failed to get {endpoint}: {e}")
+            return None
+    
+    def _get_operation_state(self, operation_id: str) -> Optional[str]:
+        """Get state of an async operation - default implementation"""
+        try:
+            response = self._api_request('GET', f'/jobs/{operation_id}')
+        except Exception as e:
+            if _is_unsupported_endpoint(e):
+                raise _PollingUnsupported() from e
+            raise
+        return response.get('state')
+    
+    def wait_for_operation(self, operation_id: str, timeout: int = 300,
+                           initial_delay: float = 0.5, max_delay: float = 10.0) -> bool:
+        """Poll operation state with adaptive backoff until ready, failed or timed out"""
+        poll = _OperationPoll(self, operation_id, timeout)
+        
+        def _is_ready() -> bool:
+            try:
+                state = self._get_operation_state(operation_id)
+            except Exception as e:
+                return poll.poll_failed(e)
+            return poll.is_ready(state)
+        
+        try:
+            return wait_for(_is_ready, timeout, initial_delay=initial_delay, max_delay=max_delay) or poll.timed_out()
+        except _PollingUnsupported:
+            time.sleep(poll.unpolled_wait())
+            return True
+        except OperationError as e:
+            self._handle_error(str(e))
+            return False
+    
     def _handle_error(self, message: str, exception: Exception = None):
         """Handle errors consistently"""
         from ..utils.logger import get_logger
@@ -1,12 +1,25 @@
-import requests
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from ..config import Config
-from .base_vendor import BaseVendor
+from .base_vendor import BaseVendor, _PollingUnsupported
+from ..utils.metrics import get_registry
+
+class _BulkUnsupported(Exception):
+    """The array has no bulk endpoint"""
+    pass
 
 class GenericVendor(BaseVendor):
     """Generic SAN implementation using REST API"""
     
+    bulk_supported = True
+    bulk_batch_size = 100
+    
     def connect(self) -> bool:
+        if self.connected:
+            # Keep the authenticated session and its pooled connections
+            return True
+        import requests
+        
         try:
             self.session = requests.Session()
             # Basic authentication
@@ -34,8 +47,171 @@ class GenericVendor(BaseVendor):
             raise ConnectionError("Not connected to SAN")
         
         url = f"{self.api_base_url}{endpoint}"
-        response = getattr(self.session, method.lower())(url, **kwargs)
+        start = time.perf_counter()
+        status: Any = "error"
+        try:
+            response = getattr(self.session, method.lower())(url, **kwargs)
+            status = response.status_code
+            response.raise_for_status()
+            return response.json()
+        finally:
+            get_registry().record_api_call(method, endpoint, status, time.perf_counter() - start)
+    
+    def _fetch_disks(self, etag: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        if not self.connected:
+            raise ConnectionError("Not connected to SAN")
+        
+        # Conditional request on the first page; unchanged arrays answer 304
+        headers = self._get_auth_headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        start = time.perf_counter()
+        response = self.session.get(
+            f"{self.api_base_url}/storage/disks",
+            params={'offset': 0, 'limit': self.inventory_page_size},
+            headers=headers,
+            timeout=30
+        )
+        get_registry().record_api_call('GET', '/storage/disks', response.status_code, time.perf_counter() - start)
+        if response.status_code == 304:
+            return None, etag
         response.raise_for_status()
-        return response.json()
+        
+        first_page = response.json()
+        disks = list(first_page.get('disks', []))
+        total = first_page.get('total')
+        if total is not None and disks and len(disks) < total:
+            for page in self.iter_disk_pages(offset=len(disks)):
+                disks.extend(page)
+        return disks, response.headers.get('ETag')
+    
+    def _get_auth_headers(self) -> Dict:
+        # Basic auth is carried by the session
+        return {"Content-Type": "application/json", "Accept": "application/json"}
+    
+    def create_raid(self, disk_ids: List[str], raid_level: str) -> Optional[str]:
+        try:
+            response = self._api_request('POST', '/storage/arrays', json={
+                "name": f"raid{raid_level}_array",
+                "raid_level": raid_level,
+                "disks": disk_ids
+            }, headers=self._get_auth_headers(), timeout=60)
+            # Member disks are no longer available
+            self.invalidate_inventory()
+            return response.get('id')
+        except Exception as e:
+            self._handle_error(f"Failed to create RAID {raid_level}: {e}")
+            return None
+    
+    def create_volume(self, array_id: str, name: str, size_gb: int) -> Optional[str]:
+        try:
+            response = self._api_request('POST', '/storage/volumes', json={
+                "name": name,
+                "array_id": array_id,
+                "size": size_gb,
+                "size_unit": "GB"
+            }, headers=self._get_auth_headers(), timeout=30)
+            return response.get('id')
+        except Exception as e:
+            self._handle_error(f"Failed to create volume: {e}")
+            return None
+    
+    def map_volume_to_host(self, volume_id: str, host_identifier: str) -> bool:
+        try:
+            self._api_request('POST', '/storage/mappings', json={
+                "volume_id": volume_id,
+                "host_name": host_identifier,
+                "access_mode": "read_write"
+            }, headers=self._get_auth_headers(), timeout=30)
+            return True
+        except Exception as e:
+            self._handle_error(f"Failed to map volume: {e}")
+            return False
+    
+    def create_volumes(self, volumes: List[Dict[str, Any]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Create volumes through the bulk endpoint, one request per bulk_batch_size specs"""
+        if not self.bulk_supported:
+            return super().create_volumes(volumes, max_workers)
+        
+        results = []
+        for start in range(0, len(volumes), self.bulk_batch_size):
+            batch = volumes[start:start + self.bulk_batch_size]
+            try:
+                items = self._bulk_request('/storage/volumes/bulk', {"volumes": [{
+                    "name": spec['name'],
+                    "array_id": spec['array_id'],
+                    "size": spec['size_gb'],
+                    "size_unit": "GB"
+                } for spec in batch]})
+            except _BulkUnsupported:
+                return results + super().create_volumes(volumes[start:], max_workers)
+            except Exception as e:
+                self._handle_error(f"Failed to create volumes: {e}")
+                items = [{"error": str(e)}] * len(batch)
+            
+            for spec, item in zip(batch, items):
+                volume_id = item.get('id') if not item.get('error') else None
+                results.append({
+                    "name": spec['name'],
+                    "volume_id": volume_id,
+                    "success": volume_id is not None,
+                    "error": item.get('error') or (None if volume_id else "Volume creation failed")
+                })
+        return results
+    
+    def map_volumes(self, mappings: List[Tuple[str, str]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Map volumes through the bulk endpoint, one request per bulk_batch_size pairs"""
+        if not self.bulk_supported:
+            return super().map_volumes(mappings, max_workers)
+        
+        results = []
+        for start in range(0, len(mappings), self.bulk_batch_size):
+            batch = mappings[start:start + self.bulk_batch_size]
+            try:
+                items = self._bulk_request('/storage/mappings/bulk', {"mappings": [{
+                    "volume_id": volume_id,
+                    "host_name": host,
+                    "access_mode": "read_write"
+                } for volume_id, host in batch]})
+            except _BulkUnsupported:
+                return results + super().map_volumes(mappings[start:], max_workers)
+            except Exception as e:
+                self._handle_error(f"Failed to map volumes: {e}")
+                items = [{"error": str(e)}] * len(batch)
+            
+            for (volume_id, host), item in zip(batch, items):
+                results.append({
+                    "volume_id": volume_id,
+                    "host": host,
+                    "success": not item.get('error'),
+                    "error": item.get('error')
+                })
+        return results
+    
+    def _bulk_request(self, endpoint: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """POST a bulk payload and get the per-item results in request order"""
+        import requests
+        
+        try:
+            response = self._api_request('POST', endpoint, json=payload, headers=self._get_auth_headers(),
+                                         timeout=120)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in (404, 405, 501):
+                # Older firmware without bulk endpoints; stop trying for this session
+                self.bulk_supported = False
+                raise _BulkUnsupported() from e
+            raise
+        items = response.get('results', [])
+        expected = len(next(iter(payload.values())))
+        if len(items) != expected:
+            raise ValueError(f"Bulk response has {len(items)} results for {expected} items")
+        return items
     
-    def _get_auth_headers(self) -> Dict
+    def _get_operation_state(self, operation_id: str) -> Optional[str]:
+        # RAID creation is tracked on the array resource itself
+        response = self._api_request('GET', f'/storage/arrays/{operation_id}', timeout=10)
+        state = response.get('status') or response.get('state')
+        if state is None:
+            # The array does not report initialization progress; wait_for_operation falls back to a fixed wait
+            raise _PollingUnsupported()
+        return state
@@ -0,0 +1,126 @@
+import bisect
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+def disk_size_gb(disk: Dict[str, Any]) -> float:
+    """Disk capacity in GB across the field names arrays commonly use"""
+    if 'size_gb' in disk:
+        return float(disk['size_gb'])
+    if 'capacity_gb' in disk:
+        return float(disk['capacity_gb'])
+    if 'size' in disk:
+        return float(disk['size'])
+    return 0.0
+
+def disk_media_type(disk: Dict[str, Any]) -> str:
+    return str(disk.get('media_type') or disk.get('type') or 'unknown').lower()
+
+def disk_state(disk: Dict[str, Any]) -> str:
+    return str(disk.get('state') or disk.get('status') or 'unknown').lower()
+
+# Fields arrays use to name the RAID group, pool or aggregate a disk already belongs to
+MEMBERSHIP_FIELDS = ('raid_group', 'raid_group_id', 'array_id', 'disk_group', 'group', 'group_id',
+                     'pool', 'pool_id', 'storage_pool', 'aggregate')
+
+def disk_membership(disk: Dict[str, Any]) -> Optional[str]:
+    """Group, pool or aggregate the disk is a member of, or None for an unassigned disk"""
+    for field in MEMBERSHIP_FIELDS:
+        if disk.get(field) not in (None, '', 'none'):
+            return str(disk[field])
+    return None
+
+class DiskInventory:
+    """Immutable disk list with indexes by id, state, media type and size"""
+    
+    def __init__(self, disks: List[Dict[str, Any]]):
+        self.disks = disks
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_state: Dict[str, List[int]] = {}
+        self.by_media: Dict[str, List[int]] = {}
+        for index, disk in enumerate(disks):
+            if 'id' in disk:
+                self.by_id[disk['id']] = disk
+            self.by_state.setdefault(disk_state(disk), []).append(index)
+            self.by_media.setdefault(disk_media_type(disk), []).append(index)
+        # Sorted (size, index) pairs answer size range queries with bisect
+        self._by_size: List[Tuple[float, int]] = sorted((disk_size_gb(disk), index) for index, disk in enumerate(disks))
+        self._sizes = [size for size, _ in self._by_size]
+    
+    def __len__(self) -> int:
+        return len(self.disks)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.disks)
+    
+    def get(self, disk_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(disk_id)
+    
+    def find(self, state: Optional[str] = None, media_type: Optional[str] = None,
+             min_size_gb: Optional[float] = None, max_size_gb: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Get disks matching every given filter, in inventory order"""
+        candidates = None
+        if state is not None:
+            candidates = set(self.by_state.get(state.lower(), ()))
+        if media_type is not None:
+            matches = set(self.by_media.get(media_type.lower(), ()))
+            candidates = matches if candidates is None else candidates & matches
+        if min_size_gb is not None or max_size_gb is not None:
+            low = 0 if min_size_gb is None else bisect.bisect_left(self._sizes, min_size_gb)
+            high = len(self._sizes) if max_size_gb is None else bisect.bisect_right(self._sizes, max_size_gb)
+            matches = {index for _, index in self._by_size[low:high]}
+            candidates = matches if candidates is None else candidates & matches
+        
+        if candidates is None:
+            return list(self.disks)
+        return [self.disks[index] for index in sorted(candidates)]
+
+class _CacheEntry:
+    """Cached inventory with its ETag and fetch time"""
+    
+    def __init__(self, inventory: DiskInventory, etag: Optional[str]):
+        self.inventory = inventory
+        self.etag = etag
+        self.fetched_at = time.monotonic()
+
+class InventoryCache:
+    """Disk inventories per array shared by every vendor instance in the process"""
+    
+    def __init__(self):
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def lock_for(self, key: str) -> threading.Lock:
+        """Lock held while refreshing key, so concurrent misses fetch only once"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+    
+    def put(self, key: str, inventory: DiskInventory, etag: Optional[str] = None):
+        with self._lock:
+            self._entries[key] = _CacheEntry(inventory, etag)
+    
+    def touch(self, key: str):
+        """Mark an entry fresh again, e.g. after a 304 Not Modified"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.fetched_at = time.monotonic()
+    
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one array's inventory, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+_default_cache = InventoryCache()
+
+def get_inventory_cache() -> InventoryCache:
+    """Get the process-wide inventory cache"""
+    return _default_cache
@@ -0,0 +1,198 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from .inventory import disk_media_type, disk_membership, disk_size_gb, disk_state
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (minimum, default) member count per RAID level
+RAID_MEMBERS = {
+    '0': (1, 4),
+    '1': (2, 2),
+    '5': (3, 5),
+    '6': (4, 6),
+    '10': (4, 8),
+}
+
+# Only disks reported as free join new groups; arrays also call RAID members 'online' or 'healthy',
+# and hot spares are kept for rebuilds
+FREE_STATES = ('available', 'unused', 'spare-free')
+
+def normalize_raid_level(raid_level: str) -> str:
+    """Map 'RAID5', 'raid-10' and '5' style names to the keys of RAID_MEMBERS"""
+    level = str(raid_level).lower().replace('raid', '').strip(' -_')
+    if level not in RAID_MEMBERS:
+        raise ValueError(f"Unsupported RAID level: {raid_level}")
+    return level
+
+def member_count(raid_level: str, members: Optional[int] = None) -> int:
+    """Validate a requested member count, or get the default for the RAID level"""
+    level = normalize_raid_level(raid_level)
+    minimum, default = RAID_MEMBERS[level]
+    if members is None:
+        return default
+    if members < minimum:
+        raise ValueError(f"RAID {level} needs at least {minimum} disks, got {members}")
+    if level == '1' and members != 2:
+        raise ValueError("RAID 1 needs exactly 2 disks")
+    if level == '10' and members % 2:
+        raise ValueError("RAID 10 needs an even number of disks")
+    return members
+
+def usable_fraction(raid_level: str, members: int) -> float:
+    """Fraction of raw capacity left for data"""
+    level = normalize_raid_level(raid_level)
+    if level == '0':
+        return 1.0
+    if level in ('1', '10'):
+        return 0.5
+    parity = 1 if level == '5' else 2
+    return (members - parity) / members
+
+def disk_location(disk: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(controller, enclosure, bus) of a disk; missing fields share one domain"""
+    controller = disk.get('controller', disk.get('controller_id', ''))
+    enclosure = disk.get('enclosure', disk.get('enclosure_id', ''))
+    bus = disk.get('bus', disk.get('channel', ''))
+    return str(controller), str(enclosure), str(bus)
+
+class RaidPlan:
+    """Member disks chosen for one RAID group"""
+    
+    __slots__ = ('raid_level', 'disks', 'media_type', 'size_gb')
+    
+    def __init__(self, raid_level: str, disks: List[Dict[str, Any]], media_type: str, size_gb: float):
+        self.raid_level = raid_level
+        self.disks = disks
+        self.media_type = media_type
+        self.size_gb = size_gb
+    
+    @property
+    def disk_ids(self) -> List[str]:
+        return [disk['id'] for disk in self.disks]
+    
+    @property
+    def usable_gb(self) -> float:
+        return self.size_gb * len(self.disks) * usable_fraction(self.raid_level, len(self.disks))
+    
+    def spread(self) -> Dict[str, int]:
+        """Number of distinct controllers, enclosures and buses the members span"""
+        locations = [disk_location(disk) for disk in self.disks]
+        return {
+            "controllers": len({controller for controller, _, _ in locations}),
+            "enclosures": len({enclosure for _, enclosure, _ in locations}),
+            "buses": len({(enclosure, bus) for _, enclosure, bus in locations}),
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "raid_level": self.raid_level,
+            "disk_ids": self.disk_ids,
+            "media_type": self.media_type,
+            "size_gb": self.size_gb,
+            "usable_gb": self.usable_gb,
+            "spread": self.spread()
+        }
+
+class _Pool:
+    """Free disks of one media type and size, bucketed by location"""
+    
+    def __init__(self, media_type: str, size_gb: float):
+        self.media_type = media_type
+        self.size_gb = size_gb
+        self.by_location: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self.remaining = 0
+    
+    def add(self, disk: Dict[str, Any]):
+        self.by_location.setdefault(disk_location(disk), []).append(disk)
+        self.remaining += 1
+    
+    def take_group(self, members: int) -> List[Dict[str, Any]]:
+        """Pick members disks, each from the least used controller, then enclosure, then bus"""
+        controllers: Counter = Counter()
+        enclosures: Counter = Counter()
+        buses: Counter = Counter()
+        chosen = []
+        for _ in range(members):
+            # Ties go to the fullest location so later groups stay balanced too
+            location = min(
+                (location for location, disks in self.by_location.items() if disks),
+                key=lambda loc: (controllers[loc[0]], enclosures[loc[1]], buses[(loc[1], loc[2])],
+                                 -len(self.by_location[loc]))
+            )
+            chosen.append(self.by_location[location].pop())
+            controllers[location[0]] += 1
+            enclosures[location[1]] += 1
+            buses[(location[1], location[2])] += 1
+        self.remaining -= members
+        return chosen
+
+class PlacementPlanner:
+    """Choose free RAID members by media and size, spread across controllers, enclosures and buses"""
+    
+    def __init__(self, free_states: Tuple[str, ...] = FREE_STATES, allow_unknown: bool = False):
+        # allow_unknown also takes disks the array reports no state for, e.g. on arrays without health data
+        self.free_states = tuple(free_states) + (('unknown',) if allow_unknown else ())
+    
+    def plan(self, disks: Iterable[Dict[str, Any]], raid_level: str, groups: int = 1,
+             members: Optional[int] = None, media_type: Optional[str] = None,
+             min_usable_gb: float = 0, exclude: Iterable[str] = ()) -> List[RaidPlan]:
+        """Plan up to groups RAID groups; fewer are returned if the inventory runs out"""
+        disks = list(disks)
+        if members is not None:
+            counts = [member_count(raid_level, members)]
+        else:
+            # Narrower groups than the default are better than none on small arrays
+            minimum, default = RAID_MEMBERS[normalize_raid_level(raid_level)]
+            step = 2 if normalize_raid_level(raid_level) == '10' else 1
+            counts = list(range(default, minimum - 1, -step))
+        
+        best: List[RaidPlan] = []
+        for count in counts:
+            plans = self._plan_groups(disks, raid_level, groups, count, media_type, min_usable_gb, set(exclude))
+            if len(plans) > len(best):
+                best = plans
+            if len(best) == groups:
+                break
+        
+        if len(best) < groups:
+            logger.warning(f"Only {len(best)} of {groups} RAID {raid_level} groups could be placed")
+        return best
+    
+    def _plan_groups(self, disks: List[Dict[str, Any]], raid_level: str, groups: int, members: int,
+                     media_type: Optional[str], min_usable_gb: float, excluded: set) -> List[RaidPlan]:
+        fraction = usable_fraction(raid_level, members)
+        pools: Dict[Tuple[str, float], _Pool] = {}
+        for disk in disks:
+            if 'id' not in disk or disk['id'] in excluded or disk_state(disk) not in self.free_states:
+                continue
+            # Whatever its state, a disk that belongs to a group or pool is not free
+            if disk_membership(disk) is not None:
+                continue
+            media = disk_media_type(disk)
+            if media_type is not None and media != media_type.lower():
+                continue
+            # Members of a group share media and size, otherwise the group runs at its slowest/smallest disk
+            size = round(disk_size_gb(disk))
+            if size * members * fraction < min_usable_gb:
+                continue
+            key = (media, size)
+            if key not in pools:
+                pools[key] = _Pool(media, size)
+            pools[key].add(disk)
+        
+        # Prefer pools that can build every group, then the widest spread, then the most disks
+        needed = groups * members
+        ordered = sorted(
+            pools.values(),
+            key=lambda pool: (pool.remaining >= needed, len(pool.by_location), pool.remaining, pool.size_gb),
+            reverse=True
+        )
+        
+        plans = []
+        for pool in ordered:
+            while len(plans) < groups and pool.remaining >= members:
+                plans.append(RaidPlan(raid_level, pool.take_group(members), pool.media_type, pool.size_gb))
+            if len(plans) == groups:
+                break
+        return plans
@@ -0,0 +1,15 @@
+import importlib.util
+import os
+import sys
+
+# The library lives in scalar/lib with its package __init__ in "Main Package"; expose it as san_automation
+_LIB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+
+if 'san_automation' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'san_automation', os.path.join(_LIB_DIR, 'Main Package', '__init__.py'),
+        submodule_search_locations=[_LIB_DIR]
+    )
+    _package = importlib.util.module_from_spec(_spec)
+    sys.modules['san_automation'] = _package
+    _spec.loader.exec_module(_package)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.simulator import ArraySimulator, SimulationProfile
+from san_automation.vendors.async_vendor import AsyncBaseVendor, AsyncGenericVendor
+
+class _JobPollingVendor(AsyncGenericVendor):
+    """AsyncGenericVendor polling /jobs/<id> like AsyncBaseVendor, which the simulator does not serve"""
+    
+    UNPOLLED_OPERATION_WAIT = 0.05
+    _get_operation_state = AsyncBaseVendor._get_operation_state
+
+class _MethodNotAllowedVendor(_JobPollingVendor):
+    """Vendor whose array answers GET /jobs/<id> with 405"""
+    
+    async def _api_request(self, method, endpoint, **kwargs):
+        import aiohttp
+        
+        if endpoint.startswith('/jobs/'):
+            raise aiohttp.ClientResponseError(None, (), status=405, message="Method Not Allowed")
+        return await super()._api_request(method, endpoint, **kwargs)
+
+class AsyncGenericVendorTest(unittest.TestCase):
+    """AsyncGenericVendor against the REST array simulator"""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.arrays = ArraySimulator(SimulationProfile(disks_per_array=24, raid_init_seconds=0.2, seed=0))
+        self.arrays.start()
+        self.addCleanup(self.arrays.stop)
+        self.config = target_configs(1)[0]
+    
+    def _run(self, coroutine_function, vendor_class=AsyncGenericVendor):
+        """Run coroutine_function(vendor) with a connected vendor for the simulated array"""
+        async def _main():
+            vendor = vendor_class(self.config, base_url=self.arrays.base_url(self.config.san_ip))
+            async with vendor:
+                return await coroutine_function(vendor)
+        return asyncio.run(_main())
+    
+    def _disk_ids(self, count, start=0):
+        return [disk['id'] for disk in self.arrays.array(self.config.san_ip).disks[start:start + count]]
+    
+    def test_concurrent_volume_creation_and_mapping(self):
+        async def _provision(vendor):
+            array_id = await vendor.create_raid(self._disk_ids(4), "5")
+            self.assertTrue(await vendor.wait_for_operation(array_id, timeout=5, initial_delay=0.05))
+            volume_ids = await asyncio.gather(*(vendor.create_volume(array_id, f"vol{index}", 10)
+                                                for index in range(16)))
+            mapped = await asyncio.gather(*(vendor.map_volume_to_host(volume_id, f"host{index % 4}")
+                                            for index, volume_id in enumerate(volume_ids)))
+            return volume_ids, mapped
+        
+        volume_ids, mapped = self._run(_provision)
+        self.assertEqual(len(set(volume_ids)), 16)
+        self.assertNotIn(None, volume_ids)
+        self.assertEqual(mapped, [True] * 16)
+        array = self.arrays.array(self.config.san_ip)
+        self.assertEqual(sorted(array.volumes), sorted(volume_ids))
+        self.assertEqual(len(array.mappings), 16)
+    
+    def test_errors_surface_as_failed_results(self):
+        async def _failures(vendor):
+            array_id = await vendor.create_raid(self._disk_ids(3), "5")
+            return (
+                # The same disks are in use now
+                await vendor.create_raid(self._disk_ids(3), "5"),
+                await vendor.create_volume("array-missing", "vol0", 10),
+                await vendor.map_volume_to_host("vol-missing", "host0"),
+                await vendor.create_volume(array_id, "vol0", 10)
+            )
+        
+        conflict, no_array, no_volume, volume_id = self._run(_failures)
+        self.assertIsNone(conflict)
+        self.assertIsNone(no_array)
+        self.assertFalse(no_volume)
+        self.assertIsNotNone(volume_id)
+    
+    def test_wait_for_operation_tracks_raid_initialization(self):
+        async def _wait(vendor):
+            array_id = await vendor.create_raid(self._disk_ids(2), "1")
+            start = time.monotonic()
+            ready = await vendor.wait_for_operation(array_id, timeout=5, initial_delay=0.02, max_delay=0.05)
+            return ready, time.monotonic() - start
+        
+        ready, seconds = self._run(_wait)
+        self.assertTrue(ready)
+        self.assertGreaterEqual(seconds, 0.1)
+    
+    def test_wait_for_operation_falls_back_when_jobs_are_not_served(self):
+        async def _wait(vendor):
+            start = time.monotonic()
+            ready = await vendor.wait_for_operation("job-1", timeout=5, initial_delay=0.02)
+            return ready, time.monotonic() - start
+        
+        for vendor_class in (_JobPollingVendor, _MethodNotAllowedVendor):
+            ready, seconds = self._run(_wait, vendor_class)
+            self.assertTrue(ready, vendor_class.__name__)
+            self.assertLess(seconds, 1, vendor_class.__name__)
+    
+    def test_wait_for_operation_times_out_on_unknown_array(self):
+        async def _wait(vendor):
+            # GET /storage/arrays/<id> of an unknown group is a 404 on an endpoint that does exist
+            return await vendor.wait_for_operation("array-missing", timeout=0.2, initial_delay=0.02)
+        
+        self.assertFalse(self._run(_wait))
+
+if __name__ == '__main__':
+    unittest.main()
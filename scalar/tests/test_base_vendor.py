@@ -0,0 +1,112 @@
+import logging
+import time
+import unittest
+from san_automation.config import Config
+from san_automation.vendors.base_vendor import BaseVendor
+from san_automation.vendors.generic import GenericVendor
+
+class _HTTPError(Exception):
+    """Stand-in for requests.HTTPError carrying a response status"""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"{status_code} Error")
+        self.response = type('Response', (), {'status_code': status_code})()
+
+def _config() -> Config:
+    return Config(san_ip="10.0.0.1", host_ip="10.0.0.2", san_username="admin", san_password="password",
+                  host_username="root", host_password="password")
+
+class _CannedResponses:
+    """Answers every API request from a list of canned responses or errors; the last one repeats"""
+    
+    UNPOLLED_OPERATION_WAIT = 0.05
+    
+    def __init__(self, responses):
+        super().__init__(_config())
+        self.responses = list(responses)
+        self.requests = []
+    
+    def _api_request(self, method, endpoint, **kwargs):
+        self.requests.append((method, endpoint))
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+class _PolledVendor(_CannedResponses, BaseVendor):
+    """Vendor polling /jobs/<id> for its operations"""
+    
+    def _get_auth_headers(self):
+        return {}
+    
+    def connect(self):
+        return True
+    
+    def disconnect(self):
+        return True
+    
+    def create_raid(self, disk_ids, raid_level):
+        return None
+    
+    def create_volume(self, array_id, name, size_gb):
+        return None
+    
+    def map_volume_to_host(self, volume_id, host_identifier):
+        return False
+
+class _PolledGenericVendor(_CannedResponses, GenericVendor):
+    """GenericVendor polling the array resource itself"""
+
+class WaitForOperationTest(unittest.TestCase):
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+    
+    def _wait(self, vendor, timeout=0.5):
+        start = time.monotonic()
+        result = vendor.wait_for_operation("job-1", timeout, initial_delay=0.01, max_delay=0.02)
+        return result, time.monotonic() - start
+    
+    def test_ready_after_polls(self):
+        vendor = _PolledVendor([{"state": "running"}, {"state": "running"}, {"state": "completed"}])
+        self.assertEqual(self._wait(vendor)[0], True)
+        self.assertEqual(vendor.requests, [('GET', '/jobs/job-1')] * 3)
+    
+    def test_healthy_and_ok_are_ready(self):
+        for state in ('healthy', 'available', 'OK'):
+            self.assertTrue(self._wait(_PolledVendor([{"state": state}]))[0], state)
+    
+    def test_failed_state_stops_the_wait(self):
+        result, seconds = self._wait(_PolledVendor([{"state": "failed"}]), timeout=5)
+        self.assertFalse(result)
+        self.assertLess(seconds, 1)
+    
+    def test_missing_jobs_endpoint_falls_back_to_fixed_wait(self):
+        for status_code in (404, 405):
+            vendor = _PolledVendor([_HTTPError(status_code)])
+            result, seconds = self._wait(vendor, timeout=5)
+            self.assertTrue(result)
+            self.assertEqual(len(vendor.requests), 1)
+            self.assertLess(seconds, 1)
+    
+    def test_transient_errors_are_retried_until_timeout(self):
+        vendor = _PolledVendor([_HTTPError(500)])
+        result, seconds = self._wait(vendor, timeout=0.2)
+        self.assertFalse(result)
+        self.assertGreater(len(vendor.requests), 1)
+        self.assertGreaterEqual(seconds, 0.2)
+    
+    def test_array_without_state_field_falls_back_to_fixed_wait(self):
+        vendor = _PolledGenericVendor([{"id": "array-1"}])
+        result, seconds = self._wait(vendor, timeout=5)
+        self.assertTrue(result)
+        self.assertEqual(vendor.requests, [('GET', '/storage/arrays/job-1')])
+    
+    def test_array_status_field_is_polled(self):
+        vendor = _PolledGenericVendor([{"status": "initializing"}, {"status": "ready"}])
+        self.assertTrue(self._wait(vendor)[0])
+        self.assertEqual(len(vendor.requests), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import dataclasses
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.hosts.block_devices import (find_by_wwn, new_devices, normalize_target, normalize_wwn,
+                                               parse_hctl, parse_multipath, parse_path_stats, parse_snapshot,
+                                               path_distribution, wwn_matches)
+from san_automation.hosts.linux_host import LinuxHost
+from san_automation.performance.telemetry import TelemetryCapture
+
+SNAPSHOT = "\n".join([
+    "sda\tt10.ATA     SIM-BOOT\t976773168\tATA\tSIM-BOOT\tboot-1",
+    "sdb\tnaa.60002ac000000000000000000000a1b2\t2097152\t3PARdata\tVV\tvol-1",
+    "sdc\tnaa.60002ac000000000000000000000a1b2\t2097152\t3PARdata\tVV\tvol-1",
+    "sr0\t\t2097152\tQEMU\tDVD-ROM\t",
+    "loop0\t\t204800\t\t\t",
+    "dm-3\t\t2097152\t\t\t",
+    "sdd\t\t0\tSIM\tEMPTY\t",
+    "broken line",
+])
+
+MULTIPATH = "\n".join([
+    "dm-3\tmpatha\t360002ac000000000000000000000a1b2\tsdc sdb \t0 2097152 multipath 0 1 alua 1 1 service-time 0 2 1",
+    "dm-4\tmpathb\t360002ac000000000000000000000ffff\tsde\t0 2097152 multipath 0 0 1 1 round-robin 0 1 1",
+    "dm-5\tmpathc\t360002ac000000000000000000000eeee\t",
+    "",
+])
+
+class NormalizeWwnTest(unittest.TestCase):
+    
+    def test_notations_of_one_wwn_match(self):
+        for notation in ("naa.60002AC000000000000000000000A1B2", "360002ac000000000000000000000a1b2",
+                         "0x60002ac000000000000000000000a1b2", "60:00:2a:c0:00:00:00:00:00:00:00:00:00:00:a1:b2"):
+            self.assertEqual(normalize_wwn(notation), "60002ac000000000000000000000a1b2", notation)
+        # NAA 5 identifiers are 16 digits, 17 with the designator
+        self.assertEqual(normalize_wwn("35000c500a1b2c3d4"), "5000c500a1b2c3d4")
+        self.assertEqual(normalize_wwn("eui.0025385a71b2c3d4"), "0025385a71b2c3d4")
+    
+    def test_empty_and_partial_values_never_match(self):
+        self.assertEqual(normalize_wwn(None), "")
+        self.assertFalse(wwn_matches("", ""))
+        self.assertFalse(wwn_matches("naa.60002ac000000000000000000000a1b2", None))
+        self.assertFalse(wwn_matches("naa.60002ac000000000000000000000a1b2", "a1b2"))
+        self.assertTrue(wwn_matches("360002ac000000000000000000000a1b2", "naa.60002ac000000000000000000000A1B2"))
+    
+    def test_targets_are_in_sysfs_notation(self):
+        self.assertEqual(normalize_target("50:00:2A:C0:01:02:03:04"), "0x50002ac001020304")
+        self.assertEqual(normalize_target("0x50002AC001020304"), "0x50002ac001020304")
+        iqn = "iqn.2000-05.com.3pardata:21210002ac01"
+        self.assertEqual(normalize_target(iqn), iqn)
+
+class SnapshotTest(unittest.TestCase):
+    
+    def test_parse_snapshot(self):
+        devices = parse_snapshot(SNAPSHOT)
+        self.assertNotIn("broken line", devices)
+        self.assertEqual(devices["sdb"]["size_bytes"], 2097152 * 512)
+        self.assertEqual(devices["sda"]["wwid"], "t10.ATA     SIM-BOOT")
+        self.assertEqual(devices["sr0"]["wwid"], "")
+    
+    def test_find_by_wwn_skips_virtual_and_empty_devices(self):
+        devices = parse_snapshot(SNAPSHOT)
+        self.assertEqual(find_by_wwn(devices, "naa.60002AC000000000000000000000A1B2"), ["sdb", "sdc"])
+        self.assertEqual(find_by_wwn(devices, "naa.60002ac000000000000000000000ffff"), [])
+    
+    def test_new_devices_since_baseline(self):
+        baseline = parse_snapshot(SNAPSHOT)
+        current = dict(baseline, sdaa={"wwid": "naa.1", "size_bytes": 512}, sdz={"wwid": "naa.2", "size_bytes": 512},
+                       loop1={"wwid": "", "size_bytes": 512})
+        # A known name with a different WWID is a new LUN too
+        current["sdc"] = dict(baseline["sdc"], wwid="naa.3")
+        # sdz sorts before sdaa, as the kernel assigns them
+        self.assertEqual(new_devices(baseline, current), ["sdc", "sdz", "sdaa"])
+
+class MultipathTest(unittest.TestCase):
+    
+    def test_parse_multipath(self):
+        maps = parse_multipath(MULTIPATH)
+        self.assertEqual([mpath["name"] for mpath in maps], ["mpatha", "mpathb", "mpathc"])
+        self.assertEqual(maps[0], {"dm": "dm-3", "name": "mpatha", "wwid": "360002ac000000000000000000000a1b2",
+                                   "paths": ["sdb", "sdc"], "policy": "service-time"})
+        self.assertEqual(maps[1]["policy"], "round-robin")
+        self.assertEqual(maps[2]["paths"], [])
+        self.assertIsNone(maps[2]["policy"])
+        self.assertTrue(wwn_matches(maps[0]["wwid"], "naa.60002ac000000000000000000000a1b2"))
+    
+    def test_parse_hctl_drops_duplicates(self):
+        self.assertEqual(parse_hctl("1:0:0\n1:0:0\n2:0:1\nbogus\n3:0\n"), [(1, 0, 0), (2, 0, 1)])
+
+class PathStatsTest(unittest.TestCase):
+    
+    BEFORE = ("sdb running 100 0 800 10 50 0 400 5 0 20 15 0 0 0 0\n"
+              "sdc running 100 0 800 10 50 0 400 5 0 20 15 0 0 0 0\n")
+    AFTER = ("sdb running 400 0 3200 40 150 0 1200 15 0 80 55 0 0 0 0\n"
+             "sdc offline 100 0 800 10 50 0 400 5 0 20 15 0 0 0 0\n"
+             "sdd unknown cat: /sys/block/sdd/stat: No such file\n")
+    
+    def test_parse_path_stats(self):
+        stats = parse_path_stats(self.AFTER)
+        self.assertEqual(sorted(stats), ["sdb", "sdc"])
+        self.assertEqual(stats["sdb"], {"state": "running", "read_ios": 400, "read_sectors": 3200,
+                                        "write_ios": 150, "write_sectors": 1200})
+    
+    def test_path_distribution(self):
+        distribution = path_distribution(parse_path_stats(self.BEFORE), parse_path_stats(self.AFTER))
+        self.assertEqual(distribution["sdb"]["read_ios"], 300)
+        self.assertEqual(distribution["sdb"]["write_bytes"], 800 * 512)
+        self.assertEqual(distribution["sdb"]["share"], 1.0)
+        self.assertEqual(distribution["sdc"]["share"], 0.0)
+        self.assertEqual(distribution["sdc"]["state"], "offline")
+    
+    def test_idle_paths_have_no_share(self):
+        stats = parse_path_stats(self.BEFORE)
+        self.assertEqual({name: delta["share"] for name, delta in path_distribution(stats, stats).items()},
+                         {"sdb": 0.0, "sdc": 0.0})
+
+class DiskstatsSampleTest(unittest.TestCase):
+    """/proc/diskstats lines of a multipath map are sampled by its dm-N name"""
+    
+    def test_diskstats_of_the_dm_device(self):
+        capture = TelemetryCapture(interval_ms=1000, device="dm-3")
+        for line in ("@sample T 1700000000000000000",
+                     "@sample  253       3 dm-3 1000 0 8000 120 500 0 4000 60 2 170 180 0 0 0 0",
+                     "@sample  253       4 dm-4 9 0 9 9 9 0 9 9 0 9 9 0 0 0 0",
+                     "@sample  253       3 dm-3 x 0 8000 120 500 0 4000 60 2 170 180 0 0 0 0"):
+            capture.feed_sample_line(line)
+        columns = {name: list(values) for name, values in capture.series["diskstats"].columns.items()}
+        self.assertEqual(columns, {"time_ns": [1700000000000000000], "reads_completed": [1000],
+                                   "sectors_read": [8000], "read_ms": [120], "writes_completed": [500],
+                                   "sectors_written": [4000], "write_ms": [60], "in_flight": [2], "io_ms": [170],
+                                   "weighted_io_ms": [180]})
+        self.assertEqual(capture.dropped_lines, 1)
+
+class TelemetryRunDirTest(unittest.TestCase):
+    
+    def test_runs_started_together_get_their_own_directory(self):
+        config = dataclasses.replace(target_configs(1)[0], telemetry_dir="/var/telemetry")
+        first = LinuxHost(config)._telemetry_run_dir()
+        second = LinuxHost(dataclasses.replace(config, volume_name="bench_other"))._telemetry_run_dir()
+        self.assertTrue(first.startswith(f"/var/telemetry/{config.host_ip}-bench_0-"), first)
+        self.assertIn("-bench_other-", second)
+        self.assertNotEqual(first, LinuxHost(config)._telemetry_run_dir())
+    
+    def test_no_directory_without_telemetry_dir(self):
+        self.assertIsNone(LinuxHost(target_configs(1)[0])._telemetry_run_dir())
+
+if __name__ == '__main__':
+    unittest.main()
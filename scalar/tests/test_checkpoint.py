@@ -0,0 +1,132 @@
+import dataclasses
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.core.checkpoint import Checkpoint
+from san_automation.core.orchestrator import SanAutomationOrchestrator
+from san_automation.hosts.block_devices import MULTIPATH_COMMAND
+from san_automation.hosts.linux_host import LinuxHost
+from san_automation.simulator import ArraySimulator, HostSimulator, SimulationProfile
+from san_automation.vendors.inventory import get_inventory_cache
+
+class CheckpointTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.config = target_configs(1)[0]
+    
+    def test_stages_and_state_survive_a_reload(self):
+        checkpoint = Checkpoint.for_config(self.config, self.directory)
+        checkpoint.complete("raid_created", array_id="array-1", disk_ids=["disk-1", "disk-2"])
+        checkpoint.complete("volume_created", volume_id="vol-2")
+        
+        resumed = Checkpoint.for_config(self.config, self.directory)
+        self.assertEqual(resumed.stages, ["raid_created", "volume_created"])
+        self.assertEqual(resumed.state["disk_ids"], ["disk-1", "disk-2"])
+        self.assertTrue(resumed.done("volume_created"))
+        self.assertFalse(os.path.exists(checkpoint.path + ".tmp"))
+    
+    def test_changed_identity_starts_over(self):
+        Checkpoint.for_config(self.config, self.directory).complete("raid_created", array_id="array-1")
+        changed = Checkpoint.for_config(dataclasses.replace(self.config, raid_level="6"), self.directory)
+        self.assertEqual(changed.stages, [])
+        self.assertIsNone(changed.state["array_id"])
+    
+    def test_unreadable_file_starts_over(self):
+        checkpoint = Checkpoint.for_config(self.config, self.directory)
+        with open(checkpoint.path, 'w') as f:
+            f.write("{truncated")
+        self.assertFalse(checkpoint.load())
+        self.assertEqual(checkpoint.stages, [])
+    
+    def test_invalidate_drops_later_stages(self):
+        checkpoint = Checkpoint.for_config(self.config, self.directory)
+        for stage in ("raid_created", "volume_created", "volume_mapped"):
+            checkpoint.complete(stage)
+        checkpoint.invalidate("volume_created")
+        self.assertEqual(Checkpoint.for_config(self.config, self.directory).stages, ["raid_created"])
+
+class OrchestratorResumeTest(unittest.TestCase):
+    """Reruns against the array and host simulators resume from the checkpoint"""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        get_inventory_cache().invalidate()
+        self.arrays = ArraySimulator(SimulationProfile(seed=0))
+        self.arrays.start()
+        self.addCleanup(self.arrays.stop)
+        self.hosts = HostSimulator(self.arrays)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.config = dataclasses.replace(target_configs(1)[0], checkpoint_dir=directory)
+    
+    def _provision(self) -> SanAutomationOrchestrator:
+        orchestrator = SanAutomationOrchestrator(self.arrays.san_factory(self.config),
+                                                 self.hosts.host_factory(self.config))
+        self.addCleanup(orchestrator.cleanup)
+        self.assertTrue(orchestrator.initialize_connections())
+        self.assertTrue(orchestrator.create_storage_infrastructure())
+        self.assertTrue(orchestrator.configure_host_storage())
+        return orchestrator
+    
+    def test_rerun_resumes_every_stage(self):
+        first = self._provision()
+        second = self._provision()
+        self.assertEqual(second.resumed_stages,
+                         ["raid_created", "volume_created", "volume_mapped", "volume_mounted"])
+        self.assertEqual(second.host_manager.device, first.host_manager.device)
+        self.assertEqual(len(self.arrays.array(self.config.san_ip).raid_groups), 1)
+    
+    def test_device_with_another_wwid_is_not_resumed(self):
+        first = self._provision()
+        device = first.host_manager.device.rsplit('/', 1)[-1]
+        host = self.hosts.host(self.config.host_ip)
+        # After a reboot the LUN comes back as sdz and its old name belongs to another LUN
+        host.devices["sdz"] = host.devices[device]
+        host._by_wwn[first.volume_wwn] = "sdz"
+        host.devices[device] = dict(host.devices[device], wwid="naa.6fffffffffffffffffffffffffffffff")
+        host.mounts.clear()
+        
+        second = self._provision()
+        self.assertEqual(second.resumed_stages, ["raid_created", "volume_created", "volume_mapped"])
+        self.assertEqual(second.host_manager.device, "/dev/sdz")
+        self.assertEqual(second.checkpoint.state["device"], "/dev/sdz")
+
+class _MultipathHost(LinuxHost):
+    """LinuxHost answering the multipathd and dm-multipath queries with one map"""
+    
+    MAP = "dm-3\tmpatha\t36000d31000aaaa000000000000000001\tsdc sdb\t0 2097152 multipath 0 0 1 1 service-time 0 2 1"
+    
+    def execute_command(self, command, timeout=None):
+        if command == "pidof multipathd":
+            return {"success": True, "stdout": "412", "stderr": "", "exit_code": 0}
+        if command == MULTIPATH_COMMAND:
+            return {"success": True, "stdout": self.MAP, "stderr": "", "exit_code": 0}
+        return {"success": False, "stdout": "", "stderr": "", "exit_code": 1}
+
+class RestoreDeviceTest(unittest.TestCase):
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.host = _MultipathHost(target_configs(1)[0])
+    
+    def test_multipath_map_is_looked_up_again(self):
+        self.host.restore_device("/dev/mapper/mpatha", "naa.6000d31000aaaa000000000000000001")
+        self.assertEqual(self.host.device, "/dev/mapper/mpatha")
+        self.assertEqual(self.host.multipath["dm"], "dm-3")
+        self.assertEqual(self.host.multipath["paths"], ["sdb", "sdc"])
+    
+    def test_path_device_has_no_multipath_map(self):
+        self.host.multipath = {"dm": "dm-9"}
+        self.host.restore_device("/dev/sdb", "naa.6000d31000aaaa000000000000000001")
+        self.assertEqual(self.host.device, "/dev/sdb")
+        self.assertIsNone(self.host.multipath)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import logging
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.hosts.command_stream import CommandStream
+from san_automation.hosts.linux_host import LinuxHost
+from san_automation.simulator import ArraySimulator, HostSimulator, SimulationProfile
+
+class _PipeChannel:
+    """Channel of a command that writes all of stderr before any stdout, as a pipe-filling command does"""
+    
+    def __init__(self, stdout: bytes, stderr: bytes, pipe_size: int = 4096):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.pipe_size = pipe_size
+        self.closed = False
+    
+    def recv_ready(self) -> bool:
+        return not self.stderr and bool(self.stdout)
+    
+    def recv_stderr_ready(self) -> bool:
+        return bool(self.stderr)
+    
+    def recv(self, size: int) -> bytes:
+        data, self.stdout = self.stdout[:min(size, self.pipe_size)], self.stdout[min(size, self.pipe_size):]
+        return data
+    
+    def recv_stderr(self, size: int) -> bytes:
+        data, self.stderr = self.stderr[:min(size, self.pipe_size)], self.stderr[min(size, self.pipe_size):]
+        return data
+    
+    def exit_status_ready(self) -> bool:
+        return not self.stdout and not self.stderr
+    
+    def recv_exit_status(self) -> int:
+        return 3
+    
+    def close(self):
+        self.closed = True
+
+class CommandStreamTest(unittest.TestCase):
+    
+    def test_read_all_drains_both_pipes(self):
+        channel = _PipeChannel(b"out\n" * 5000, b"err\n" * 5000)
+        stream = CommandStream(channel, read_timeout=1, poll_interval=0)
+        stdout, stderr = stream.read_all()
+        self.assertEqual((len(stdout), len(stderr)), (20000, 20000))
+        self.assertEqual(stream.exit_code, 3)
+        self.assertEqual(stream.bytes_received, 40000)
+        self.assertTrue(channel.closed)
+    
+    def test_lines_keep_their_source(self):
+        lines = list(CommandStream(_PipeChannel(b"a\nb", b"warning\n"), poll_interval=0))
+        self.assertEqual(lines, [("stderr", "warning"), ("stdout", "a"), ("stdout", "b")])
+
+class HostCommandTest(unittest.TestCase):
+    """Commands on a simulated host through the pooled transport"""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.arrays = ArraySimulator(SimulationProfile(seed=0))
+        self.hosts = HostSimulator(self.arrays, max_channels_per_host=2)
+        self.host = LinuxHost(target_configs(1)[0], pool=self.hosts.pool)
+        self.assertTrue(self.host.connect())
+        self.addCleanup(self.host.disconnect)
+    
+    def _free_slots(self) -> int:
+        slots = self.hosts.pool._host_limit(self.host.config.host_ip)
+        taken = 0
+        while slots.acquire(blocking=False):
+            taken += 1
+        for _ in range(taken):
+            slots.release()
+        return taken
+    
+    def test_execute_command_keeps_stdout_and_stderr_apart(self):
+        result = self.host.execute_command("blkid -p /dev/sdz")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["exit_code"], 2)
+        self.assertEqual(result["stdout"], "")
+        self.assertEqual(self._free_slots(), 2)
+    
+    def test_stream_left_early_gives_back_its_slot(self):
+        with self.host.stream_command("cat /proc/diskstats") as stream:
+            self.assertEqual(self._free_slots(), 1)
+        self.assertTrue(stream.channel.closed)
+        self.assertEqual(self._free_slots(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
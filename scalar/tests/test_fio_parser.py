@@ -0,0 +1,83 @@
+import json
+import unittest
+from san_automation.performance.fio_parser import parse_fio_lines, parse_fio_output
+
+def _direction(iops, bw, ns=True):
+    """fio section of one I/O direction; latencies in ns (fio >= 3) or us (legacy)"""
+    scale = 1000 if ns else 1
+    clat = {"min": 50 * scale, "max": 900 * scale, "mean": 120.5 * scale, "stddev": 10 * scale, "N": 1000,
+            "percentile": {"50.000000": 110 * scale, "99.000000": 400 * scale}}
+    return {"io_bytes": 4096 * 1000, "bw": bw, "iops": iops, "runtime": 1000, "total_ios": 1000,
+            ("clat_ns" if ns else "clat"): clat}
+
+FIO_DOCUMENT = {
+    "fio version": "fio-3.35",
+    "timestamp": 1700000000,
+    "jobs": [
+        {"jobname": "randread", "error": 0, "read": _direction(1000.0, 4000), "write": _direction(0.0, 0),
+         "usr_cpu": 1.5, "sys_cpu": 3.0, "ctx": 42,
+         "latency_us": {"100": 60.0, "250": 30.0, "500": 0.0}, "latency_ms": {">=2000": 0.01}},
+        {"jobname": "legacy", "error": 0, "read": _direction(500.0, 2000, ns=False), "write": _direction(250.0, 1000)}
+    ],
+    "disk_util": [{"name": "sdb", "util": 99.5}]
+}
+
+class ParseFioOutputTest(unittest.TestCase):
+    
+    def test_totals_and_jobs(self):
+        result = parse_fio_output(json.dumps(FIO_DOCUMENT))
+        self.assertEqual(result.fio_version, "fio-3.35")
+        self.assertEqual([job.name for job in result.jobs], ["randread", "legacy"])
+        self.assertEqual(result.read_iops, 1500.0)
+        self.assertEqual(result.write_iops, 250.0)
+        self.assertEqual(result.read_bw_kbps, 6000.0)
+        self.assertTrue(result.success)
+        self.assertEqual(result.jobs[0].context_switches, 42)
+        self.assertEqual(result.disk_util[0]["name"], "sdb")
+    
+    def test_latencies_are_microseconds_in_both_units(self):
+        result = parse_fio_output(json.dumps(FIO_DOCUMENT))
+        for job in result.jobs:
+            clat = job.read.clat
+            self.assertEqual(clat.mean, 120.5)
+            self.assertEqual(clat.samples, 1000)
+            self.assertEqual(clat.percentile(99), 400.0)
+            self.assertIsNone(clat.percentile(99.9))
+    
+    def test_latency_histogram_is_sorted_in_microseconds(self):
+        job = parse_fio_output(json.dumps(FIO_DOCUMENT)).jobs[0]
+        self.assertEqual(job.latency_histogram, ((100.0, 60.0), (250.0, 30.0), (2000000.0, 0.01)))
+    
+    def test_text_before_the_document_is_skipped(self):
+        output = "fio: file hash not empty on exit\n" + json.dumps(FIO_DOCUMENT, indent=2) + "\ntrailing\n"
+        self.assertEqual(parse_fio_output(output).read_iops, 1500.0)
+    
+    def test_job_error_fails_the_run(self):
+        document = dict(FIO_DOCUMENT, jobs=[dict(FIO_DOCUMENT["jobs"][0], error=5)])
+        self.assertFalse(parse_fio_output(json.dumps(document)).success)
+        self.assertFalse(parse_fio_output(json.dumps({"jobs": []})).success)
+    
+    def test_output_without_json_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_fio_output("fio: failed to open /dev/sdz\n")
+    
+    def test_to_dict_is_json_serializable(self):
+        result = parse_fio_output(json.dumps(FIO_DOCUMENT))
+        data = result.to_dict()
+        self.assertEqual(data["read_iops"], 1500.0)
+        self.assertEqual(data["jobs"][0]["read"]["clat"]["percentiles"], {"50": 110.0, "99": 400.0})
+        json.dumps(data)
+
+class ParseFioLinesTest(unittest.TestCase):
+    
+    def test_streamed_lines_match_the_whole_output(self):
+        lines = ["fio: warning before the document"] + json.dumps(FIO_DOCUMENT, indent=2).splitlines()
+        streamed = parse_fio_lines(iter(lines))
+        self.assertEqual(streamed.to_dict(), parse_fio_output('\n'.join(lines)).to_dict())
+    
+    def test_stream_without_json_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_fio_lines(iter(["fio: no such file", ""]))
+
+if __name__ == '__main__':
+    unittest.main()
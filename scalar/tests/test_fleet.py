@@ -0,0 +1,54 @@
+import logging
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.core.fleet import FleetOrchestrator
+from san_automation.simulator import ArraySimulator, HostSimulator, SimulationProfile
+from san_automation.vendors.inventory import get_inventory_cache
+
+class FleetOrchestratorTest(unittest.TestCase):
+    """Fleet runs against the in-process array and host simulators"""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        # Every simulator starts with all disks free; drop inventories cached by earlier tests
+        get_inventory_cache().invalidate()
+        self.arrays = ArraySimulator(SimulationProfile(disks_per_array=48, seed=0))
+        self.arrays.start()
+        self.addCleanup(self.arrays.stop)
+        self.hosts = HostSimulator(self.arrays)
+    
+    def _fleet(self, configs, max_workers):
+        return FleetOrchestrator(configs, max_workers=max_workers, san_factory=self.arrays.san_factory,
+                                 host_factory=self.hosts.host_factory)
+    
+    def test_distinct_targets(self):
+        report = self._fleet(target_configs(6), max_workers=6).run()
+        self.assertEqual(report["succeeded"], 6)
+        self.assertTrue(report["success"])
+        self.assertEqual([target["target"]["san_ip"] for target in report["targets"]],
+                         [config.san_ip for config in target_configs(6)])
+    
+    def test_one_san_many_hosts_concurrently(self):
+        config = target_configs(1)[0]
+        host_ips = [f"10.9.0.{index}" for index in range(1, 9)]
+        fleet = FleetOrchestrator.from_hosts(config, host_ips, max_workers=8, san_factory=self.arrays.san_factory,
+                                             host_factory=self.hosts.host_factory)
+        report = fleet.run()
+        errors = [target["error"] for target in report["targets"] if target["error"]]
+        self.assertEqual(report["succeeded"], 8, errors)
+        
+        # Every target got a RAID group of its own disks
+        members = [disk for array in self.arrays.array(config.san_ip).raid_groups.values() for disk in array["disks"]]
+        self.assertEqual(len(members), len(set(members)))
+    
+    def test_failed_target_does_not_stop_the_fleet(self):
+        configs = target_configs(3)
+        configs[1].raid_level = "7"
+        report = self._fleet(configs, max_workers=3).run()
+        self.assertEqual(report["succeeded"], 2)
+        self.assertEqual(report["failed"], 1)
+        self.assertFalse(report["targets"][1]["success"])
+
+if __name__ == '__main__':
+    unittest.main()
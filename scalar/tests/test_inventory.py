@@ -0,0 +1,45 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from san_automation.benchmarks.suites import target_dicts
+from san_automation.config import InventoryLoader, inventory
+from san_automation.config.schema import ConfigSchema
+
+class InventoryLoaderTest(unittest.TestCase):
+    
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "inventory.json")
+        with open(self.path, 'w') as f:
+            json.dump({"groups": {"lab": {"targets": target_dicts(2)}}}, f)
+        self.loader = InventoryLoader()
+    
+    def test_each_load_gets_its_own_copy(self):
+        first = self.loader.load(self.path)
+        first.get("10.1.0.1/bench_0").volume_size_gb = 500
+        first.groups["lab"].append("extra")
+        
+        second = self.loader.load(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.get("10.1.0.1/bench_0").volume_size_gb, 100)
+        self.assertEqual(second.groups["lab"], ["10.1.0.1/bench_0", "10.1.0.2/bench_1"])
+    
+    def test_touched_file_is_not_parsed_again(self):
+        self.loader.load(self.path)
+        os.utime(self.path, ns=(0, 0))
+        with mock.patch.object(inventory, 'parse_inventory', side_effect=AssertionError("parsed again")):
+            self.assertEqual(len(self.loader.load(self.path)), 2)
+
+class NumericLimitsTest(unittest.TestCase):
+    
+    def test_bounds(self):
+        data = dict(target_dicts(1)[0], volume_size_gb=0, inventory_ttl=0, min_paths=0)
+        self.assertEqual(ConfigSchema().errors(data), ["Volume size must be positive",
+                                                       "Minimum path count must be at least 1"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import logging
+import shutil
+import tempfile
+import unittest
+from dataclasses import replace
+from types import SimpleNamespace
+from san_automation.benchmarks.suites import target_configs
+from san_automation.keywords.library import SanAutomationLibrary, _Target
+from san_automation.performance.fio_parser import FioResult, IoStats, JobResult, LatencyStats
+from san_automation.utils.lease import Lease, LeaseTimeout
+
+def _fio_result(read_iops: float) -> FioResult:
+    clat = LatencyStats(mean=100.0, percentiles={99.0: 200.0})
+    return FioResult(jobs=[JobResult("job", read=IoStats(iops=read_iops, bw_kbps=read_iops * 4, clat=clat))])
+
+class _Orchestrator:
+    """Just enough of an orchestrator for the regression keyword"""
+    
+    regression_verdict = None
+    
+    def get_status_report(self):
+        return {"success": True}
+
+class _LibraryTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir)
+        self.library = SanAutomationLibrary(lock_dir=self.lock_dir, results_db=":memory:", lease_timeout=0.2)
+        self.addCleanup(self.library.close_all_targets)
+    
+    def _target(self, config) -> _Target:
+        """Register a target for config without connecting its managers"""
+        target = _Target(config, SimpleNamespace(config=config, disconnect=lambda: None),
+                         SimpleNamespace(config=config, disconnect=lambda: None),
+                         self.library._target_leases(config))
+        self.library._targets[(config.san_ip, config.host_ip)] = target
+        self.library._current = target
+        return target
+
+class TargetLeaseTest(_LibraryTestCase):
+    
+    def _free(self, name) -> bool:
+        """Whether another holder could take the lease now"""
+        try:
+            Lease(name, self.lock_dir).acquire(timeout=0).release()
+        except LeaseTimeout:
+            return False
+        return True
+    
+    def test_targets_on_one_array_share_its_lease(self):
+        config = target_configs(2)[0]
+        first = self._target(config)
+        self.library.acquire_target_lease()
+        second = self._target(replace(config, host_ip="10.2.0.99"))
+        self.assertIs(second.leases[0], first.leases[0])
+        # Would wait for lease_timeout and fail if the second target took its own flock
+        self.library.acquire_target_lease()
+        
+        self.library._current = first
+        self.library.release_target()
+        self.assertFalse(self._free(f"array-{config.san_ip}"))
+        self.assertTrue(self._free(f"host-{config.host_ip}"))
+        
+        self.library._current = second
+        self.library.release_target()
+        self.assertTrue(self._free(f"array-{config.san_ip}"))
+    
+    def test_end_of_suite_releases_its_leases(self):
+        config = target_configs(1)[0]
+        self._target(config)
+        self.library._start_suite(None, None)
+        self.library.acquire_target_lease()
+        self.assertFalse(self._free(f"array-{config.san_ip}"))
+        self.library._end_suite(None, None)
+        self.assertTrue(self._free(f"array-{config.san_ip}"))
+        self.assertTrue(self._free(f"host-{config.host_ip}"))
+
+class ResultShouldBeatBaselineTest(_LibraryTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.config = target_configs(1)[0]
+        self.target = self._target(self.config)
+        self.target.orchestrator = _Orchestrator()
+        self.target.profile = "randread"
+        self.store = self.library._results_store()
+        for iops in (1000.0, 1010.0, 990.0, 1005.0, 995.0):
+            self.store.record_run(replace(self.config, fio_profile="randread"), {"success": True},
+                                  performance=_fio_result(iops))
+    
+    def _history(self):
+        return self.store.metric_history('read_iops', self.config.vendor_type, self.config.raid_level, "randread")
+    
+    def test_passing_result_is_recorded(self):
+        self.target.result = _fio_result(1000.0)
+        self.assertTrue(self.library.result_should_beat_baseline(metrics="read_iops")["passed"])
+        self.assertEqual(len(self._history()), 6)
+    
+    def test_regressed_result_is_not_recorded(self):
+        self.target.result = _fio_result(100.0)
+        with self.assertRaisesRegex(AssertionError, "regressed: read_iops"):
+            self.library.result_should_beat_baseline(metrics="read_iops")
+        self.assertEqual(len(self._history()), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import logging
+import unittest
+from san_automation.vendors.placement import PlacementPlanner, member_count, normalize_raid_level
+
+def _disks(count, state="available", media_type="ssd", size_gb=960, **fields):
+    """Disks spread over 2 controllers, 2 enclosures and 4 buses"""
+    return [dict({"id": f"{media_type}-{size_gb}-{state}-{number}", "state": state, "media_type": media_type,
+                  "size_gb": size_gb, "controller": f"ctrl{number % 2}", "enclosure": f"enc{number % 4 // 2}",
+                  "bus": number % 4}, **fields) for number in range(count)]
+
+class PlacementPlannerTest(unittest.TestCase):
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+    
+    def test_members_are_spread_across_locations(self):
+        plan = PlacementPlanner().plan(_disks(8), "raid5")[0]
+        self.assertEqual(len(plan.disks), 5)
+        self.assertEqual(plan.spread(), {"controllers": 2, "enclosures": 2, "buses": 4})
+        self.assertEqual(plan.usable_gb, 960 * 4)
+    
+    def test_only_explicitly_free_states_are_taken(self):
+        members = [dict(disk, state=state) for disk, state in
+                   zip(_disks(7), ('online', 'healthy', 'normal', 'ok', 'good', 'in_use', 'spare'))]
+        free = _disks(2, state="unused") + _disks(1, state="spare-free")
+        plans = PlacementPlanner().plan(members + free, "5")
+        self.assertEqual(len(plans), 1)
+        self.assertEqual(sorted(disk["state"] for disk in plans[0].disks), ["spare-free", "unused", "unused"])
+    
+    def test_disks_with_a_group_are_not_free(self):
+        disks = (_disks(4, raid_group="rg-1") + _disks(4, size_gb=1920, pool_id="pool0")
+                 + _disks(4, size_gb=3840, aggregate="aggr1") + _disks(3, size_gb=7680, pool=None))
+        plans = PlacementPlanner().plan(disks, "5")
+        self.assertEqual(len(plans), 1)
+        self.assertEqual(plans[0].size_gb, 7680)
+    
+    def test_unknown_state_needs_allow_unknown(self):
+        disks = [{key: value for key, value in disk.items() if key != 'state'} for disk in _disks(4)]
+        self.assertEqual(PlacementPlanner().plan(disks, "5"), [])
+        self.assertEqual(len(PlacementPlanner(allow_unknown=True).plan(disks, "5")[0].disks), 4)
+    
+    def test_members_share_media_and_size(self):
+        disks = _disks(3, media_type="hdd") + _disks(2) + _disks(4, size_gb=1920)
+        # Two groups only fit at three members each, and never across the mixed 960 GB disks
+        plans = PlacementPlanner().plan(disks, "5", groups=2)
+        self.assertEqual([(plan.media_type, plan.size_gb, len(plan.disks)) for plan in plans],
+                         [("ssd", 1920, 3), ("hdd", 960, 3)])
+        self.assertEqual(PlacementPlanner().plan(disks, "5", media_type="SSD")[0].size_gb, 1920)
+    
+    def test_groups_do_not_share_disks_and_respect_exclusions(self):
+        disks = _disks(12)
+        excluded = [disk["id"] for disk in disks[:2]]
+        plans = PlacementPlanner().plan(disks, "10", groups=3, members=4, exclude=excluded)
+        self.assertEqual(len(plans), 2)
+        chosen = [disk_id for plan in plans for disk_id in plan.disk_ids]
+        self.assertEqual(len(chosen), len(set(chosen)))
+        self.assertFalse(set(chosen) & set(excluded))
+    
+    def test_small_disks_are_skipped_for_capacity(self):
+        disks = _disks(5, size_gb=100) + _disks(5, size_gb=1000)
+        self.assertEqual(PlacementPlanner().plan(disks, "5", min_usable_gb=1000)[0].size_gb, 1000)
+
+class RaidLevelTest(unittest.TestCase):
+    
+    def test_level_names(self):
+        self.assertEqual([normalize_raid_level(name) for name in ("RAID5", "raid-10", "6")], ["5", "10", "6"])
+        with self.assertRaises(ValueError):
+            normalize_raid_level("raid7")
+    
+    def test_member_counts(self):
+        self.assertEqual(member_count("5"), 5)
+        self.assertEqual(member_count("6", 8), 8)
+        for level, members in (("5", 2), ("1", 3), ("10", 5)):
+            with self.assertRaises(ValueError):
+                member_count(level, members)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from san_automation.config import Config
+from san_automation.performance.fio_parser import FioResult, IoStats, JobResult, LatencyStats
+from san_automation.performance.regression import RegressionDetector
+from san_automation.performance.results_store import ResultsStore
+
+def _fio_result(read_iops: float, read_p99_us: float = 200.0) -> FioResult:
+    clat = LatencyStats(mean=read_p99_us / 2, percentiles={99.0: read_p99_us})
+    return FioResult(jobs=[JobResult("job", read=IoStats(iops=read_iops, bw_kbps=read_iops * 4, clat=clat))])
+
+class CheckMetricTest(unittest.TestCase):
+    
+    HISTORY = [1000.0, 1010.0, 990.0, 1005.0, 995.0, 2000.0]
+    
+    def setUp(self):
+        self.detector = RegressionDetector(store=None, min_samples=5, threshold_mads=3.0, min_change=0.05)
+    
+    def test_baseline_is_median_and_scaled_mad(self):
+        check = self.detector.check_metric('read_iops', 1000.0, self.HISTORY)
+        # The 2000 outlier moves neither the median nor the MAD much
+        self.assertEqual(check.baseline, 1002.5)
+        self.assertAlmostEqual(check.mad, 1.4826 * 7.5)
+        self.assertEqual(check.samples, 6)
+        self.assertFalse(check.regressed)
+    
+    def test_throughput_drop_beyond_threshold_regresses(self):
+        check = self.detector.check_metric('read_iops', 800.0, self.HISTORY)
+        self.assertTrue(check.regressed)
+        self.assertAlmostEqual(check.change, (1002.5 - 800.0) / 1002.5)
+    
+    def test_small_changes_are_noise_even_with_a_tight_baseline(self):
+        check = self.detector.check_metric('read_iops', 970.0, [1000.0] * 6)
+        self.assertEqual(check.mad, 0.0)
+        self.assertFalse(check.regressed)
+    
+    def test_latency_increase_regresses(self):
+        history = [200.0, 205.0, 195.0, 210.0, 190.0]
+        self.assertTrue(self.detector.check_metric('read_clat_p99_us', 300.0, history).regressed)
+        self.assertFalse(self.detector.check_metric('read_clat_p99_us', 150.0, history).regressed)
+    
+    def test_zero_throughput_regresses(self):
+        check = self.detector.check_metric('read_iops', 0.0, self.HISTORY)
+        self.assertFalse(check.skipped)
+        self.assertTrue(check.regressed)
+    
+    def test_zero_latency_and_missing_values_are_skipped(self):
+        self.assertTrue(self.detector.check_metric('read_clat_p99_us', 0.0, [200.0] * 5).skipped)
+        self.assertTrue(self.detector.check_metric('read_iops', None, self.HISTORY).skipped)
+    
+    def test_short_history_is_skipped(self):
+        check = self.detector.check_metric('read_iops', 10.0, self.HISTORY[:4])
+        self.assertTrue(check.skipped)
+        self.assertFalse(check.regressed)
+
+class RegressionDetectorTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.store = ResultsStore(":memory:")
+        self.addCleanup(self.store.close)
+        self.config = Config(san_ip="10.0.0.1", host_ip="10.0.0.2", san_username="admin", san_password="password",
+                             host_username="root", host_password="password")
+        for iops in (1000.0, 1010.0, 990.0, 1005.0, 995.0):
+            self.store.record_run(self.config, {"success": True}, performance=_fio_result(iops))
+    
+    def test_verdict_over_stored_runs(self):
+        detector = RegressionDetector(self.store, metrics=('read_iops', 'write_iops', 'read_clat_p99_us'))
+        self.assertTrue(detector.check(self.config, _fio_result(1000.0)).passed)
+        
+        verdict = detector.check(self.config, _fio_result(0.0))
+        self.assertFalse(verdict.passed)
+        self.assertEqual([check.metric for check in verdict.regressions], ['read_iops'])
+        self.assertEqual(verdict.to_dict()["regressions"], ['read_iops'])
+    
+    def test_excluded_run_is_not_part_of_its_own_baseline(self):
+        run_id = self.store.record_run(self.config, {"success": True}, performance=_fio_result(500.0))
+        detector = RegressionDetector(self.store, metrics=('read_iops',), min_samples=6)
+        self.assertFalse(detector.check(self.config, _fio_result(500.0)).checks[0].skipped)
+        self.assertTrue(detector.check(self.config, _fio_result(500.0), exclude_run=run_id).checks[0].skipped)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+import unittest
+from san_automation.core.scheduler import StageScheduler
+from san_automation.utils.metrics import MetricsRegistry
+
+class _Tracker:
+    """Stage functions that record start order and the peak concurrency per resource"""
+    
+    def __init__(self):
+        self.order = []
+        self.active = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+    
+    def stage(self, name, resources=(), seconds=0.05, result=True):
+        def _run():
+            with self._lock:
+                self.order.append(name)
+                for resource in resources + ('*',):
+                    self.active[resource] = self.active.get(resource, 0) + 1
+                    self.peak[resource] = max(self.peak.get(resource, 0), self.active[resource])
+            time.sleep(seconds)
+            with self._lock:
+                for resource in resources + ('*',):
+                    self.active[resource] -= 1
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return _run
+
+class StageSchedulerTest(unittest.TestCase):
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.tracker = _Tracker()
+    
+    def _scheduler(self, max_workers=4):
+        return StageScheduler(max_workers, registry=MetricsRegistry(enabled=False))
+    
+    def _add(self, scheduler, name, depends=(), resources=(), **kwargs):
+        scheduler.add(name, self.tracker.stage(name, resources, **kwargs), depends=depends, resources=resources)
+    
+    def test_cycles_are_rejected_before_anything_runs(self):
+        scheduler = self._scheduler()
+        self._add(scheduler, "a", depends=("c",))
+        self._add(scheduler, "b", depends=("a",))
+        self._add(scheduler, "c", depends=("b",))
+        with self.assertRaisesRegex(ValueError, "cycle: a -> c -> b -> a"):
+            scheduler.run()
+        self.assertEqual(self.tracker.order, [])
+    
+    def test_self_dependency_is_a_cycle(self):
+        scheduler = self._scheduler()
+        self._add(scheduler, "a", depends=("a",))
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            scheduler.validate()
+    
+    def test_unknown_and_duplicate_stages_are_rejected(self):
+        scheduler = self._scheduler()
+        self._add(scheduler, "a", depends=("missing",))
+        with self.assertRaisesRegex(ValueError, "unknown stage missing"):
+            scheduler.validate()
+        with self.assertRaisesRegex(ValueError, "Duplicate"):
+            self._add(scheduler, "a")
+        with self.assertRaises(ValueError):
+            StageScheduler(0)
+    
+    def test_dependencies_run_first(self):
+        scheduler = self._scheduler()
+        self._add(scheduler, "mount", depends=("map", "prepare"))
+        self._add(scheduler, "map", depends=("create",))
+        self._add(scheduler, "create")
+        self._add(scheduler, "prepare")
+        scheduler.run()
+        self.assertTrue(scheduler.success)
+        order = self.tracker.order
+        self.assertLess(order.index("create"), order.index("map"))
+        self.assertEqual(order[-1], "mount")
+    
+    def test_stages_sharing_a_resource_never_overlap(self):
+        scheduler = self._scheduler(max_workers=4)
+        for index in range(3):
+            self._add(scheduler, f"array{index}", resources=("array",))
+            self._add(scheduler, f"host{index}", resources=("host",))
+        scheduler.run()
+        self.assertTrue(scheduler.success)
+        self.assertEqual(self.tracker.peak["array"], 1)
+        self.assertEqual(self.tracker.peak["host"], 1)
+        # Array and host stages still overlap with each other
+        self.assertEqual(self.tracker.peak["*"], 2)
+    
+    def test_max_workers_bounds_concurrency(self):
+        scheduler = self._scheduler(max_workers=2)
+        for index in range(6):
+            self._add(scheduler, f"stage{index}")
+        scheduler.run()
+        self.assertEqual(self.tracker.peak["*"], 2)
+        self.assertEqual(len(scheduler.results), 6)
+    
+    def test_failure_skips_everything_downstream(self):
+        scheduler = self._scheduler()
+        self._add(scheduler, "connect")
+        self._add(scheduler, "create", depends=("connect",), result=False)
+        self._add(scheduler, "map", depends=("create",))
+        self._add(scheduler, "mount", depends=("map",))
+        self._add(scheduler, "prepare", depends=("connect",), result=RuntimeError("no fio"))
+        self._add(scheduler, "report", depends=("connect",))
+        results = scheduler.run()
+        
+        self.assertFalse(scheduler.success)
+        self.assertEqual(results["create"].error, "Stage reported failure")
+        self.assertEqual(results["prepare"].error, "no fio")
+        self.assertTrue(results["map"].skipped)
+        self.assertEqual(results["mount"].error, "Dependency failed: map")
+        self.assertTrue(results["report"].success)
+        self.assertNotIn("map", self.tracker.order)
+        self.assertEqual(list(scheduler.report()), ["connect", "create", "map", "mount", "prepare", "report"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import dataclasses
+import logging
+import unittest
+from san_automation.benchmarks.suites import target_configs
+from san_automation.core.exceptions import HostError
+from san_automation.core.orchestrator import SanAutomationOrchestrator
+from san_automation.performance.fio_parser import FioResult, IoStats, JobResult, LatencyStats
+from san_automation.performance.sweep import KneeDetector, PerformanceSweep, build_sweep, parse_block_size
+from san_automation.simulator import ArraySimulator, HostSimulator, SimulationProfile
+from san_automation.vendors.inventory import get_inventory_cache
+
+def _fio_result(iops: float, p99_us: float) -> FioResult:
+    clat = LatencyStats(mean=p99_us / 2, percentiles={99.0: p99_us})
+    return FioResult(jobs=[JobResult("job", read=IoStats(iops=iops, bw_kbps=iops * 4, clat=clat))])
+
+class _CurveHost:
+    """Host manager whose fio runs follow a fixed (iops, p99 us) curve per queue depth"""
+    
+    def __init__(self, curve, refusal=None):
+        self.curve = curve
+        self.refusal = refusal
+        self.job_files = []
+        self.job_paths = []
+    
+    def raw_job_dir(self, device):
+        if self.refusal:
+            raise HostError(self.refusal)
+        return "/tmp/scratch"
+    
+    def run_fio_job(self, job_file, job_path, timeout, telemetry=None):
+        self.job_files.append(job_file)
+        self.job_paths.append(job_path)
+        depth = int(next(line for line in job_file.splitlines() if line.startswith('iodepth='))[8:])
+        if depth not in self.curve:
+            return {"success": False, "error": "fio failed", "result": None}
+        return {"success": True, "result": _fio_result(*self.curve[depth])}
+
+class KneeDetectorTest(unittest.TestCase):
+    
+    def test_first_point_is_never_saturated_by_throughput(self):
+        self.assertFalse(KneeDetector().is_saturated(None, (1000.0, 100.0)))
+    
+    def test_small_iops_gain_is_the_knee(self):
+        detector = KneeDetector(min_iops_gain=0.05)
+        self.assertFalse(detector.is_saturated((1000.0, 100.0), (1100.0, 120.0)))
+        self.assertTrue(detector.is_saturated((1000.0, 100.0), (1040.0, 200.0)))
+        self.assertTrue(detector.is_saturated((1000.0, 100.0), (900.0, 300.0)))
+    
+    def test_latency_ceiling_saturates_any_point(self):
+        detector = KneeDetector(max_latency_us=500.0)
+        self.assertTrue(detector.is_saturated(None, (1000.0, 600.0)))
+        self.assertFalse(detector.is_saturated((500.0, 100.0), (1000.0, 400.0)))
+    
+    def test_zero_previous_iops_is_not_a_knee(self):
+        self.assertFalse(KneeDetector().is_saturated((0.0, 0.0), (0.0, 0.0)))
+
+class PerformanceSweepTest(unittest.TestCase):
+    
+    CURVE = {1: (1000.0, 100.0), 2: (1900.0, 120.0), 4: (3500.0, 150.0), 8: (3600.0, 300.0), 16: (3650.0, 600.0)}
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+    
+    def test_rest_of_a_curve_is_skipped_after_the_knee(self):
+        host = _CurveHost(self.CURVE)
+        points = build_sweep(['4k', '64k'], [16, 1, 4, 2, 8])
+        result = PerformanceSweep(host, "/mnt/test", duration=1, knee_detector=KneeDetector()).run(points)
+        
+        # Both curves stop at queue depth 8, where IOPS grew by under 5%
+        self.assertEqual(list(result.column('iodepth')), [1, 2, 4, 8] * 2)
+        self.assertEqual(result.saturated, [('4k', 1, 'randread', None), ('64k', 1, 'randread', None)])
+        self.assertEqual(list(result.column('block_size_bytes')), [4096] * 4 + [65536] * 4)
+        self.assertEqual(result.column('read_clat_p99_us')[3], 300.0)
+    
+    def test_without_a_detector_every_point_runs(self):
+        host = _CurveHost(self.CURVE)
+        result = PerformanceSweep(host, "/mnt/test", duration=1).run(build_sweep(['4k'], self.CURVE))
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result.saturated, [])
+    
+    def test_failed_points_are_left_out(self):
+        host = _CurveHost({1: (1000.0, 100.0), 4: (3000.0, 150.0)})
+        result = PerformanceSweep(host, "/mnt/test", duration=1, knee_detector=KneeDetector()).run(
+            build_sweep(['4k'], [1, 2, 4]))
+        self.assertEqual(list(result.column('iodepth')), [1, 4])
+        self.assertEqual(len(host.job_files), 3)
+    
+    def test_raw_points_run_on_the_device(self):
+        host = _CurveHost(self.CURVE)
+        result = PerformanceSweep(host, "/mnt/test", duration=1, device="/dev/sdb").run(build_sweep(['4k'], [1, 2]))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(host.job_paths, ["/tmp/scratch/sweep_randread_bs4k_qd1_nj1.ini",
+                                          "/tmp/scratch/sweep_randread_bs4k_qd2_nj1.ini"])
+        self.assertTrue(all("filename=/dev/sdb" in job_file and "directory=" not in job_file
+                            for job_file in host.job_files))
+    
+    def test_refused_device_runs_nothing(self):
+        host = _CurveHost(self.CURVE, refusal="/dev/sdb has a filesystem")
+        with self.assertRaisesRegex(HostError, "has a filesystem"):
+            PerformanceSweep(host, "/mnt/test", duration=1, device="/dev/sdb").run(build_sweep(['4k'], [1]))
+        self.assertEqual(host.job_files, [])
+
+class RawSweepTest(unittest.TestCase):
+    """Sweeps in raw test mode against the array and host simulators"""
+    
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        get_inventory_cache().invalidate()
+        self.arrays = ArraySimulator(SimulationProfile(seed=0))
+        self.arrays.start()
+        self.addCleanup(self.arrays.stop)
+        self.hosts = HostSimulator(self.arrays)
+        config = dataclasses.replace(target_configs(1)[0], test_mode="raw")
+        self.orchestrator = SanAutomationOrchestrator(self.arrays.san_factory(config), self.hosts.host_factory(config))
+        self.addCleanup(self.orchestrator.cleanup)
+        self.assertTrue(self.orchestrator.run_pipeline(self.orchestrator.build_pipeline(performance_test=False)))
+        self.host = self.hosts.host(config.host_ip)
+    
+    def test_jobs_run_on_the_device(self):
+        device = self.orchestrator.host_manager.device
+        result = self.orchestrator.run_performance_sweep(build_sweep(['4k'], [1, 2]), duration=1)
+        self.assertEqual(len(result), 2)
+        job_files = {path: content for path, content in self.host.files.items() if '/sweep_' in path}
+        self.assertEqual(len(job_files), 2)
+        for path, content in job_files.items():
+            self.assertFalse(path.startswith(self.orchestrator.host_manager.config.mount_point), path)
+            self.assertIn(f"filename={device}", content)
+            self.assertNotIn("directory=", content)
+    
+    def test_device_with_a_filesystem_is_refused(self):
+        self.host.filesystems[self.orchestrator.host_manager.device.rsplit('/', 1)[-1]] = "xfs"
+        self.assertIsNone(self.orchestrator.run_performance_sweep(build_sweep(['4k'], [1]), duration=1))
+        self.assertFalse([path for path in self.host.files if '/sweep_' in path])
+
+class BuildSweepTest(unittest.TestCase):
+    
+    def test_read_ratios_only_multiply_mixed_workloads(self):
+        points = build_sweep(['4k'], [1, 2], rw_modes=('randread', 'randrw'), read_ratios=(50, 70))
+        self.assertEqual([point.name for point in points], [
+            'randread_bs4k_qd1_nj1', 'randread_bs4k_qd2_nj1',
+            'randrw_r50_bs4k_qd1_nj1', 'randrw_r50_bs4k_qd2_nj1',
+            'randrw_r70_bs4k_qd1_nj1', 'randrw_r70_bs4k_qd2_nj1'
+        ])
+    
+    def test_parse_block_size(self):
+        self.assertEqual(parse_block_size('4k'), 4096)
+        self.assertEqual(parse_block_size('1M'), 1024 ** 2)
+        self.assertEqual(parse_block_size('512'), 512)
+        with self.assertRaises(ValueError):
+            parse_block_size('4kb')
+
+if __name__ == '__main__':
+    unittest.main()